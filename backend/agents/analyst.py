@@ -11,10 +11,12 @@ class AnalystAgent(BaseAgent):
     1. Evidence Anchoring (Todistepohjainen Ankkurointi)
     2. Creating an 'Evidence Map' (Todistuskartta)
     """
+    reads = ("inputs",)
+    writes = ("step_2_analyst",)
+    submission_texts = ("history_text", "product_text", "reflection_text")
+
 
     def construct_user_prompt(self, state: WorkflowState) -> str:
-        inputs = state.inputs
-        
         # Get Example
         example_text = self.get_schema_example(TodistusKartta)
 
@@ -26,14 +28,7 @@ class AnalystAgent(BaseAgent):
 
         INPUT DATA FOR ANALYSIS:
         ---
-        KESKUSTELUHISTORIA:
-        {inputs.history_text}
-        
-        LOPPUTUOTE:
-        {inputs.product_text}
-        
-        REFLEKTIODOKUMENTTI:
-        {inputs.reflection_text}
+        {self.submission_section(state)}
         ---
         """
 
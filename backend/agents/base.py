@@ -1,15 +1,47 @@
-from typing import Any, Optional, Type
+from typing import Any, Callable, Dict, Optional, Tuple, Type
 import os
+import contextvars
 from backend.component import BaseComponent
 from backend.state import WorkflowState
-from backend.llm_provider import LLMFactory, LLMProvider
+from backend.llm_provider import LLMFactory, LLMProvider, use_context_cache
+from backend.context_cache import PromptPrefix
+from backend.events import current_partial_output
+from backend.config import LLM_STREAMING_ENABLED
+from src.components.tracing import start_span
+from src.engine.model_routing import current_route
 from pydantic import BaseModel
 
+SUBMISSION_LABELS = {
+    "history_text": "KESKUSTELUHISTORIA",
+    "product_text": "LOPPUTUOTE",
+    "reflection_text": "REFLEKTIODOKUMENTTI",
+}
+
+# True while a user prompt is built for a request whose prefix carries the full submission
+_submission_in_prefix: contextvars.ContextVar[bool] = contextvars.ContextVar("submission_in_prefix", default=False)
+
 class BaseAgent(BaseComponent):
     """
     Abstract base class for all Cognitive Quorum agents.
     Handles LLM interaction via the Provider Pattern and manages WorkflowState.
     """
+
+    # WorkflowState fields this agent (including its hooks) reads and writes.
+    # The engine uses these to run independent steps concurrently.
+    # Nested keys use dot notation (e.g. "aux_data.google_search_results").
+    # None means "unknown": the step is treated as a barrier and runs alone.
+    reads: Optional[Tuple[str, ...]] = None
+    writes: Optional[Tuple[str, ...]] = None
+
+    # Submission texts (WorkflowInputs fields) the user prompt works on. When the
+    # request goes through a provider context cache, all texts are sent once in
+    # the shared prompt prefix instead (see construct_submission_context), which is
+    # identical for every such step; otherwise only these are embedded in the prompt.
+    submission_texts: Tuple[str, ...] = ()
+
+    # True for agents with long outputs: with LLM_STREAMING_ENABLED their response
+    # is streamed and its fields are published while generated (step_partial events).
+    streams_output: bool = False
     
     def __init__(self, model: str = "gemini-1.5-flash", provider: str = "gemini"):
         self.model = model
@@ -39,34 +71,65 @@ class BaseAgent(BaseComponent):
             print(f"[{self.__class__.__name__}] Warning: Failed to get example from schema {schema_class.__name__}: {e}")
         return ""
 
-    async def execute(self, state: WorkflowState, system_instruction: Optional[str] = None) -> WorkflowState:
+    async def execute(self, state: WorkflowState, system_instruction: Optional[str] = None,
+                      system_prefix: Optional[str] = None) -> WorkflowState:
         """
         Standard execution entry point.
         Takes the entire WorkflowState, processes it, and returns the updated state.
-        Now accepts an optional system_instruction override (for data-driven prompts).
+        Now accepts an optional system_instruction override (for data-driven prompts),
+        and the system prompt part shared by all steps (system_prefix).
         """
         print(f"[{self.__class__.__name__}] Starting execution...")
         try:
+            # Stable leading part of the request (shared system prompt, plus the
+            # submission only if it is served from a context cache)
+            prefix = PromptPrefix(system_prefix, self.construct_submission_context(state) if self.submission_texts else None)
+            if prefix.context and not use_context_cache(prefix):
+                prefix = PromptPrefix(system_prefix)
+            prefix_arg = {"prefix": prefix} if prefix else {}
+
             # 1. Construct Prompt (using state)
-            user_prompt = self.construct_user_prompt(state)
+            with start_span("prompt.user") as span:
+                token = _submission_in_prefix.set(bool(prefix.context))
+                try:
+                    user_prompt = self.construct_user_prompt(state)
+                finally:
+                    _submission_in_prefix.reset(token)
+                span.set_attribute("prompt.chars", len(user_prompt or ""))
             
             # 2. Get System Instruction
             # If not provided by engine, use the class default
-            if not system_instruction:
+            if not system_instruction and not system_prefix:
                 system_instruction = self.get_system_instruction()
 
             # 3. Determine Output Schema (Subclasses must define this!)
             response_schema = self.get_response_schema()
 
             # 4. Call LLM (The "Mask" handles the details) — ASYNC WAIT
-            response_data = await self.llm_provider.generate(
-                prompt=user_prompt,
-                system_instruction=system_instruction,
-                response_schema=response_schema
-            )
+            # Retried attempts show up as separate llm.request spans inside llm.generate
+            request = dict(prompt=user_prompt, system_instruction=system_instruction,
+                           response_schema=response_schema, **prefix_arg)
+            sink = current_partial_output() if self.streams_output and LLM_STREAMING_ENABLED else None
+            route = current_route()
+            route = route if route and route.primary else None
+            with start_span("llm.generate", kind="CLIENT", model=route.primary if route else self.model):
+                if route:
+                    # Workflow model mapping / fallback chain, hedged on latency
+                    streaming: Dict[str, str] = {}
+
+                    def request_for(model: str):
+                        partial_arg = {"on_partial": self._stream_to(sink, model, streaming)} if sink else {}
+                        return self._provider_for(model).generate(**request, **partial_arg)
+
+                    response_data = await route.call(request_for)
+                else:
+                    if sink:
+                        request["on_partial"] = sink
+                    response_data = await self.llm_provider.generate(**request)
 
             # 5. Update State
-            updated_state = self._update_state(state, response_data)
+            with start_span("parse"):
+                updated_state = self._update_state(state, response_data)
             
             print(f"[{self.__class__.__name__}] Execution completed.")
             return updated_state
@@ -75,12 +138,56 @@ class BaseAgent(BaseComponent):
             print(f"[{self.__class__.__name__}] Execution failed: {e}")
             raise e
 
+    @staticmethod
+    def _stream_to(sink: Callable[[str, Any, bool], None], model: str, streaming: Dict[str, str]) -> Callable[[str, Any, bool], None]:
+        def on_partial(path: str, value: Any, complete: bool):
+            # Hedged calls stream concurrently: only the first model to produce output is shown
+            if streaming.setdefault("model", model) == model:
+                sink(path, value, complete)
+        return on_partial
+
+    def _provider_for(self, model: str) -> LLMProvider:
+        """The agent's own provider for its model, a shared one for any other model."""
+        if model == self.model:
+            return self.llm_provider
+        return LLMFactory.get_provider(model)
+
     def construct_user_prompt(self, state: WorkflowState) -> str:
         """
         Constructs the prompt based on the current state.
         """
         raise NotImplementedError("Subclasses must implement construct_user_prompt(state)")
 
+    def submission_section(self, state: WorkflowState) -> str:
+        """
+        The agent's submission_texts for its user prompt, or a reference to the
+        SUBMISSION block when that is already in the (cached) prompt prefix.
+        """
+        labels = [SUBMISSION_LABELS[field] for field in self.submission_texts]
+        if _submission_in_prefix.get():
+            names = labels[0] if len(labels) == 1 else f"{', '.join(labels[:-1])} and {labels[-1]}"
+            return f"{names}: see the SUBMISSION above."
+        return "\n\n".join(f"{label}:\n{getattr(state.inputs, field)}"
+                           for label, field in zip(labels, self.submission_texts))
+
+    def construct_submission_context(self, state: WorkflowState) -> str:
+        """
+        All submission texts in one canonical block, sent in the prompt prefix when
+        it is context-cached. Every step sends exactly this text, so it caches as one prefix.
+        """
+        inputs = state.inputs
+        return f"""INPUT DATA (SUBMISSION):
+---
+KESKUSTELUHISTORIA:
+{inputs.history_text}
+
+LOPPUTUOTE:
+{inputs.product_text}
+
+REFLEKTIODOKUMENTTI:
+{inputs.reflection_text}
+---"""
+
     def _update_state(self, state: WorkflowState, response_data: Any) -> WorkflowState:
         """
         Updates the WorkflowState with the LLM response.
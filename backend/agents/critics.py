@@ -16,6 +16,10 @@ class LogicalFalsifierAgent(BaseAgent):
     """
     Looginen Falsifioija-agentti (Logical Falsifier).
     """
+    reads = ("inputs", "step_3_logician")
+    writes = ("step_4_falsifier",)
+    submission_texts = ("history_text", "product_text")
+
     def construct_user_prompt(self, state: WorkflowState) -> str:
         # Needs Logician's output + Raw Data
         logician_output = state.step_3_logician.model_dump_json(indent=2) if state.step_3_logician else "N/A"
@@ -33,11 +37,7 @@ class LogicalFalsifierAgent(BaseAgent):
         ARGUMENTAATIOANALYYSI (Edellisestä vaiheesta):
         {logician_output}
         ---
-        KESKUSTELUHISTORIA:
-        {state.inputs.history_text}
-        
-        LOPPUTUOTE:
-        {state.inputs.product_text}
+        {self.submission_section(state)}
         ---
         """
 
@@ -67,6 +67,10 @@ class FactualOverseerAgent(BaseAgent):
     """
     Faktuaalinen ja Eettinen Valvoja-agentti (Factual & Ethical Overseer).
     """
+    reads = ("inputs", "step_2_analyst", "aux_data.google_search_results")
+    writes = ("step_5_overseer", "aux_data.google_search_results")
+    submission_texts = ("product_text",)
+
     def construct_user_prompt(self, state: WorkflowState) -> str:
         # Needs Analyst's output + Search Results (if any)
         analyst_output = state.step_2_analyst.model_dump_json(indent=2) if state.step_2_analyst else "N/A"
@@ -88,8 +92,7 @@ class FactualOverseerAgent(BaseAgent):
         ULKOISEN FAKTANTARKISTUKSEN TULOKSET:
         {search_results}
         ---
-        LOPPUTUOTE:
-        {state.inputs.product_text}
+        {self.submission_section(state)}
         ---
         """
 
@@ -175,6 +178,10 @@ class CausalAnalystAgent(BaseAgent):
     """
     Kausaalinen Analyytikko-agentti (Causal Analyst).
     """
+    reads = ("inputs",)
+    writes = ("step_6_causal",)
+    submission_texts = ("history_text", "reflection_text")
+
     def construct_user_prompt(self, state: WorkflowState) -> str:
         # Get Example
         example_text = self.get_schema_example(KausaalinenAuditointi)
@@ -186,11 +193,7 @@ class CausalAnalystAgent(BaseAgent):
 
         INPUT DATA:
         ---
-        KESKUSTELUHISTORIA:
-        {state.inputs.history_text}
-        
-        REFLEKTIODOKUMENTTI:
-        {state.inputs.reflection_text}
+        {self.submission_section(state)}
         ---
         """
 
@@ -220,6 +223,10 @@ class PerformativityDetectorAgent(BaseAgent):
     """
     Performatiivisuuden Tunnistaja-agentti (Performativity Detector).
     """
+    reads = ("inputs",)
+    writes = ("step_7_detector", "aux_data.performative_patterns_detected")
+    submission_texts = ("history_text", "reflection_text")
+
     def construct_user_prompt(self, state: WorkflowState) -> str:
         # Get Example
         example_text = self.get_schema_example(PerformatiivisuusAuditointi)
@@ -231,11 +238,7 @@ class PerformativityDetectorAgent(BaseAgent):
 
         INPUT DATA:
         ---
-        KESKUSTELUHISTORIA:
-        {state.inputs.history_text}
-        
-        REFLEKTIODOKUMENTTI:
-        {state.inputs.reflection_text}
+        {self.submission_section(state)}
         ---
         """
 
@@ -267,20 +270,9 @@ class PerformativityDetectorAgent(BaseAgent):
         Scans input for performative language patterns.
         """
         print("[PerformativityDetectorAgent] Running detect_performative_patterns...")
-        
-        suspect_patterns = [
-            "delve into", "tapestry", "comprehensive overview", "rich history",
-            "testament to", "underscore the importance", "pivotal role",
-            "landscape of", "realm of", "foster a sense of"
-        ]
-        
-        detected = []
-        text_to_scan = (state.inputs.history_text or "") + (state.inputs.product_text or "")
-        text_lower = text_to_scan.lower()
-        
-        for pattern in suspect_patterns:
-            if pattern in text_lower:
-                detected.append(pattern)
+        from backend.hooks import find_performative_patterns
+
+        detected = find_performative_patterns(state.inputs.history_text, state.inputs.product_text)
                 
         if detected:
             print(f"   [HOOK] Detected patterns: {detected}")
@@ -12,6 +12,9 @@ class GuardAgent(BaseAgent):
     2. Security Check (Tietoturvatarkistus)
     3. Anonymization (Anonymisointi)
     """
+    reads = ("inputs",)
+    writes = ("inputs", "step_1_guard")
+
 
     def construct_user_prompt(self, state: WorkflowState) -> str:
         # Access data directly from the typed State object!
@@ -75,13 +78,11 @@ class GuardAgent(BaseAgent):
             # We must load the banned phrases from the DB or a known source.
             # Ideally this is a pre-hook, but we can also enforce it post-LLM to override the verdict.
             from backend.config import DB_PATH
-            from tinydb import TinyDB, Query
+            from backend.banned_phrases import banned_phrase_index
             
             try:
-                # We use a fresh DB connection to avoid threading issues
-                db = TinyDB(DB_PATH, encoding='utf-8')
-                banned_table = db.table('banned_phrases')
-                banned_phrases = [r['phrase'].lower() for r in banned_table.all()]
+                # In-memory matcher, rebuilt only when the banned phrases change
+                matcher = banned_phrase_index.get_matcher(DB_PATH)
                 
                 detected = []
                 # Scan all inputs
@@ -92,11 +93,7 @@ class GuardAgent(BaseAgent):
                 ]
                 
                 for text in inputs_to_scan:
-                    if not text: continue
-                    text_lower = text.lower()
-                    for phrase in banned_phrases:
-                        if phrase in text_lower:
-                            detected.append(phrase)
+                    detected.extend(matcher.find_phrases(text))
                 
                 if detected:
                     print(f"[GuardAgent] STRICT CHECK: Found banned phrases: {detected}")
@@ -127,7 +124,7 @@ class GuardAgent(BaseAgent):
         """
         print("[GuardAgent] Executing PDF Extraction Pre-Hook...")
         import base64
-        import fitz # PyMuPDF
+        from src.components.pdf_extraction import get_pdf_extractor
 
         # Map of field names to current values
         input_fields = {
@@ -147,11 +144,8 @@ class GuardAgent(BaseAgent):
                     # Decode
                     file_bytes = base64.b64decode(b64_str)
                     
-                    # Extract with fitz
-                    doc = fitz.open(stream=file_bytes, filetype="pdf")
-                    text = ""
-                    for page in doc:
-                        text += page.get_text()
+                    # Extract with the shared (cached) extraction service
+                    text = get_pdf_extractor().extract_text(file_bytes)
                     
                     print(f"[GuardAgent] Extracted {len(text)} characters from {field_name}.")
                     updates[field_name] = text
@@ -178,13 +172,10 @@ class GuardAgent(BaseAgent):
         print("[GuardAgent] Executing Python-based Banned Phrases Scan (Pre-Hook)...")
         
         from backend.config import DB_PATH
-        from tinydb import TinyDB
+        from backend.banned_phrases import banned_phrase_index
         
         try:
-            # Load banned phrases
-            db = TinyDB(DB_PATH, encoding='utf-8')
-            banned_table = db.table('banned_phrases')
-            banned_phrases = [r['phrase'].lower() for r in banned_table.all()]
+            matcher = banned_phrase_index.get_matcher(DB_PATH)
             
             detected = []
             inputs_to_scan = {
@@ -194,11 +185,8 @@ class GuardAgent(BaseAgent):
             }
             
             for key, text in inputs_to_scan.items():
-                if not text: continue
-                text_lower = text.lower()
-                for phrase in banned_phrases:
-                    if phrase in text_lower:
-                        detected.append(f"{phrase} ({key})")
+                for phrase in matcher.find_phrases(text):
+                    detected.append(f"{phrase} ({key})")
             
             if detected:
                 distinct_phrases = list(set(detected))
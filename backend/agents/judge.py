@@ -8,6 +8,10 @@ class JudgeAgent(BaseAgent):
     """
     Tuomari-agentti (Judge Agent).
     """
+    reads = ("inputs", "step_3_logician", "step_4_falsifier", "step_5_overseer", "step_6_causal", "step_7_detector")
+    writes = ("step_8_judge", "aux_data.score_summary", "aux_data.calculated_average")
+    streams_output = True
+
     def construct_user_prompt(self, state: WorkflowState) -> str:
         # Judge needs EVERYTHING
         context = {
@@ -11,6 +11,10 @@ class LogicianAgent(BaseAgent):
     1. Argument Construction (Argumentaation Rakentaminen)
     2. Applying Cognitive Assessment Matrix (Bloom/Toulmin)
     """
+    reads = ("inputs", "step_2_analyst")
+    writes = ("step_3_logician",)
+    submission_texts = ("history_text", "product_text")
+
 
     def construct_user_prompt(self, state: WorkflowState) -> str:
         # Logician needs the Evidence Map from the previous step + Raw Data
@@ -29,11 +33,7 @@ class LogicianAgent(BaseAgent):
         TODISTUSKARTTA (Edellisestä vaiheesta):
         {evidence_map}
         ---
-        KESKUSTELUHISTORIA:
-        {state.inputs.history_text}
-        
-        LOPPUTUOTE:
-        {state.inputs.product_text}
+        {self.submission_section(state)}
         ---
         """
 
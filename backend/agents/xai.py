@@ -9,6 +9,10 @@ class XAIReporterAgent(BaseAgent):
     """
     XAI-Raportoija-agentti (XAI Reporter Agent).
     """
+    reads = ("step_8_judge",)
+    writes = ("step_9_reporter",)
+    streams_output = True
+
     def construct_user_prompt(self, state: WorkflowState) -> str:
         # Reporter needs the final verdict and scores
         judge_output = state.step_8_judge.model_dump_json(indent=2) if state.step_8_judge else "N/A"
@@ -3,6 +3,7 @@ import subprocess
 import os
 import sys
 from backend.config import BASE_DIR
+from backend.prompt_cache import prompt_cache
 from backend.agents.base import BaseAgent
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -159,12 +160,14 @@ def add_banned_phrase(phrase: BannedPhrase):
         return {"status": "exists", "message": "Phrase already exists."}
         
     doc_id = engine.banned_phrases_table.insert(phrase.dict())
+    prompt_cache.invalidate_banned_phrases()
     return {"status": "success", "id": doc_id, "phrase": phrase.phrase}
 
 @router.delete("/banned-phrases/{doc_id}")
 def delete_banned_phrase(doc_id: int):
     from backend.main import engine
     engine.banned_phrases_table.remove(doc_ids=[doc_id])
+    prompt_cache.invalidate_banned_phrases()
     return {"status": "success", "message": "Phrase deleted."}
 
 # --- AI Generation ---
@@ -222,6 +225,9 @@ def generate_banned_phrases(req: GeneratePhrasesRequest):
                     added_phrases.append(clean_phrase)
                     added_count += 1
         
+        if added_count:
+            prompt_cache.invalidate_banned_phrases()
+
         return {
             "status": "success", 
             "added_count": added_count, 
@@ -4,14 +4,15 @@ import importlib
 
 router = APIRouter(prefix="/agents", tags=["Agents"])
 
-from tinydb import TinyDB, Query
+from tinydb import Query
+from src.database.sqlite_storage import open_database
 from backend.config import DB_PATH
 
 def _load_agent_class(agent_name: str):
     """
     Dynamically loads an agent class by name using the database registry.
     """
-    db = TinyDB(DB_PATH, encoding='utf-8')
+    db = open_database(DB_PATH, encoding='utf-8')
     components_table = db.table('components')
     
     # 1. Try to find by class name (preferred)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, BackgroundTasks
-from tinydb import TinyDB, Query
+from tinydb import Query
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 import os
@@ -7,6 +7,9 @@ import os
 from backend.exporter import export_db_to_files
 from backend.seeder import seed_database
 from backend.config import DB_PATH, PROD_DB_PATH, MOCK_DB_PATH
+from src.database.sqlite_storage import open_database
+from backend.prompt_cache import prompt_cache
+from backend.gating import parse_gating_rules
 
 router = APIRouter(
     prefix="/config",
@@ -17,7 +20,7 @@ router = APIRouter(
 # BASE_DIR and DATA_DIR are no longer needed here if we import DB_PATH
 
 def get_db():
-    return TinyDB(DB_PATH, encoding='utf-8')
+    return open_database(DB_PATH, encoding='utf-8')
 
 # --- Models ---
 
@@ -32,6 +35,18 @@ class WorkflowUpdate(BaseModel):
     sequence: Optional[List[str]] = None
     description: Optional[str] = None
     default_model_mapping: Optional[Dict[str, str]] = None
+    # Model fallback / hedging (src/engine/model_routing.py); keys are step ids or "*"
+    fallback_models: Optional[Dict[str, List[str]]] = None
+    latency_budgets: Optional[Dict[str, float]] = None
+    hedge_percentile: Optional[float] = None
+    # Early exit / skip rules checked between steps (backend/gating.py)
+    gating_rules: Optional[List[Dict[str, Any]]] = None
+
+def _validate_gating_rules(rules: Optional[List[Dict[str, Any]]]):
+    try:
+        parse_gating_rules(rules)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid gating_rules: {e}")
 
 # --- Endpoints ---
 
@@ -83,6 +98,7 @@ def create_component(comp: ComponentCreate):
         new_comp['class'] = new_comp.pop('component_class')
         
     table.insert(new_comp)
+    prompt_cache.invalidate_config()
     return {"status": "created", "id": comp.id}
 
 @router.put("/components/{comp_id}")
@@ -108,6 +124,7 @@ def update_component(comp_id: str, update: ComponentUpdate):
         
     # Update by ID or Name
     table.update(update_data, (Component.id == comp_id) | (Component.name == comp_id))
+    prompt_cache.invalidate_config()
     return {"status": "updated", "id": comp_id}
 
 @router.delete("/components/{comp_id}")
@@ -124,6 +141,7 @@ def delete_component(comp_id: str):
         
     # Remove
     table.remove((Component.id == comp_id) | (Component.name == comp_id))
+    prompt_cache.invalidate_config()
     return {"status": "deleted", "id": comp_id}
 
 @router.get("/steps")
@@ -140,6 +158,7 @@ def create_step(step: Dict[str, Any]):
     if table.search(Query().id == step.get('id')):
         raise HTTPException(status_code=400, detail="Step ID already exists")
     table.insert(step)
+    prompt_cache.invalidate_config()
     return {"status": "created", "id": step.get('id')}
 
 @router.put("/steps/{step_id}")
@@ -150,6 +169,7 @@ def update_step(step_id: str, step: Dict[str, Any]):
     if not table.search(Query().id == step_id):
         raise HTTPException(status_code=404, detail="Step not found")
     table.update(step, Query().id == step_id)
+    prompt_cache.invalidate_config()
     return {"status": "updated", "id": step_id}
 
 @router.delete("/steps/{step_id}")
@@ -160,6 +180,7 @@ def delete_step(step_id: str):
     if not table.search(Query().id == step_id):
         raise HTTPException(status_code=404, detail="Step not found")
     table.remove(Query().id == step_id)
+    prompt_cache.invalidate_config()
     return {"status": "deleted", "id": step_id}
 
 @router.get("/workflows")
@@ -197,6 +218,15 @@ def update_workflow(wf_id: str, update: WorkflowUpdate):
         update_data["description"] = update.description
     if update.default_model_mapping is not None:
         update_data["default_model_mapping"] = update.default_model_mapping
+    if update.fallback_models is not None:
+        update_data["fallback_models"] = update.fallback_models
+    if update.latency_budgets is not None:
+        update_data["latency_budgets"] = update.latency_budgets
+    if update.hedge_percentile is not None:
+        update_data["hedge_percentile"] = update.hedge_percentile
+    if update.gating_rules is not None:
+        _validate_gating_rules(update.gating_rules)
+        update_data["gating_rules"] = update.gating_rules
         
     if not update_data:
          raise HTTPException(status_code=400, detail="No data to update")
@@ -210,6 +240,10 @@ class WorkflowCreate(BaseModel):
     sequence: List[str] = []
     description: Optional[str] = None
     default_model_mapping: Optional[Dict[str, str]] = {}
+    fallback_models: Optional[Dict[str, List[str]]] = {}
+    latency_budgets: Optional[Dict[str, float]] = {}
+    hedge_percentile: Optional[float] = None
+    gating_rules: Optional[List[Dict[str, Any]]] = []
 
 @router.post("/workflows")
 def create_workflow(workflow: WorkflowCreate):
@@ -220,6 +254,7 @@ def create_workflow(workflow: WorkflowCreate):
     
     if table.search(Workflow.id == workflow.id):
         raise HTTPException(status_code=400, detail="Workflow ID already exists")
+    _validate_gating_rules(workflow.gating_rules)
         
     new_wf = workflow.dict()
     # Ensure sequence is saved as 'sequence' (and maybe 'steps' for compat if needed, but let's stick to sequence)
@@ -241,6 +276,17 @@ def delete_workflow(wf_id: str):
     table.remove(Workflow.id == wf_id)
     return {"status": "deleted", "id": wf_id}
 
+@router.get("/prompt-cache/stats")
+def get_prompt_cache_stats():
+    """Hit/miss counters of the compiled system prompt cache."""
+    return prompt_cache.stats()
+
+@router.post("/prompt-cache/clear")
+def clear_prompt_cache():
+    """Drops all compiled prompts (e.g. after editing the DB outside the API)."""
+    prompt_cache.clear()
+    return {"status": "success", "message": "Prompt cache cleared."}
+
 @router.post("/export-seed")
 def export_seed_data(background_tasks: BackgroundTasks):
     """Trigger an export of the database to the file system."""
@@ -82,3 +82,48 @@ def get_available_models():
     except Exception as e:
         print(f"Error listing models: {e}")
         return {"models": ["gpt-4o", "gemini-1.5-pro", "local-model"]} # Fallback
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """
+    Returns hit/miss counters and size of the LLM response cache.
+    """
+    from backend.config import LLM_CACHE_ENABLED
+    from backend.llm_cache import get_llm_cache
+
+    stats = get_llm_cache().stats()
+    stats["enabled"] = LLM_CACHE_ENABLED
+    return stats
+
+@router.delete("/cache")
+def clear_cache():
+    """
+    Removes all cached LLM responses.
+    """
+    from backend.llm_cache import get_llm_cache
+
+    get_llm_cache().clear()
+    return {"status": "success", "message": "LLM response cache cleared."}
+
+
+@router.get("/governor/stats")
+def get_governor_stats():
+    """
+    Returns rate limiter / concurrency governor metrics (queue depth, wait times, in-flight calls).
+    """
+    from backend.rate_limiter import get_llm_governor
+
+    return get_llm_governor().stats()
+
+
+@router.get("/context-cache/stats")
+def get_context_cache_stats():
+    """
+    Returns provider context cache metrics (hits, misses, cached prefix tokens) and the live cache handles.
+    """
+    from backend.config import LLM_CONTEXT_CACHE_ENABLED
+    from backend.context_cache import get_context_cache_registry
+
+    stats = get_context_cache_registry().stats()
+    stats["enabled"] = LLM_CONTEXT_CACHE_ENABLED
+    return stats
@@ -1,31 +1,38 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
-from backend.processor import PDFProcessor
-import os
-import shutil
-import tempfile
+from fastapi.responses import StreamingResponse
+from src.components.pdf_extraction import get_pdf_extractor
+import asyncio
+import json
 
 router = APIRouter(prefix="/tools", tags=["Tools"])
 
 @router.post("/extract-pdf")
-async def extract_pdf(file: UploadFile = File(...)):
+async def extract_pdf(file: UploadFile = File(...), stream: bool = False):
     """
     Extracts text from an uploaded PDF file.
+    Repeated uploads of the same file are served from the extraction cache.
+    With stream=true, pages are sent as NDJSON lines ({"page": n, "text": ...})
+    as soon as they are extracted, which suits very large documents.
     """
+    data = await file.read()
+    extractor = get_pdf_extractor()
+
+    if stream:
+        def page_stream():
+            for index, page_text in enumerate(extractor.iter_pages(data), start=1):
+                yield json.dumps({"page": index, "text": page_text}, ensure_ascii=False) + "\n"
+
+        return StreamingResponse(page_stream(), media_type="application/x-ndjson")
+
     try:
-        # Create a temporary file to save the upload
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = tmp.name
-        
-        try:
-            # Process the PDF
-            processor = PDFProcessor()
-            text = processor.extract_text_from_pdf(tmp_path)
-            return {"filename": file.filename, "text": text}
-        finally:
-            # Clean up temp file
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-                
+        text = await asyncio.to_thread(extractor.extract_text, data)
+        return {"filename": file.filename, "text": text.strip()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/extract-pdf/stats")
+async def get_pdf_extraction_stats():
+    """
+    Extraction cache hit/miss counts and process-pool settings.
+    """
+    return get_pdf_extractor().stats()
@@ -0,0 +1,40 @@
+import threading
+from typing import Dict, Tuple
+from src.components.phrase_matcher import PhraseMatcher
+from src.database.sqlite_storage import open_database
+from backend.prompt_cache import prompt_cache
+
+
+class BannedPhraseIndex:
+    """
+    In-memory PhraseMatcher over the banned_phrases table, one per database.
+
+    The matcher is rebuilt only when the banned phrases change, tracked with
+    prompt_cache.banned_phrases_version (bumped by /admin/banned-phrases,
+    the seeder and POST /config/prompt-cache/clear).
+    """
+
+    def __init__(self):
+        self._matchers: Dict[str, Tuple[int, PhraseMatcher]] = {}
+        self._lock = threading.Lock()
+
+    def get_matcher(self, db_path: str) -> PhraseMatcher:
+        version = prompt_cache.banned_phrases_version
+        with self._lock:
+            entry = self._matchers.get(db_path)
+            if entry and entry[0] == version:
+                return entry[1]
+
+            db = open_database(db_path, encoding='utf-8')
+            phrases = [r['phrase'] for r in db.table('banned_phrases').all() if r.get('phrase')]
+            matcher = PhraseMatcher(phrases)
+            self._matchers[db_path] = (version, matcher)
+            print(f"[BannedPhrases] Built matcher for {len(matcher.phrases)} phrases (version {version})")
+            return matcher
+
+    def clear(self):
+        with self._lock:
+            self._matchers.clear()
+
+
+banned_phrase_index = BannedPhraseIndex()
@@ -0,0 +1,255 @@
+import io
+import os
+import csv
+import json
+import uuid
+import asyncio
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from tinydb import Query
+from src.database.job_queue import RUN_EXECUTION, RESUME_EXECUTION, QUEUED, RUNNING, DONE, FAILED
+
+# Substrings that identify which input a file inside a batch zip belongs to
+INPUT_FILE_KEYWORDS = {
+    "history_text": ("history", "historia"),
+    "product_text": ("product", "tuotos", "tuote"),
+    "reflection_text": ("reflection", "reflektio"),
+}
+
+
+def parse_submission_zip(data: bytes) -> List[Dict[str, Any]]:
+    """
+    Turns a zip of submissions into batch items.
+
+    Each submission is a top-level folder (e.g. "student_01/") holding one
+    file per input; the file name decides the input via INPUT_FILE_KEYWORDS
+    (history/historia, product/tuotos, reflection/reflektio).
+    PDFs are extracted with PyMuPDF, other files are read as UTF-8 text.
+    """
+    from backend.processor import PDFProcessor
+
+    submissions: Dict[str, Dict[str, Any]] = {}
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or "/" not in info.filename or "__MACOSX" in info.filename:
+                continue
+            folder, filename = info.filename.split("/", 1)
+            lowered = os.path.basename(filename).lower()
+
+            input_key = next(
+                (key for key, words in INPUT_FILE_KEYWORDS.items() if any(w in lowered for w in words)),
+                None
+            )
+            if not input_key:
+                print(f"[Batch] Skipping unrecognized file in zip: {info.filename}")
+                continue
+
+            content = archive.read(info)
+            if lowered.endswith(".pdf"):
+                text = PDFProcessor.extract_text_from_bytes(content)
+            else:
+                text = content.decode("utf-8", errors="replace")
+
+            submissions.setdefault(folder, {"label": folder})[input_key] = text
+
+    return [submissions[name] for name in sorted(submissions)]
+
+
+class BatchRunner:
+    """
+    Runs many submissions through WorkflowEngine.run_execution with a bounded
+    worker pool and keeps a batch record (batches table) with per-item status.
+    LLM calls still pass the shared rate limiter, so the pool size only caps
+    how many executions are in flight; the quota is enforced by the governor.
+
+    With a job_queue (EXECUTION_MODE=worker) the items are handed to the worker
+    tier instead, and the batch only tracks their outcome.
+    """
+
+    def __init__(self, engine, max_concurrency: int = 4, job_queue=None, poll_interval: float = 2.0):
+        self.engine = engine
+        self.max_concurrency = max_concurrency
+        self.job_queue = job_queue
+        self.poll_interval = poll_interval
+        self.batches_table = engine.db.table('batches')
+        # Batches run_batch is executing in this process
+        self._running = set()
+
+    def create_batch(self, workflow_id: str, items: List[Dict[str, Any]]) -> str:
+        """
+        Creates one execution per item plus the batch record. Returns the batch id.
+        """
+        if not items:
+            raise ValueError("Batch has no items")
+
+        batch_id = str(uuid.uuid4())
+        batch_items = []
+        for index, item in enumerate(items):
+            inputs = {k: v for k, v in item.items() if k != 'label'}
+            execution_id = self.engine.create_execution(workflow_id, inputs)
+            batch_items.append({
+                "index": index,
+                "label": item.get('label') or f"item_{index + 1}",
+                "execution_id": execution_id
+            })
+
+        self.batches_table.insert({
+            "batch_id": batch_id,
+            "workflow_id": workflow_id,
+            "status": "pending",
+            "created_at": datetime.now().isoformat(),
+            "max_concurrency": self.max_concurrency,
+            "items": batch_items,
+            "total": len(batch_items),
+            "completed": 0,
+            "failed": 0
+        })
+        return batch_id
+
+    async def run_batch(self, batch_id: str):
+        """
+        Executes all unfinished items of a batch, at most max_concurrency at a time.
+        Also used to resume a batch interrupted by a restart: completed items are
+        skipped and interrupted executions continue from their checkpoint.
+        """
+        Batch = Query()
+        batch = self.batches_table.get(Batch.batch_id == batch_id)
+        if not batch:
+            raise ValueError(f"Batch {batch_id} not found")
+
+        self._running.add(batch_id)
+        self.batches_table.update({'status': 'running', 'started_at': datetime.now().isoformat()}, Batch.batch_id == batch_id)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        counts = {"completed": 0, "failed": 0}
+
+        async def run_item(item: Dict[str, Any]):
+            try:
+                record = self.engine.get_execution_status(item['execution_id']) or {}
+                if record.get('status') == 'completed':
+                    succeeded = True
+                elif self.job_queue is not None:
+                    succeeded = await self._run_item_on_worker(item, record)
+                else:
+                    async with semaphore:
+                        if self.engine.get_execution_checkpoint(record):
+                            await self.engine.resume_execution(item['execution_id'])
+                        else:
+                            await self.engine.run_execution(item['execution_id'], self.engine.get_execution_inputs(record))
+                    succeeded = True
+            except Exception as e:
+                print(f"[Batch] Item {item['label']} failed: {e}")
+                succeeded = False
+            counts['completed' if succeeded else 'failed'] += 1
+            self.batches_table.update(dict(counts), Batch.batch_id == batch_id)
+
+        try:
+            await asyncio.gather(*(run_item(item) for item in batch['items']))
+        finally:
+            self._running.discard(batch_id)
+
+        # The execution records are the source of truth (an item may have failed before its run started)
+        final = self._count_outcomes(batch)
+        self.batches_table.update({
+            **final,
+            'status': 'completed' if final['failed'] == 0 else 'completed_with_errors',
+            'end_time': datetime.now().isoformat()
+        }, Batch.batch_id == batch_id)
+        print(f"[Batch] Batch {batch_id} finished: {final}")
+
+    def is_running(self, batch_id: str) -> bool:
+        """True while run_batch is executing the batch in this process."""
+        return batch_id in self._running
+
+    def _count_outcomes(self, batch: Dict[str, Any]) -> Dict[str, int]:
+        completed = sum(
+            1 for item in batch['items']
+            if (self.engine.get_execution_status(item['execution_id']) or {}).get('status') == 'completed'
+        )
+        return {"completed": completed, "failed": len(batch['items']) - completed}
+
+    async def _run_item_on_worker(self, item: Dict[str, Any], record: Dict[str, Any]) -> bool:
+        """
+        Enqueues the item's execution for the worker tier and waits until it finishes.
+        A job still queued or running from an interrupted batch run is awaited instead.
+        """
+        job = self.job_queue.get(record['job_id']) if record.get('job_id') else None
+        if job and job['status'] in (QUEUED, RUNNING):
+            job_id = job['id']
+        else:
+            kind = RESUME_EXECUTION if self.engine.get_execution_checkpoint(record) else RUN_EXECUTION
+            job_id = self.job_queue.enqueue(kind, {"execution_id": item['execution_id']})
+            self.engine.executions_table.update({'job_id': job_id}, Query().execution_id == item['execution_id'])
+
+        # Wait for the job, not the record: a resumed item's record says 'failed' until a worker picks it up
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            job = self.job_queue.get(job_id)
+            if job and job['status'] == FAILED:
+                print(f"[Batch] Item {item['label']} failed: {job.get('error')}")
+                return False
+            if not job or job['status'] == DONE:
+                record = self.engine.get_execution_status(item['execution_id']) or {}
+                return record.get('status') == 'completed'
+
+    def get_batch_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the batch record with live per-item status and aggregate progress.
+        """
+        batch = self.batches_table.get(Query().batch_id == batch_id)
+        if not batch:
+            return None
+
+        items = []
+        progress = {"total": len(batch['items']), "pending": 0, "running": 0, "completed": 0, "failed": 0}
+        for item in batch['items']:
+            record = self.engine.get_execution_status(item['execution_id']) or {}
+            status = record.get('status', 'pending')
+            progress[status if status in progress else 'pending'] += 1
+            items.append({
+                **item,
+                "status": status,
+                "current_step": record.get('current_step'),
+                "error": record.get('error')
+            })
+
+        done = progress['completed'] + progress['failed']
+        progress['percent'] = round(100 * done / progress['total'], 1) if progress['total'] else 100.0
+
+        return {**dict(batch), "items": items, "progress": progress}
+
+    def export_results(self, batch_id: str, fmt: str = "json") -> Optional[Any]:
+        """
+        Combines the public results of all items into one export (list of rows as JSON, or CSV text).
+        """
+        batch = self.batches_table.get(Query().batch_id == batch_id)
+        if not batch:
+            return None
+
+        rows = []
+        for item in batch['items']:
+            record = self.engine.get_execution_status(item['execution_id']) or {}
+            rows.append({
+                "label": item['label'],
+                "execution_id": item['execution_id'],
+                "status": record.get('status'),
+                "error": record.get('error'),
+                "result": record.get('result') or {}
+            })
+
+        if fmt == "json":
+            return rows
+        if fmt != "csv":
+            raise ValueError(f"Unsupported export format: {fmt}")
+
+        result_keys = sorted({key for row in rows for key in row['result']})
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["label", "execution_id", "status", "error"] + result_keys)
+        for row in rows:
+            values = [row['result'].get(key) for key in result_keys]
+            writer.writerow(
+                [row['label'], row['execution_id'], row['status'], row['error']]
+                + [json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v for v in values]
+            )
+        return buffer.getvalue()
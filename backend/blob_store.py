@@ -0,0 +1,76 @@
+import os
+import json
+import gzip
+import hashlib
+import tempfile
+from typing import Any, Dict
+
+
+class BlobStore:
+    """
+    Content-addressed store for large JSON payloads (execution traces, inputs).
+    Each blob is gzip-compressed and stored as <root>/<sha[:2]>/<sha>.json.gz,
+    so identical payloads are written only once.
+    """
+
+    def __init__(self, root: str, compression_level: int = 6):
+        self.root = root
+        self.compression_level = compression_level
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, ref: str) -> str:
+        if not ref or not all(c in "0123456789abcdef" for c in ref):
+            raise ValueError(f"Invalid blob reference: {ref!r}")
+        return os.path.join(self.root, ref[:2], f"{ref}.json.gz")
+
+    def put(self, obj: Any) -> str:
+        """
+        Stores a JSON-serializable object and returns its reference (sha256 of the JSON).
+        """
+        payload = json.dumps(obj, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ref = hashlib.sha256(payload).hexdigest()
+        path = self._path(ref)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file first so readers never see a partial blob
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(gzip.compress(payload, compresslevel=self.compression_level))
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return ref
+
+    def get(self, ref: str) -> Any:
+        """
+        Loads a blob by reference. Raises FileNotFoundError if it does not exist.
+        """
+        with open(self._path(ref), "rb") as handle:
+            return json.loads(gzip.decompress(handle.read()).decode("utf-8"))
+
+    def exists(self, ref: str) -> bool:
+        return os.path.exists(self._path(ref))
+
+    def size(self, ref: str) -> int:
+        """Compressed size of the blob on disk (bytes)."""
+        return os.path.getsize(self._path(ref))
+
+
+def summarize_inputs(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Small, row-friendly description of execution inputs: text fields are
+    reduced to their length, everything else is kept if it is a scalar.
+    """
+    summary = {}
+    for key, value in (inputs or {}).items():
+        if isinstance(value, str):
+            summary[key] = {"chars": len(value)}
+        elif isinstance(value, (list, dict)):
+            summary[key] = {"items": len(value)}
+        else:
+            summary[key] = value
+    return summary
@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -7,6 +8,9 @@ load_dotenv()
 # --- Mock Configuration ---
 # Set to True to use the Mock LLM Service (no API costs)
 USE_MOCK_LLM = os.getenv("USE_MOCK_LLM", "False").lower() == "true"
+# Simulated latency of each mock call (see backend/mock_llm.py LatencyModel):
+# "fixed:S", "uniform:LO:HI", "normal:MEAN:STD" or "lognormal:MEDIAN:SIGMA", in seconds
+MOCK_LLM_LATENCY = os.getenv("MOCK_LLM_LATENCY", "fixed:0.5")
 
 # Set to True to use the Mock Database (TinyDB)
 # Set to False to use the Real Database (Firebase - Future Implementation)
@@ -21,6 +25,43 @@ LLM_DEFAULT_TIMEOUT = float(os.getenv("LLM_DEFAULT_TIMEOUT", "30.0"))
 LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
 LLM_RETRY_DELAY = float(os.getenv("LLM_RETRY_DELAY", "1.0"))
 
+# --- LLM Response Cache ---
+# Content-addressed cache in front of LLMProvider.generate (opt-in).
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "False").lower() == "true"
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "604800"))  # seconds, 0 = never expire
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+# --- Provider Context Caching ---
+# Serve the shared prompt prefix (common system prompt components + submission
+# texts) from a provider-side cache: explicit cached contents on Gemini, prompt
+# caching on OpenAI, simulated on the mock provider (opt-in).
+LLM_CONTEXT_CACHE_ENABLED = os.getenv("LLM_CONTEXT_CACHE_ENABLED", "False").lower() == "true"
+LLM_CONTEXT_CACHE_TTL = float(os.getenv("LLM_CONTEXT_CACHE_TTL", "600"))  # seconds a cache handle lives
+# Prefixes with fewer (estimated) tokens are sent uncached; providers reject smaller caches
+LLM_CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("LLM_CONTEXT_CACHE_MIN_TOKENS", "1024"))
+
+# Stream the responses of agents with long outputs (streams_output, e.g. Judge and
+# XAI Reporter) and publish their fields as step_partial events while they are
+# generated (see src/components/json_stream.py). Truncated output fails at once.
+LLM_STREAMING_ENABLED = os.getenv("LLM_STREAMING_ENABLED", "False").lower() == "true"
+
+# --- LLM Rate Limiting ---
+# Process-wide admission control shared by all providers (0 = unlimited).
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_RPM_LIMIT = float(os.getenv("LLM_RPM_LIMIT", "0"))  # requests per minute, per model
+LLM_TPM_LIMIT = float(os.getenv("LLM_TPM_LIMIT", "0"))  # estimated tokens per minute, per model
+# Per-model overrides, e.g. {"gemini-2.5-pro": {"rpm": 150, "tpm": 2000000}}
+LLM_MODEL_RATE_LIMITS = json.loads(os.getenv("LLM_MODEL_RATE_LIMITS", "{}"))
+
+# --- Batch Evaluation ---
+# Executions a batch runs at the same time (LLM quota is still enforced by the rate limiter).
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+
+# --- Engine Settings ---
+# Run steps with disjoint state dependencies concurrently (asyncio.gather).
+# Set to False to force strictly sequential execution (useful for debugging).
+ENGINE_PARALLEL_STEPS = os.getenv("ENGINE_PARALLEL_STEPS", "True").lower() == "true"
+
 # --- Paths ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(os.path.dirname(BASE_DIR), "data")
@@ -35,6 +76,7 @@ else:
     DB_PATH = PROD_DB_PATH
     print(f"CONFIG: Using REAL DB at {DB_PATH}")
 MOCK_RESPONSES_PATH = os.path.join(DATA_DIR, "mock_responses.json")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(DATA_DIR, "llm_cache.sqlite"))
 
 def get_db_path():
     """Returns the path to the database file."""
@@ -0,0 +1,158 @@
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from backend.rate_limiter import estimate_tokens
+
+
+class PromptPrefix:
+    """
+    Leading part of an LLM request that is identical across the steps of a
+    workflow: the system prompt components every step starts with, and the
+    submission texts the agent works on. Providers send it before the
+    step-specific instruction and prompt, so it can be served from a
+    provider-side context cache (see ContextCacheRegistry).
+    """
+    __slots__ = ("system", "context", "_key")
+
+    def __init__(self, system: Optional[str] = None, context: Optional[str] = None):
+        self.system = system or ""
+        self.context = context or ""
+        self._key: Optional[str] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.system or self.context)
+
+    @property
+    def key(self) -> str:
+        if self._key is None:
+            self._key = hashlib.sha256(f"{self.system}\x00{self.context}".encode("utf-8")).hexdigest()
+        return self._key
+
+    def estimated_tokens(self) -> int:
+        return estimate_tokens(self.system, self.context)
+
+    def apply(self, system_instruction: Optional[str], prompt: str) -> Tuple[Optional[str], str]:
+        """(system instruction, prompt) of a request that does not use a context cache: prefix parts first."""
+        system = "\n\n".join(part for part in (self.system, system_instruction) if part) or None
+        return system, "\n\n".join(part for part in (self.context, prompt) if part)
+
+
+class ContextCacheHandle:
+    __slots__ = ("provider", "model", "key", "name", "tokens", "created_at", "expires_at", "hits", "resource")
+
+    def __init__(self, provider: str, model: str, key: str, name: str, ttl_seconds: float, tokens: int, resource: Any = None):
+        self.provider = provider
+        self.model = model
+        self.key = key
+        self.name = name  # provider-side id (Gemini cachedContents/..., OpenAI prompt_cache_key)
+        self.tokens = tokens
+        self.created_at = time.time()
+        self.expires_at = self.created_at + ttl_seconds
+        self.hits = 0
+        self.resource = resource  # provider object reused for requests (Gemini CachedContent)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "key": self.key[:16],
+            "name": self.name,
+            "tokens": self.tokens,
+            "hits": self.hits,
+            "expires_in_seconds": round(self.expires_at - time.time(), 1)
+        }
+
+
+class ContextCacheRegistry:
+    """
+    Process-local registry of provider-side context caches, keyed on
+    (provider, model, prefix key). Handles are dropped EXPIRY_MARGIN seconds
+    before their TTL runs out, so a request never references a cache the
+    provider has already deleted. Creation is single-flight per key: steps
+    that start together share one cache instead of each creating their own.
+    """
+
+    EXPIRY_MARGIN = 10.0
+
+    def __init__(self):
+        self._handles: Dict[Tuple[str, str, str], ContextCacheHandle] = {}
+        self._creation_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.cached_tokens = 0  # prefix tokens served from a cache
+
+    def get(self, provider: str, model: str, key: str, count: bool = True) -> Optional[ContextCacheHandle]:
+        with self._lock:
+            handle = self._handles.get((provider, model, key))
+            if handle is not None and time.time() >= handle.expires_at - self.EXPIRY_MARGIN:
+                del self._handles[(provider, model, key)]
+                handle = None
+            if count:
+                if handle is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    handle.hits += 1
+                    self.cached_tokens += handle.tokens
+            return handle
+
+    def put(self, provider: str, model: str, key: str, name: str, ttl_seconds: float, tokens: int,
+            resource: Any = None) -> ContextCacheHandle:
+        handle = ContextCacheHandle(provider, model, key, name, ttl_seconds, tokens, resource)
+        with self._lock:
+            now = time.time()
+            # Drop expired handles; they can never be hit again
+            self._handles = {k: h for k, h in self._handles.items() if h.expires_at - self.EXPIRY_MARGIN > now}
+            # Creation locks are only needed while a creation is in flight
+            self._creation_locks = {k: lock for k, lock in self._creation_locks.items() if lock.locked()}
+            self._handles[(provider, model, key)] = handle
+            self.created += 1
+        return handle
+
+    def invalidate(self, provider: str, model: str, key: str):
+        """Forget a handle the provider no longer knows (deleted or expired early)."""
+        with self._lock:
+            self._handles.pop((provider, model, key), None)
+
+    def creation_lock(self, provider: str, model: str, key: str) -> threading.Lock:
+        with self._lock:
+            return self._creation_locks.setdefault((provider, model, key), threading.Lock())
+
+    def clear(self):
+        with self._lock:
+            self._handles.clear()
+            self._creation_locks.clear()
+            self.hits = self.misses = self.created = self.cached_tokens = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            now = time.time()
+            return {
+                "entries": sum(1 for h in self._handles.values() if h.expires_at - self.EXPIRY_MARGIN > now),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "created": self.created,
+                "cached_tokens": self.cached_tokens,
+                "handles": [h.to_dict() for h in self._handles.values() if h.expires_at - self.EXPIRY_MARGIN > now]
+            }
+
+
+_registry_instance: Optional[ContextCacheRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_context_cache_registry() -> ContextCacheRegistry:
+    """
+    Returns the process-wide registry shared by all providers (created on first use).
+    """
+    global _registry_instance
+    with _registry_lock:
+        if _registry_instance is None:
+            _registry_instance = ContextCacheRegistry()
+        return _registry_instance
@@ -1,6 +1,5 @@
 import io
 import docx
-import PyPDF2
 import re
 from typing import Tuple, Dict, Any
 
@@ -61,26 +60,11 @@ class DataHandler:
                 return str(uploaded_file)
 
     def _read_pdf(self, file_obj) -> str:
-        """Reads text from PDF using pdfplumber (robust)."""
+        """Reads text from PDF via the shared extraction service (cached, page-parallel)."""
         try:
-            import pdfplumber
-            text = ""
-            with pdfplumber.open(file_obj) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            return text
-        except ImportError:
-             # Fallback to PyPDF2 if pdfplumber is not installed
-             try:
-                reader = PyPDF2.PdfReader(file_obj)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
-             except Exception as e:
-                 return f"Error reading PDF file (PyPDF2): {str(e)}"
+            from src.components.pdf_extraction import get_pdf_extractor
+            file_obj.seek(0)
+            return get_pdf_extractor().extract_text(file_obj.read())
         except Exception as e:
             return f"Error reading PDF file: {str(e)}"
 
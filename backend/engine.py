@@ -1,9 +1,20 @@
+import os
 import uuid
+import asyncio
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-from tinydb import TinyDB, Query
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+from tinydb import Query
+from src.database.sqlite_storage import open_database
 
+from backend.blob_store import BlobStore, summarize_inputs
+from backend.events import event_bus, partial_output
+from backend.gating import GatingPolicy
+from backend.prompt_cache import prompt_cache
 from backend.state import WorkflowState, InputData
+from src.engine.usage import collect_usage, summarize_calls, rollup_steps, rollup_executions
+from src.components.metrics import registry
+from src.components.tracing import start_trace, start_span, get_exporter, build_timeline
+from src.engine.model_routing import RoutingPolicy, routing_policy, current_policy, use_route
 from backend.agents.guard import GuardAgent
 from backend.agents.analyst import AnalystAgent
 from backend.agents.logician import LogicianAgent
@@ -16,11 +27,25 @@ from backend.agents.critics import (
 from backend.agents.judge import JudgeAgent
 from backend.agents.xai import XAIReporterAgent
 from backend.agents.xai import XAIReporterAgent
+STEP_SECONDS = registry.histogram(
+    "quorum_step_duration_seconds", "Wall time of workflow steps (hooks and LLM calls included).",
+    ("step_id", "agent", "status"))
+HOOK_SECONDS = registry.histogram(
+    "quorum_hook_duration_seconds", "Wall time of agent hooks.", ("hook", "agent", "status"))
+ACTIVE_EXECUTIONS = registry.gauge(
+    "quorum_active_executions", "Executions currently running in this process.")
+EXECUTIONS_TOTAL = registry.counter(
+    "quorum_executions_total", "Finished executions by outcome.", ("status",))
+
 
 class WorkflowEngine:
     def __init__(self, db_path: str):
         self.db_path = db_path
-        self.db = TinyDB(db_path, encoding='utf-8')
+        self.db = open_database(db_path, encoding='utf-8')
+        # Large payloads (inputs, traces) live outside the executions table
+        self.blob_store = BlobStore(os.path.join(os.path.dirname(os.path.abspath(db_path)), 'blobs'))
+        # Live progress events (GET /executions/{id}/events)
+        self.event_bus = event_bus
         
         # Initialize Tables
         self.components_table = self.db.table('components')
@@ -87,7 +112,9 @@ class WorkflowEngine:
             "workflow_id": workflow_id,
             "status": "pending",
             "start_time": datetime.now().isoformat(),
-            "inputs": inputs, # Save inputs for debugging/restart
+            # Inputs are kept in the blob store for debugging/restart; the row only has a summary
+            "inputs_ref": self.blob_store.put(inputs),
+            "inputs_summary": summarize_inputs(inputs),
             "logs": []
         })
         return execution_id
@@ -103,6 +130,80 @@ class WorkflowEngine:
             return result[0]
         return None
 
+    def get_execution_inputs(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Loads the raw inputs of an execution record (inline for legacy records).
+        """
+        if record.get('inputs_ref'):
+            return self.blob_store.get(record['inputs_ref'])
+        return record.get('inputs') or {}
+
+    def get_execution_trace(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Loads the full WorkflowState trace of a completed execution, or None if there is none.
+        """
+        record = self.get_execution_status(execution_id)
+        if not record:
+            return None
+        if record.get('trace_ref'):
+            return self.blob_store.get(record['trace_ref'])
+        return record.get('trace')
+
+    def get_execution_checkpoint(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Loads the last checkpoint (a WorkflowState dump) of an execution record,
+        or None if there is none (inline for legacy records).
+        """
+        checkpoint = self.blob_store.get(record['checkpoint_ref']) if record.get('checkpoint_ref') else record.get('checkpoint')
+        if checkpoint and record.get('checkpoint_inputs_ref'):
+            checkpoint = dict(checkpoint, inputs=self.blob_store.get(record['checkpoint_inputs_ref']))
+        return checkpoint
+
+    def get_execution_usage(self, execution_id: str, include_calls: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        LLM usage of an execution: totals plus per-step tokens, latency, cost and retries.
+        With include_calls, each step also lists its individual LLM calls
+        (read from the trace, or the checkpoint while the run is in progress).
+        """
+        record = self.get_execution_status(execution_id)
+        if not record:
+            return None
+
+        usage = dict(record.get('usage') or rollup_steps({}))
+        if include_calls:
+            state = self.get_execution_trace(execution_id) or self.get_execution_checkpoint(record) or {}
+            usage['steps'] = {
+                step_id: dict(step, call_log=(state.get('usage', {}).get(step_id) or {}).get('call_log', []))
+                for step_id, step in usage['steps'].items()
+            }
+        return dict(usage, execution_id=execution_id, workflow_id=record.get('workflow_id'), status=record.get('status'))
+
+    def get_workflow_usage(self, workflow_id: str) -> Dict[str, Any]:
+        """
+        Usage rollup over all executions of a workflow that recorded usage.
+        """
+        Execution = Query()
+        records = self.executions_table.search(Execution.workflow_id == workflow_id)
+        usages = [record['usage'] for record in records if record.get('usage')]
+        return dict(rollup_executions(usages), workflow_id=workflow_id)
+
+    def get_execution_timeline(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Waterfall of the execution's exported spans (see src/components/tracing.py):
+        one trace per run, resumes included.
+        """
+        record = self.get_execution_status(execution_id)
+        if not record:
+            return None
+        exporter = get_exporter()
+        spans = exporter.read(execution_id) if exporter else []
+        return {
+            "execution_id": execution_id,
+            "status": record.get('status'),
+            "tracing_enabled": exporter is not None,
+            "traces": build_timeline(spans)
+        }
+
     def preview_step_prompt(self, step_id: str) -> Dict[str, Any]:
         # Placeholder for legacy UI compatibility
         return {"preview": "Prompt preview not available in V2 Engine yet.", "error": None}
@@ -113,27 +214,65 @@ class WorkflowEngine:
 
     def _construct_prompt_for_step(self, step_id: str) -> str:
         """
-        Fetches the step configuration and constructs the full system prompt
-        by concatenating the content of all referenced prompt components.
-        Also inspects for placeholders like {{BANNED_PHRASES}}.
+        Returns the full system prompt of a step: the content of all referenced
+        prompt components concatenated, with {{BANNED_PHRASES}} and
+        {{CURRENT_DATE}} substituted.
+        """
+        return "\n\n".join(part for part in self._construct_prompt_parts_for_step(step_id) if part)
+
+    def _construct_prompt_parts_for_step(self, step_id: str) -> Tuple[str, str]:
+        """
+        Returns the system prompt of a step split into (shared prefix, step-specific
+        part). The prefix is made of the leading components all steps have in
+        common (mandates, rules, protocols), so providers can cache it across steps.
+        Compiled prompts are cached (see backend/prompt_cache.py) until
+        components, steps or banned phrases change.
         """
+        cached = prompt_cache.get(self.db_path, step_id)
+        if cached is not None:
+            return cached
+
+        parts = self._compile_prompt_for_step(step_id)
+        if any(parts):
+            prompt_cache.put(self.db_path, step_id, parts)
+        return parts
+
+    def _shared_prompt_prefix_length(self) -> int:
+        """Number of leading llm_prompts components that every step with prompts shares."""
+        sequences = [
+            (step.get('execution_config') or {}).get('llm_prompts') or []
+            for step in self.steps_table.all()
+        ]
+        sequences = [sequence for sequence in sequences if sequence]
+        if not sequences:
+            return 0
+        length = 0
+        for ids in zip(*sequences):
+            if len(set(ids)) != 1:
+                break
+            length += 1
+        return length
+
+    def _compile_prompt_for_step(self, step_id: str) -> Tuple[str, str]:
         try:
             Step = Query()
             step_record = self.steps_table.search(Step.id == step_id)
             if not step_record:
-                return ""
+                return "", ""
             
             step_data = step_record[0]
             exec_config = step_data.get('execution_config', {})
             prompt_ids = exec_config.get('llm_prompts', [])
+            shared_length = self._shared_prompt_prefix_length()
             
-            full_prompt_parts = []
+            prefix_parts = []
+            step_parts = []
             Component = Query()
             
             # Pre-fetch banned phrases if needed
             banned_phrases_list = []
             
-            for pid in prompt_ids:
+            for index, pid in enumerate(prompt_ids):
                 comp = self.components_table.search(Component.id == pid)
                 if comp:
                     content = comp[0].get('content', '')
@@ -148,23 +287,41 @@ class WorkflowEngine:
                             
                         # Check/Replace CURRENT_DATE
                         if "{{CURRENT_DATE}}" in content:
-                            from datetime import datetime
                             now_str = datetime.now().strftime("%d.%m.%Y")
                             content = content.replace("{{CURRENT_DATE}}", now_str)
                             
-                        full_prompt_parts.append(content)
+                        (prefix_parts if index < shared_length else step_parts).append(content)
             
-            return "\n\n".join(full_prompt_parts)
+            return "\n\n".join(prefix_parts), "\n\n".join(step_parts)
         except Exception as e:
             print(f"[WorkflowEngine] Error constructing prompt for step {step_id}: {e}")
-            return ""
+            return "", ""
 
     # --- CORE EXECUTION LOGIC (V2) ---
 
-    async def run_execution(self, execution_id: str, raw_inputs: Dict[str, Any]) -> Dict[str, Any]:
+    async def run_execution(self, execution_id: str, raw_inputs: Dict[str, Any], resume_state: Optional[WorkflowState] = None) -> Dict[str, Any]:
         """
         Runs the full workflow using the new State-based architecture (Async).
+        If resume_state is given (a restored checkpoint), steps listed in its
+        completed_steps are skipped and their outputs reused.
+        Set raw_inputs["bypass_cache"] to skip the LLM response cache for this run.
         """
+        from backend.llm_cache import bypass_llm_cache
+
+        status = "failed"
+        with ACTIVE_EXECUTIONS.track_inprogress(), bypass_llm_cache(bool(raw_inputs.get('bypass_cache', False))), \
+                start_trace("execution", execution_id, resumed=resume_state is not None):
+            try:
+                result = await self._run_execution(execution_id, raw_inputs, resume_state)
+                status = "completed"
+                return result
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            finally:
+                EXECUTIONS_TOTAL.inc(status=status)
+
+    async def _run_execution(self, execution_id: str, raw_inputs: Dict[str, Any], resume_state: Optional[WorkflowState]) -> Dict[str, Any]:
         print(f"[WorkflowEngine] Starting execution {execution_id}")
         
         # Update status to running
@@ -173,20 +330,25 @@ class WorkflowEngine:
         
         # 1. Initialize State
         try:
-            input_data = InputData(
-                history_text=raw_inputs.get('history_text', ''),
-                product_text=raw_inputs.get('product_text', ''),
-                reflection_text=raw_inputs.get('reflection_text', ''),
-                bibliography_context=raw_inputs.get('bibliography_context', [])
-            )
-            
-            current_state = WorkflowState(
-                execution_id=execution_id,
-                inputs=input_data
-            )
+            if resume_state is not None:
+                current_state = resume_state
+                print(f"[WorkflowEngine] Resuming from checkpoint. Completed steps: {current_state.completed_steps}")
+            else:
+                input_data = InputData(
+                    history_text=raw_inputs.get('history_text', ''),
+                    product_text=raw_inputs.get('product_text', ''),
+                    reflection_text=raw_inputs.get('reflection_text', ''),
+                    bibliography_context=raw_inputs.get('bibliography_context', [])
+                )
+                
+                current_state = WorkflowState(
+                    execution_id=execution_id,
+                    inputs=input_data
+                )
         except Exception as e:
             print(f"[WorkflowEngine] Failed to initialize state: {e}")
             self.executions_table.update({'status': 'failed', 'error': str(e)}, Execution.execution_id == execution_id)
+            self.event_bus.publish(execution_id, 'execution_failed', error=str(e), failed_step=None)
             raise e
 
         # 2. Execute Pipeline
@@ -219,34 +381,55 @@ class WorkflowEngine:
                 raise ValueError(f"No steps defined for workflow {workflow_id}. Ensure the workflow is correctly seeded.")
 
 
-            for agent, step_doc in pipeline_steps:
-                step_id = step_doc['id']
-                agent_name = agent.__class__.__name__
-                current_state.current_step_name = agent_name
-                print(f"[WorkflowEngine] Running step: {agent_name} (Step ID: {step_id})")
-                
-                # Construct data-driven prompt
-                system_instruction = self._construct_prompt_for_step(step_id) if step_id else None
-                
-                # --- EXECUTE PRE-HOOKS ---
-                config = step_doc.get('execution_config') or {}
-                pre_hooks = config.get('pre_hooks') or []
-                for hook_name in pre_hooks:
-                    current_state = self._execute_hook(hook_name, agent, current_state)
-
-                # Execute agent (ASYNC AWAIT)
-                current_state = await agent.execute(current_state, system_instruction=system_instruction)
-
-                # --- EXECUTE POST-HOOKS ---
-                post_hooks = config.get('post_hooks') or []
-                for hook_name in post_hooks:
-                    current_state = self._execute_hook(hook_name, agent, current_state)
-
-                # Update DB with progress
-                self.executions_table.update({
-                    'current_step': agent_name,
-                    'last_updated': datetime.now().isoformat()
-                }, Execution.execution_id == execution_id)
+            remaining_steps = [
+                (agent, step_doc) for agent, step_doc in pipeline_steps
+                if step_doc['id'] not in current_state.completed_steps
+            ]
+            if len(remaining_steps) < len(pipeline_steps):
+                print(f"[WorkflowEngine] Skipping {len(pipeline_steps) - len(remaining_steps)} completed steps.")
+
+            # Gating rules (backend/gating.py) can stop the run or skip steps based on earlier output
+            gating = GatingPolicy.for_workflow(wf_record[0] if wf_record else None, [step_doc['id'] for _, step_doc in pipeline_steps])
+            skipped = self._apply_gating(execution_id, gating, current_state)
+            stages = self._plan_stages(
+                [(agent, step_doc) for agent, step_doc in remaining_steps if step_doc['id'] not in skipped],
+                barriers=gating.checkpoints
+            )
+            self.event_bus.publish(
+                execution_id, 'execution_started',
+                total_steps=len(pipeline_steps),
+                completed_steps=list(current_state.completed_steps),
+                stages=[[step_doc['id'] for _, step_doc in stage] for stage in stages]
+            )
+
+            # Workflow model mapping and fallback chains apply to every step (see _run_step_body)
+            with routing_policy(RoutingPolicy(wf_record[0] if wf_record else None)):
+                for stage in stages:
+                    stage = [(agent, step_doc) for agent, step_doc in stage if step_doc['id'] not in skipped]
+                    if not stage:
+                        continue
+                    stage_names = [agent.__class__.__name__ for agent, _ in stage]
+                    current_state.current_step_name = ", ".join(stage_names)
+
+                    if len(stage) == 1:
+                        agent, step_doc = stage[0]
+                        current_state = await self._run_step(agent, step_doc, current_state)
+                    else:
+                        # Independent steps: they only read earlier state and write disjoint fields,
+                        # so they can share the same state object safely on the event loop.
+                        # Siblings of a failing step are allowed to finish so their results are checkpointed.
+                        print(f"[WorkflowEngine] Running {len(stage)} independent steps concurrently: {stage_names}")
+                        results = await asyncio.gather(
+                            *[self._run_step(agent, step_doc, current_state) for agent, step_doc in stage],
+                            return_exceptions=True
+                        )
+                        errors = [r for r in results if isinstance(r, BaseException)]
+                        if errors:
+                            raise errors[0]
+
+                    # Persist progress + checkpoint (with any gating decision) after every stage
+                    skipped = self._apply_gating(execution_id, gating, current_state)
+                    self._save_checkpoint(execution_id, current_state)
 
             # 3. Success
             print(f"[WorkflowEngine] Execution {execution_id} completed successfully.")
@@ -300,43 +483,291 @@ class WorkflowEngine:
                         # Add to public result keys
                         public_result[target_key] = val
 
+            # A gated run reports why it ended early / which steps it skipped
+            if current_state.aux_data.get('gating'):
+                public_result['gating'] = current_state.aux_data['gating']
+
             # Update DB with strict result
+            trace_ref = self.blob_store.put(full_state)
             self.executions_table.update({
                 'status': 'completed',
                 'end_time': datetime.now().isoformat(),
                 'result': public_result,
-                # Save full trace for detailed audit/debugging
-                'trace': full_state 
+                # Full trace for detailed audit/debugging is fetched on demand (GET /executions/{id}/trace)
+                'trace_ref': trace_ref,
+                'trace_summary': {
+                    'completed_steps': list(current_state.completed_steps),
+                    'compressed_bytes': self.blob_store.size(trace_ref)
+                },
+                'usage': rollup_steps(current_state.usage),
+                # The trace supersedes the checkpoint once the run is complete
+                'checkpoint': None,
+                'checkpoint_ref': None,
+                'checkpoint_inputs_ref': None
             }, Execution.execution_id == execution_id)
+            self.event_bus.publish(execution_id, 'execution_completed', result=public_result)
             
             return public_result
 
         except Exception as e:
             print(f"[WorkflowEngine] Pipeline crashed at {current_state.current_step_name}: {e}")
+            # Keep whatever finished so the execution can be resumed
+            self._save_checkpoint(execution_id, current_state)
             self.executions_table.update({
                 'status': 'failed',
                 'error': str(e),
                 'failed_step': current_state.current_step_name
             }, Execution.execution_id == execution_id)
+            self.event_bus.publish(execution_id, 'execution_failed', error=str(e), failed_step=current_state.current_step_name)
             raise e
 
-    def _execute_hook(self, hook_name: str, agent: Any, state: WorkflowState) -> WorkflowState:
+    async def resume_execution(self, execution_id: str) -> Dict[str, Any]:
+        """
+        Restarts a failed/interrupted execution from its last checkpoint.
+        Only the steps that have not completed are run again.
+        """
+        record = self.get_execution_status(execution_id)
+        if not record:
+            raise ValueError(f"Execution {execution_id} not found")
+
+        checkpoint = self.get_execution_checkpoint(record)
+        resume_state = WorkflowState.model_validate(checkpoint) if checkpoint else None
+
+        Execution = Query()
+        self.executions_table.update({
+            'resume_count': record.get('resume_count', 0) + 1,
+            'resumed_at': datetime.now().isoformat()
+        }, Execution.execution_id == execution_id)
+
+        return await self.run_execution(execution_id, self.get_execution_inputs(record), resume_state=resume_state)
+
+    def _save_checkpoint(self, execution_id: str, state: WorkflowState):
+        """
+        Persists the current WorkflowState so the execution can be resumed.
+        The state goes to the blob store, keeping the execution row (read by every
+        status poll) small; the (possibly sanitized) inputs are stored separately,
+        as they rarely change between stages and content addressing stores them once.
+        """
+        Execution = Query()
+        with start_span("checkpoint"):
+            self.executions_table.update({
+                'current_step': state.current_step_name,
+                'completed_steps': list(state.completed_steps),
+                'checkpoint': None,
+                'checkpoint_ref': self.blob_store.put(state.model_dump(mode='json', exclude={'inputs'})),
+                'checkpoint_inputs_ref': self.blob_store.put(state.inputs.model_dump(mode='json')),
+                'usage': rollup_steps(state.usage),
+                'last_updated': datetime.now().isoformat()
+            }, Execution.execution_id == execution_id)
+
+    async def _run_step(self, agent: Any, step_doc: Dict[str, Any], state: WorkflowState) -> WorkflowState:
+        """
+        Runs a single step: prompt construction, pre-hooks, agent call and post-hooks.
+        """
+        step_id = step_doc['id']
+        agent_name = agent.__class__.__name__
+        execution_id = state.execution_id
+        print(f"[WorkflowEngine] Running step: {agent_name} (Step ID: {step_id})")
+        self.event_bus.publish(execution_id, 'step_started', step_id=step_id, agent=agent_name)
+        started = datetime.now()
+
+        with STEP_SECONDS.time(step_id=step_id, agent=agent_name, status="ok"), collect_usage() as collector, \
+                start_span("step", **{"step.id": step_id, "agent": agent_name}) as span:
+            try:
+                state = await self._run_step_body(agent, step_doc, state)
+            finally:
+                self._record_step_usage(state, step_id, agent_name, collector)
+            usage = state.usage[step_id]
+            span.set_attribute("llm.total_tokens", usage['total_tokens'])
+            span.set_attribute("llm.cost_usd", usage['cost_usd'])
+
+        self.event_bus.publish(
+            execution_id, 'step_finished',
+            step_id=step_id, agent=agent_name,
+            duration_seconds=(datetime.now() - started).total_seconds(),
+            total_tokens=usage['total_tokens'],
+            cost_usd=usage['cost_usd']
+        )
+        return state
+
+    @staticmethod
+    def _record_step_usage(state: WorkflowState, step_id: str, agent_name: str, collector):
+        """
+        Stores the LLM usage of a step on the state. Calls from an earlier,
+        failed run of the same step (before a resume) are kept, since they were paid for.
+        """
+        previous = state.usage.get(step_id) or {}
+        calls = previous.get('call_log', []) + collector.calls
+        state.usage[step_id] = dict(
+            summarize_calls(calls),
+            step_id=step_id,
+            agent=agent_name,
+            duration_seconds=round(previous.get('duration_seconds', 0.0) + collector.elapsed(), 4),
+            call_log=calls
+        )
+
+    async def _run_step_body(self, agent: Any, step_doc: Dict[str, Any], state: WorkflowState) -> WorkflowState:
+        step_id = step_doc['id']
+        agent_name = agent.__class__.__name__
+        execution_id = state.execution_id
+
+        try:
+            # Construct data-driven prompt
+            with start_span("prompt.system"):
+                system_prefix, system_instruction = self._construct_prompt_parts_for_step(step_id) if step_id else ("", None)
+
+            # --- EXECUTE PRE-HOOKS ---
+            config = step_doc.get('execution_config') or {}
+            pre_hooks = config.get('pre_hooks') or []
+            if pre_hooks:
+                with start_span("pre_hooks"):
+                    for hook_name in pre_hooks:
+                        self.event_bus.publish(execution_id, 'hook', step_id=step_id, hook=hook_name, phase='pre')
+                        state = await self._execute_hook(hook_name, agent, state)
+
+            # Execute agent (ASYNC AWAIT)
+            with start_span("agent.execute", agent=agent_name):
+                # Agents without data-driven prompts keep the (state, system_instruction) signature
+                prefix_arg = {"system_prefix": system_prefix} if system_prefix else {}
+                def publish_partial(field: str, value: Any, complete: bool):
+                    # Live only: streamed fields are superseded by step_finished and the stored result
+                    self.event_bus.publish(execution_id, 'step_partial', transient=True, step_id=step_id,
+                                           agent=agent_name, field=field, value=value, complete=complete)
+
+                with use_route(current_policy().route(step_id, getattr(agent, "model", None))), partial_output(publish_partial):
+                    state = await agent.execute(state, system_instruction=system_instruction, **prefix_arg)
+
+            # --- EXECUTE POST-HOOKS ---
+            post_hooks = config.get('post_hooks') or []
+            if post_hooks:
+                with start_span("post_hooks"):
+                    for hook_name in post_hooks:
+                        self.event_bus.publish(execution_id, 'hook', step_id=step_id, hook=hook_name, phase='post')
+                        state = await self._execute_hook(hook_name, agent, state)
+
+            state.completed_steps.append(step_id)
+        except Exception as e:
+            # Pin the failure to this step (a concurrent stage reports several names)
+            state.current_step_name = agent_name
+            self.event_bus.publish(execution_id, 'step_failed', step_id=step_id, agent=agent_name, error=str(e))
+            raise
+
+        return state
+
+    def _apply_gating(self, execution_id: str, gating: GatingPolicy, state: WorkflowState) -> Set[str]:
+        """
+        Fires the gating rules that hold on the current state. Decisions are kept in
+        aux_data['gating'] (so a resumed run honours them); returns all skipped step ids.
+        """
+        decisions = state.aux_data.get('gating', [])
+        while True:
+            decision = gating.evaluate(state, [d['rule'] for d in decisions])
+            if decision is None:
+                break
+            decisions.append(decision)
+            state.aux_data['gating'] = decisions
+            print(f"[WorkflowEngine] Gating rule '{decision['rule']}' ({decision['reason']}): "
+                  f"{decision['action']}, skipping {decision['skipped_steps']}")
+            self.event_bus.publish(execution_id, 'execution_gated', **decision)
+        return {step_id for d in decisions for step_id in d['skipped_steps']}
+
+    def _plan_stages(self, pipeline_steps: List[Tuple[Any, Dict[str, Any]]], barriers: Iterable[str] = ()) -> List[List[Tuple[Any, Dict[str, Any]]]]:
+        """
+        Groups the pipeline into stages of mutually independent steps.
+
+        A step depends on an earlier step if either one writes a state field the other
+        reads or writes, or if it lists the earlier step in its 'depends_on'.
+        Steps after a barrier (a step a gating rule waits for) depend on it.
+        Each step is placed in the stage after its latest dependency, so the
+        workflow order is preserved wherever it matters.
+        """
+        from backend.config import ENGINE_PARALLEL_STEPS
+
+        stage_of: List[int] = []
+        for i, (agent, step_doc) in enumerate(pipeline_steps):
+            if not ENGINE_PARALLEL_STEPS:
+                stage_of.append(i)
+                continue
+
+            stage = 0
+            for j in range(i):
+                if pipeline_steps[j][1].get('id') in barriers or self._steps_depend(pipeline_steps[j], pipeline_steps[i]):
+                    stage = max(stage, stage_of[j] + 1)
+            stage_of.append(stage)
+
+        stages: List[List[Tuple[Any, Dict[str, Any]]]] = [[] for _ in range(max(stage_of, default=-1) + 1)]
+        for step, stage in zip(pipeline_steps, stage_of):
+            stages[stage].append(step)
+        return stages
+
+    @staticmethod
+    def _step_fields(agent: Any, step_doc: Dict[str, Any], kind: str) -> Optional[Tuple[str, ...]]:
+        """
+        Returns the declared 'reads' or 'writes' of a step.
+        A declaration on the step record overrides the agent's class attribute.
+        """
+        fields = step_doc.get(kind)
+        if fields is None:
+            fields = getattr(agent, kind, None)
+        return tuple(fields) if fields is not None else None
+
+    @classmethod
+    def _steps_depend(cls, earlier: Tuple[Any, Dict[str, Any]], later: Tuple[Any, Dict[str, Any]]) -> bool:
+        """
+        True if 'later' must wait for 'earlier' to finish.
+        """
+        earlier_agent, earlier_doc = earlier
+        later_agent, later_doc = later
+
+        if earlier_doc.get('id') in (later_doc.get('depends_on') or []):
+            return True
+
+        earlier_reads = cls._step_fields(earlier_agent, earlier_doc, 'reads')
+        earlier_writes = cls._step_fields(earlier_agent, earlier_doc, 'writes')
+        later_reads = cls._step_fields(later_agent, later_doc, 'reads')
+        later_writes = cls._step_fields(later_agent, later_doc, 'writes')
+
+        # Undeclared dependencies act as a barrier
+        if None in (earlier_reads, earlier_writes, later_reads, later_writes):
+            return True
+
+        def overlap(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+            for x in a:
+                for y in b:
+                    if x == y or x.startswith(y + '.') or y.startswith(x + '.'):
+                        return True
+            return False
+
+        return (
+            overlap(earlier_writes, later_reads)      # read-after-write
+            or overlap(earlier_writes, later_writes)  # write-after-write
+            or overlap(earlier_reads, later_writes)   # write-after-read
+        )
+
+    async def _execute_hook(self, hook_name: str, agent: Any, state: WorkflowState) -> WorkflowState:
         """
         Executes a hook (Agent-method ONLY).
         
         Strict Policy:
         1. Only execute methods defined on the Agent class.
         2. Do NOT execute global hooks that might replace internal logic (e.g. parsers).
+
+        Hooks are synchronous and may block (e.g. FactualOverseerAgent.execute_google_search
+        calls the search API), so they run in a thread and the steps of a concurrent stage keep going.
         """
         # 1. Agent Method Check
         if hasattr(agent, hook_name):
             print(f"[WorkflowEngine] Executing Hook: {agent.__class__.__name__}.{hook_name}")
-            try:
-                hook_method = getattr(agent, hook_name)
-                return hook_method(state)
-            except Exception as e:
-                print(f"[WorkflowEngine] Hook {hook_name} failed: {e}")
-                return state
+            with HOOK_SECONDS.time(hook=hook_name, agent=agent.__class__.__name__, status="ok") as labels, \
+                    start_span("hook", hook=hook_name) as span:
+                try:
+                    hook_method = getattr(agent, hook_name)
+                    return await asyncio.to_thread(hook_method, state)
+                except Exception as e:
+                    labels["status"] = "error"
+                    span.set_error(e)
+                    print(f"[WorkflowEngine] Hook {hook_name} failed: {e}")
+                    return state
         
         # 2. Strict Rejection
         else:
@@ -0,0 +1,156 @@
+import time
+import asyncio
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+# Event types that end an execution's stream
+TERMINAL_EVENTS = ("execution_completed", "execution_failed")
+
+
+class ExecutionEventBus:
+    """
+    In-process pub/sub for execution progress events.
+
+    The engine publishes events (step_started, step_finished, hook, ...) as they
+    happen; subscribers (the SSE endpoint) receive them without reading the DB.
+    The most recent events of each execution are kept so late subscribers and
+    reconnecting clients (Last-Event-ID) can catch up; the history holds the
+    latest run only (execution_started resets it, e.g. on resume). Transient events (e.g. the
+    step_partial stream of a generating step) only go to live subscribers, so
+    they cannot push the progress events out of that history.
+    """
+
+    def __init__(self, history_size: int = 500, max_executions: int = 200):
+        self.history_size = history_size
+        self.max_executions = max_executions
+        self._history: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+        # Called with every non-transient event; worker processes relay them to the API (see backend/worker.py)
+        self.relay: Optional[Callable[[Dict[str, Any]], None]] = None
+
+    def publish(self, execution_id: str, event_type: str, *, transient: bool = False, **data: Any) -> Dict[str, Any]:
+        with self._lock:
+            self._sequence += 1
+            event = {
+                "id": self._sequence,
+                "type": event_type,
+                "execution_id": execution_id,
+                "timestamp": time.time(),
+                **data
+            }
+
+            if not transient:
+                history = self._history.get(execution_id)
+                if history is not None and event_type == "execution_started":
+                    # A resumed run starts a fresh stream: replaying the previous run's
+                    # terminal event would end a new subscriber's stream at once
+                    history.clear()
+                if history is None:
+                    history = self._history[execution_id] = deque(maxlen=self.history_size)
+                    while len(self._history) > self.max_executions:
+                        self._history.popitem(last=False)
+                else:
+                    self._history.move_to_end(execution_id)
+                history.append(event)
+
+            subscribers = list(self._subscribers.get(execution_id, []))
+
+        if self.relay is not None and not transient:
+            try:
+                self.relay(event)
+            except Exception as e:
+                print(f"[EventBus] Failed to relay {event_type} of {execution_id}: {e}")
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # Subscriber's loop is already closed
+                pass
+        return event
+
+    def history(self, execution_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [e for e in self._history.get(execution_id, ()) if e["id"] > after_id]
+
+    def has_history(self, execution_id: str) -> bool:
+        with self._lock:
+            return execution_id in self._history
+
+    async def subscribe(
+        self,
+        execution_id: str,
+        after_id: int = 0,
+        keepalive: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yields past events after `after_id`, then live events until the execution ends.
+        With `keepalive`, yields None whenever no event arrived for that many seconds.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        entry = (asyncio.get_running_loop(), queue)
+
+        with self._lock:
+            # Register before reading history so nothing published in between is lost
+            self._subscribers.setdefault(execution_id, []).append(entry)
+            backlog = [e for e in self._history.get(execution_id, ()) if e["id"] > after_id]
+
+        try:
+            last_id = after_id
+            for event in backlog:
+                last_id = event["id"]
+                yield event
+                if event["type"] in TERMINAL_EVENTS:
+                    return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                if event["id"] <= last_id:
+                    continue  # already delivered from the backlog
+                last_id = event["id"]
+                yield event
+                if event["type"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(execution_id, [])
+                if entry in subscribers:
+                    subscribers.remove(entry)
+                if not subscribers:
+                    self._subscribers.pop(execution_id, None)
+
+    def subscriber_count(self, execution_id: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(execution_id, []))
+
+
+event_bus = ExecutionEventBus()
+
+
+# Receiver of the running step's streamed output fields, (path, value so far, complete).
+# Set by the engine around each step; agents with streams_output pass it to their provider.
+_partial_output: contextvars.ContextVar[Optional[Callable[[str, Any, bool], None]]] = contextvars.ContextVar(
+    "partial_output", default=None)
+
+
+@contextmanager
+def partial_output(callback: Optional[Callable[[str, Any, bool], None]]) -> Iterator[None]:
+    token = _partial_output.set(callback)
+    try:
+        yield
+    finally:
+        _partial_output.reset(token)
+
+
+def current_partial_output() -> Optional[Callable[[str, Any, bool], None]]:
+    return _partial_output.get()
@@ -2,6 +2,7 @@ import json
 import os
 import sys
 from tinydb import TinyDB, Query
+from src.database.sqlite_storage import open_database
 from backend.config import DB_PATH
 
 # Paths (mirroring seeder.py)
@@ -37,7 +38,7 @@ def export_db_to_files(source_db_path=None):
     db_path_to_use = source_db_path if source_db_path else DB_PATH
     print(f"Starting export from DB ({db_path_to_use}) to files...")
     
-    db = TinyDB(db_path_to_use, encoding='utf-8')
+    db = open_database(db_path_to_use, encoding='utf-8')
     components_table = db.table('components')
     workflows_table = db.table('workflows')
     steps_table = db.table('steps')
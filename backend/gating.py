@@ -0,0 +1,150 @@
+import operator
+from typing import Any, Dict, List, Optional
+
+# Gating rules of a workflow ("gating_rules" in the workflow record), checked by
+# the engine between stages. A rule fires once, when all its conditions hold:
+#
+#   {"id": "high_risk_guard",
+#    "after": "step_1",                      # optional: check once this step has completed
+#    "when": [{"field": "step_1_guard.security_check.uhka_havaittu", "op": "==", "value": true},
+#             {"field": "step_1_guard.security_check.riski_taso", "value": "KORKEA"}],
+#    "action": "stop",                       # or "skip_to" with "target": "step_9"
+#    "reason": "Guard detected a high-risk threat"}
+#
+# "stop" ends the execution (completed, with the decision in the result);
+# "skip_to" skips every remaining step before the target step.
+
+ACTIONS = ("stop", "skip_to")
+
+_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "in": lambda value, options: value in options,
+    "not in": lambda value, options: value not in options,
+}
+
+_MISSING = object()
+
+
+def resolve_field(source: Any, path: str) -> Any:
+    """
+    Reads a dotted path from the workflow state: attributes of models, keys
+    of dicts, indices of lists. Returns _MISSING if a part does not exist.
+    """
+    value = source
+    for part in path.split("."):
+        if value is None:
+            return _MISSING
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, (list, tuple)):
+            value = value[int(part)] if part.isdigit() and int(part) < len(value) else _MISSING
+        else:
+            value = getattr(value, part, _MISSING)
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+
+class GatingCondition:
+    def __init__(self, spec: Dict[str, Any]):
+        if not isinstance(spec, dict) or not spec.get("field"):
+            raise ValueError(f"Gating condition needs a 'field': {spec!r}")
+        self.field = spec["field"]
+        self.op = spec.get("op", "==")
+        if self.op not in _OPERATORS:
+            raise ValueError(f"Unknown gating operator '{self.op}' (use one of {', '.join(_OPERATORS)})")
+        self.value = spec.get("value")
+
+    def holds(self, state: Any) -> bool:
+        actual = resolve_field(state, self.field)
+        if actual is _MISSING or actual is None:
+            # Not produced (yet): a rule never fires on missing output
+            return False
+        try:
+            return bool(_OPERATORS[self.op](actual, self.value))
+        except TypeError:
+            return False
+
+    def describe(self) -> str:
+        return f"{self.field} {self.op} {self.value!r}"
+
+
+class GatingRule:
+    def __init__(self, spec: Dict[str, Any], index: int = 0):
+        if not isinstance(spec, dict):
+            raise ValueError(f"Gating rule must be an object: {spec!r}")
+        self.id = spec.get("id") or f"rule_{index + 1}"
+        self.after = spec.get("after")
+        conditions = spec.get("when")
+        if isinstance(conditions, dict):
+            conditions = [conditions]
+        if not conditions:
+            raise ValueError(f"Gating rule '{self.id}' needs at least one 'when' condition")
+        self.conditions = [GatingCondition(c) for c in conditions]
+        self.action = spec.get("action", "stop")
+        if self.action not in ACTIONS:
+            raise ValueError(f"Gating rule '{self.id}': unknown action '{self.action}' (use one of {', '.join(ACTIONS)})")
+        self.target = spec.get("target")
+        if self.action == "skip_to" and not self.target:
+            raise ValueError(f"Gating rule '{self.id}': 'skip_to' needs a 'target' step")
+        self.reason = spec.get("reason") or " and ".join(c.describe() for c in self.conditions)
+
+    def matches(self, state: Any) -> bool:
+        if self.after and self.after not in state.completed_steps:
+            return False
+        return all(c.holds(state) for c in self.conditions)
+
+
+def parse_gating_rules(specs: Optional[List[Dict[str, Any]]], step_ids: Optional[List[str]] = None) -> List[GatingRule]:
+    """Validates a workflow's gating_rules; raises ValueError on a malformed rule."""
+    rules = [GatingRule(spec, i) for i, spec in enumerate(specs or [])]
+    if step_ids is not None:
+        for rule in rules:
+            for ref in (rule.after, rule.target):
+                if ref and ref not in step_ids:
+                    raise ValueError(f"Gating rule '{rule.id}' refers to step '{ref}', which is not in the workflow")
+    return rules
+
+
+class GatingPolicy:
+    """The gating rules of one execution, over the workflow's step order."""
+
+    def __init__(self, rules: List[GatingRule], step_ids: List[str]):
+        self.rules = rules
+        self.step_ids = step_ids
+
+    @classmethod
+    def for_workflow(cls, workflow: Optional[Dict[str, Any]], step_ids: List[str]) -> "GatingPolicy":
+        return cls(parse_gating_rules((workflow or {}).get("gating_rules"), step_ids), step_ids)
+
+    @property
+    def checkpoints(self) -> List[str]:
+        """Steps a rule waits for: the steps after them must not run in the same stage."""
+        return [rule.after for rule in self.rules if rule.after]
+
+    def evaluate(self, state: Any, fired: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        The decision of the first rule that holds and has not fired yet (ids in
+        `fired`), with the steps it skips; None if no rule fires.
+        """
+        for rule in self.rules:
+            if rule.id in fired or not rule.matches(state):
+                continue
+            pending = [s for s in self.step_ids if s not in state.completed_steps]
+            if rule.action == "skip_to":
+                if rule.target in state.completed_steps:
+                    continue
+                pending = pending[:pending.index(rule.target)]
+            return {
+                "rule": rule.id,
+                "action": rule.action,
+                "target": rule.target,
+                "reason": rule.reason,
+                "skipped_steps": pending
+            }
+        return None
@@ -1,10 +1,11 @@
-import re
 import os
 import json
 from typing import Dict, Any, List
 from jinja2 import Environment, FileSystemLoader
 from googleapiclient.discovery import build
 from dotenv import load_dotenv
+from src.components.phrase_matcher import PhraseMatcher
+from src.components.json_recovery import iter_json_candidates, select_candidate
 
 # Load environment variables
 load_dotenv()
@@ -16,32 +17,27 @@ def sanitize_and_anonymize_input(inputs: Dict[str, Any]) -> Dict[str, Any]:
     Step 1 Pre-hook: Sanitizes and anonymizes input data.
     """
     print("[HOOK] Running sanitize_and_anonymize_input...")
-    
-    # Define Regex patterns for PII
-    pii_patterns = {
-        "EMAIL": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
-        "PHONE_FI": r"(?:\+358|0)\s?(?:4[0-9]|50|457)\s?[0-9]{3,4}\s?[0-9]{3,4}",
-        "HETU": r"[0-3][0-9][0-1][0-9][0-9]{2}[+-A][0-9]{3}[0-9A-FHJ-NPR-Y]",
-        "CREDIT_CARD": r"\b(?:\d[ -]*?){13,16}\b",
-        "IP_ADDRESS": r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b"
-    }
+    from src.components.pii_redaction import redact_pii, strip_non_printable
 
     sanitized = {}
     threats_detected = []
+    pii_counts = {}
+    pii_offsets = {}
 
     for key, value in inputs.items():
         if isinstance(value, str):
             # 1. Normalize Unicode (Basic)
-            clean_value = "".join(ch for ch in value if ch.isprintable())
+            clean_value = strip_non_printable(value)
             
-            # 2. Robust PII Redaction
-            for pii_type, pattern in pii_patterns.items():
-                matches = re.findall(pattern, clean_value)
-                if matches:
-                    threats_detected.append(f"{pii_type} detected in {key}")
-                    clean_value = re.sub(pattern, f"[REDACTED_{pii_type}]", clean_value)
+            # 2. Robust PII Redaction (all types in one pass)
+            redaction = redact_pii(clean_value)
+            for pii_type in redaction["counts"]:
+                threats_detected.append(f"{pii_type} detected in {key}")
+            if redaction["counts"]:
+                pii_counts[key] = redaction["counts"]
+                pii_offsets[key] = redaction["offsets"]
             
-            sanitized[key] = clean_value
+            sanitized[key] = redaction["text"]
         else:
             sanitized[key] = value
             
@@ -56,6 +52,9 @@ def sanitize_and_anonymize_input(inputs: Dict[str, Any]) -> Dict[str, Any]:
     
     sanitized['security_check'] = {
         "threats_detected": threats_detected,
+        # Offsets refer to the field text after non-printable characters were removed
+        "pii_counts": pii_counts,
+        "pii_offsets": pii_offsets,
         "is_safe": True
     }
     return sanitized
@@ -140,31 +139,33 @@ def execute_google_search(inputs: Dict[str, Any]) -> Dict[str, Any]:
 
 # --- 3.5. Performativity Hook ---
 
+# List of "suspect" words/phrases often associated with AI performativity or fluff
+PERFORMATIVE_PATTERNS = [
+    "delve into", "tapestry", "comprehensive overview", "rich history",
+    "testament to", "underscore the importance", "pivotal role",
+    "landscape of", "realm of", "foster a sense of"
+]
+_PERFORMATIVE_MATCHER = PhraseMatcher(PERFORMATIVE_PATTERNS)
+
+def find_performative_patterns(*texts: str) -> List[str]:
+    """
+    Returns the PERFORMATIVE_PATTERNS found in any of the texts, in list order.
+    Each text is scanned separately, so no match spans two documents.
+    """
+    found = set()
+    for text in texts:
+        if text:
+            found.update(_PERFORMATIVE_MATCHER.find_phrases(text))
+    return [pattern for pattern in PERFORMATIVE_PATTERNS if pattern in found]
+
 def detect_performative_patterns(inputs: Dict[str, Any]) -> Dict[str, Any]:
     """
     Step 7 Pre-hook: Scans input for performative language patterns.
     """
     print("[HOOK] Running detect_performative_patterns...")
     
-    # List of "suspect" words/phrases often associated with AI performativity or fluff
-    suspect_patterns = [
-        "delve into", "tapestry", "comprehensive overview", "rich history",
-        "testament to", "underscore the importance", "pivotal role",
-        "landscape of", "realm of", "foster a sense of"
-    ]
-    
-    detected = []
     # Check history or product text
-    text_to_scan = ""
-    if 'history_text' in inputs: text_to_scan += inputs['history_text']
-    if 'product_text' in inputs: text_to_scan += inputs['product_text']
-    
-    # Normalize
-    text_lower = text_to_scan.lower()
-    
-    for pattern in suspect_patterns:
-        if pattern in text_lower:
-            detected.append(pattern)
+    detected = find_performative_patterns(inputs.get('history_text'), inputs.get('product_text'))
             
     if detected:
         print(f"   [HOOK] Detected performative patterns: {detected}")
@@ -361,115 +362,14 @@ def generate_jinja2_report(inputs: Dict[str, Any], output: Dict[str, Any]) -> Di
 
 # --- 6. Parsing Helpers & Hooks ---
 
-def _repair_json_string(text: str) -> str:
-    """
-    Attempts to repair common JSON syntax errors.
-    """
-    # 1. Fix invalid \u escapes
-    text = re.sub(r'\\u(?![0-9a-fA-F]{4})', r'\\\\u', text)
-    # 2. Fix unescaped backslashes
-    text = re.sub(r'\\(?![/\"\\bfnrtu])', r'\\\\', text)
-    
-    def escape_controls(match):
-        content = match.group(0)
-        inner = content[1:-1]
-        inner = inner.replace('\n', '\\n').replace('\r', '').replace('\t', '\\t')
-        return f'"{inner}"'
-
-    if '\n' in text or '\t' in text:
-        json_string_pattern = r'"(?:[^"\\]|\\.)*"'
-        text = re.sub(json_string_pattern, escape_controls, text)
-
-    return text
-
-def _balance_braces(text: str) -> str:
-    """
-    Attempts to balance unclosed braces and strings.
-    """
-    # 1. Check for open string
-    escape = False
-    in_string = False
-    for char in text:
-        if char == '\\':
-            escape = not escape
-            continue
-        if char == '"' and not escape:
-            in_string = not in_string
-        escape = False
-    
-    if in_string:
-        text += '"'
-
-    # 2. Balance braces
-    stack = []
-    escape = False
-    in_string = False
-    
-    for char in text:
-        if char == '\\':
-            escape = not escape
-            continue
-        if char == '"' and not escape:
-            in_string = not in_string
-        if not in_string:
-            if char == '{': stack.append('}')
-            elif char == '[': stack.append(']')
-            elif char == '}' or char == ']':
-                if stack: stack.pop()
-        escape = False
-
-    while stack:
-        text += stack.pop()
-        
-    return text
-
 def _clean_and_parse_json(text: str) -> Dict[str, Any]:
     """
     Helper to extract and parse JSON from LLM output.
     """
     if not text: return {}
     
-    candidates = []
-    decoder = json.JSONDecoder()
-    repaired_text = _repair_json_string(text)
-    
-    # Try finding code blocks
-    matches = re.findall(r'```(?:json)?\s*(\{.*?\})\s*```', repaired_text, re.DOTALL)
-    for json_str in matches:
-        try:
-            candidates.append(json.loads(json_str))
-        except json.JSONDecodeError:
-            try:
-                candidates.append(json.loads(_balance_braces(json_str)))
-            except: pass
-
-    # Scan for JSON objects and arrays
-    idx = 0
-    while idx < len(repaired_text):
-        # Find next potential start
-        start_obj = repaired_text.find('{', idx)
-        start_arr = repaired_text.find('[', idx)
-        
-        if start_obj == -1 and start_arr == -1:
-            break
-            
-        if start_obj != -1 and (start_arr == -1 or start_obj < start_arr):
-            start_idx = start_obj
-        else:
-            start_idx = start_arr
-            
-        try:
-            obj, end_idx = decoder.raw_decode(repaired_text, start_idx)
-            if isinstance(obj, (dict, list)): candidates.append(obj)
-            idx = end_idx
-        except json.JSONDecodeError:
-            idx = start_idx + 1
-
-    # Select best candidate (prefer 'metadata')
-    for obj in candidates:
-        if 'metadata' in obj: return obj
-    
-    return candidates[-1] if candidates else {"raw_output": text}
+    selected = select_candidate(list(iter_json_candidates(text, allow_arrays=True)))
+    return selected if selected is not None else {"raw_output": text}
 
 def parse_analyst_output(inputs: Dict[str, Any], output: Dict[str, Any]) -> Dict[str, Any]:
     print("[HOOK] Parsing Analyst Output...")
@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Type, Union
+from pydantic import BaseModel
+
+from backend.llm_provider import LLMProvider
+from backend.context_cache import PromptPrefix
+from src.engine.usage import record_llm_call
+from src.components.tracing import current_span
+
+logger = logging.getLogger(__name__)
+
+# Per-request cache bypass. Set by the engine (inputs["bypass_cache"]) or via bypass_llm_cache().
+# Context variables are copied into tasks, so concurrent steps inherit the setting.
+llm_cache_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache(enabled: bool = True):
+    """
+    Context manager that disables cache reads and writes for LLM calls made inside it.
+    """
+    token = llm_cache_bypass.set(enabled)
+    try:
+        yield
+    finally:
+        llm_cache_bypass.reset(token)
+
+
+class LLMResponseCache:
+    """
+    Content-addressed on-disk store for LLM responses (SQLite).
+    Entries expire after `ttl_seconds` (0 = never) and the store is kept
+    below `max_entries` by evicting the least recently used entries.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 0, max_entries: int = 10000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: Optional[str],
+        system_instruction: Optional[str],
+        prompt: str,
+        response_schema: Optional[Type[BaseModel]],
+        temperature: float
+    ) -> str:
+        """
+        Hashes everything that influences the response into a stable cache key.
+        """
+        schema_json = json.dumps(response_schema.model_json_schema(), sort_keys=True) if response_schema else None
+        payload = json.dumps(
+            [provider, model, system_instruction, prompt, schema_json, temperature],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            # LRU eviction
+            if self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    " SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0
+        }
+
+
+_cache_instance: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """
+    Returns the process-wide response cache (created on first use).
+    """
+    global _cache_instance
+    with _cache_lock:
+        if _cache_instance is None:
+            from backend.config import LLM_CACHE_PATH, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES
+            _cache_instance = LLMResponseCache(LLM_CACHE_PATH, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES)
+        return _cache_instance
+
+
+class CachedLLMProvider(LLMProvider):
+    """
+    Wraps another provider and serves repeated identical requests from the cache.
+    """
+
+    def __init__(self, provider: LLMProvider, cache: Optional[LLMResponseCache] = None):
+        self.provider = provider
+        self.cache = cache
+        self.model_name = getattr(provider, "model_name", None)
+
+    def _get_cache(self) -> LLMResponseCache:
+        return self.cache or get_llm_cache()
+
+    async def generate(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        response_schema: Optional[Type[BaseModel]] = None,
+        temperature: float = 0.7,
+        prefix: Optional[PromptPrefix] = None,
+        use_cache: bool = True,
+        on_partial: Optional[Callable[[str, Any, bool], None]] = None
+    ) -> Union[str, Dict[str, Any]]:
+        # Cache hits return at once, so only misses stream their fields
+        forwarded = {"prefix": prefix} if prefix else {}
+        if on_partial:
+            forwarded["on_partial"] = on_partial
+        if not use_cache or llm_cache_bypass.get():
+            return await self.provider.generate(prompt, system_instruction, response_schema, temperature, **forwarded)
+
+        cache = self._get_cache()
+        # Keyed on the full request: the same step prompt on another submission is a different request
+        full_system, full_prompt = prefix.apply(system_instruction, prompt) if prefix else (system_instruction, prompt)
+        key = cache.make_key(
+            self.provider.__class__.__name__, self.model_name,
+            full_system, full_prompt, response_schema, temperature
+        )
+
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info(f"[LLMCache] Hit for {self.model_name} ({key[:12]})")
+            record_llm_call(self.model_name, cached=True)
+            current_span().set_attribute("llm.cache_hit", True)
+            return cached
+
+        result = await self.provider.generate(prompt, system_instruction, response_schema, temperature, **forwarded)
+        if result:
+            cache.set(key, result)
+        return result
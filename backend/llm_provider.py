@@ -1,19 +1,37 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Type, Union
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type, Union
 import os
 import logging
 import json
+import time
 import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
 from pydantic import BaseModel
 import tenacity
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, retry_if_not_exception_type
 from backend.state import WorkflowState
+from backend.rate_limiter import get_llm_governor, estimate_tokens
+from backend.context_cache import PromptPrefix, get_context_cache_registry
+from src.engine.usage import (
+    record_llm_call, mark_last_call_failed,
+    gemini_token_counts, openai_token_counts, gemini_cached_tokens, openai_cached_tokens
+)
+from src.engine.circuit_breaker import CircuitOpenError, circuit_guard
+from src.components.tracing import start_span, current_span
+from src.components.json_stream import IncrementalJSONParser, JSONStreamError
 from backend.config import (
     GOOGLE_API_KEY, 
     LLM_DEFAULT_TIMEOUT, 
     LLM_MAX_RETRIES, 
     LLM_RETRY_DELAY,
-    USE_MOCK_LLM
+    USE_MOCK_LLM,
+    MOCK_LLM_LATENCY,
+    LLM_CACHE_ENABLED,
+    LLM_CONTEXT_CACHE_ENABLED,
+    LLM_CONTEXT_CACHE_TTL,
+    LLM_CONTEXT_CACHE_MIN_TOKENS
 )
 
 # Configure logging
@@ -21,17 +39,62 @@ logger = logging.getLogger(__name__)
 
 # Define retry strategy
 # Valid for both sync and async functions in modern tenacity
+# An open circuit is not retried: the provider is known to be failing
 retry_strategy = retry(
+    retry=retry_if_not_exception_type(CircuitOpenError),
     stop=stop_after_attempt(LLM_MAX_RETRIES),
     wait=wait_exponential(multiplier=LLM_RETRY_DELAY, min=1, max=10),
     reraise=True,
     before_sleep=lambda retry_state: logger.warning(f"Retrying LLM call... (Attempt {retry_state.attempt_number}/{LLM_MAX_RETRIES})")
 )
 
+async def _record_call(model_name: str, request: Awaitable, token_counts: Callable[[Any], Tuple[int, int]],
+                       cached_tokens: Optional[Callable[[Any], int]] = None) -> Any:
+    """
+    Awaits one provider request and records its tokens and latency (or its
+    failure) for the step that is running (see src/engine/usage.py), as an llm.request span.
+    cached_tokens reads the prompt tokens served from a context cache.
+    """
+    with start_span("llm.request", kind="CLIENT", model=model_name) as span:
+        started = time.perf_counter()
+        try:
+            response = await request
+        except asyncio.CancelledError:
+            # Lost a hedged race (src/engine/model_routing.py) or the step was cancelled
+            record_llm_call(model_name, latency_seconds=time.perf_counter() - started, error="cancelled")
+            raise
+        except Exception as e:
+            call = record_llm_call(model_name, latency_seconds=time.perf_counter() - started, error=str(e))
+            if call:
+                span.set_attribute("llm.attempt", call["attempt"])
+            raise
+        prompt_tokens, completion_tokens = token_counts(response)
+        cached_prompt_tokens = cached_tokens(response) if cached_tokens else 0
+        call = record_llm_call(model_name, prompt_tokens, completion_tokens, latency_seconds=time.perf_counter() - started,
+                               cached_prompt_tokens=cached_prompt_tokens)
+        span.set_attribute("llm.prompt_tokens", prompt_tokens)
+        span.set_attribute("llm.completion_tokens", completion_tokens)
+        if cached_prompt_tokens:
+            span.set_attribute("llm.cached_prompt_tokens", cached_prompt_tokens)
+        if call:
+            span.set_attribute("llm.attempt", call["attempt"])
+        return response
+
+# Receives streamed response fields: (dotted path, value so far, complete)
+PartialCallback = Callable[[str, Any, bool], None]
+
 class LLMProvider(ABC):
     """
     Abstract base class for LLM providers (Google, OpenAI, Mock, etc.).
     This defines the 'mask' interface.
+
+    `prefix` (optional) is the stable leading part of the request shared across
+    steps (see backend/context_cache.py). Providers send it before
+    system_instruction and prompt, from a context cache where supported.
+
+    `on_partial` (optional, with a response_schema) streams the response and
+    reports its fields while they are generated; a truncated response fails
+    as soon as the stream ends. The return value is the same as without it.
     """
     
     @abstractmethod
@@ -40,11 +103,111 @@ class LLMProvider(ABC):
         prompt: str, 
         system_instruction: Optional[str] = None,
         response_schema: Optional[Type[BaseModel]] = None,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        prefix: Optional[PromptPrefix] = None,
+        on_partial: Optional[PartialCallback] = None
     ) -> Union[str, Dict[str, Any]]:
         pass
 
+
+class StreamTruncatedError(ValueError):
+    """A streamed response was cut off (output token limit, or incomplete JSON)."""
+
+
+class _StreamTap:
+    """
+    Feeds the chunks of a streamed response through an IncrementalJSONParser
+    and reports the changed fields of each chunk to on_partial.
+    """
+
+    def __init__(self, model_name: str, on_partial: PartialCallback):
+        self.model_name = model_name
+        self.on_partial = on_partial
+        self.parser: Optional[IncrementalJSONParser] = IncrementalJSONParser()
+        self.chunks = 0
+
+    def feed(self, text: Optional[str]):
+        if not text:
+            return
+        self.chunks += 1
+        if self.chunks == 1:
+            current_span().add_event("llm.first_token")
+        if self.parser is None:
+            return
+        try:
+            updates = self.parser.feed(text)
+        except JSONStreamError as e:
+            # Left to the regular parsing (and repair) of the full response
+            logger.warning(f"[{self.model_name}] Streamed response is not incrementally parseable: {e}")
+            self.parser = None
+            return
+        for path, value, complete in updates:
+            try:
+                self.on_partial(path, value, complete)
+            except Exception as e:
+                logger.warning(f"[{self.model_name}] Partial output callback failed: {e}")
+
+    def truncated(self, reason: str) -> StreamTruncatedError:
+        return StreamTruncatedError(f"{self.model_name} response truncated ({reason})")
+
+    def check_complete(self):
+        """Fails right at the end of the stream if the JSON document was cut off."""
+        if self.parser is not None:
+            try:
+                self.parser.close()
+            except JSONStreamError as e:
+                raise self.truncated(str(e)) from None
+
+
+def _stream_tap(model_name: str, response_schema: Optional[Type[BaseModel]], on_partial: Optional[PartialCallback]) -> Optional[_StreamTap]:
+    return _StreamTap(model_name, on_partial) if on_partial and response_schema else None
+
+
+async def _stream_gemini(model: Any, contents: Any, tap: _StreamTap) -> Any:
+    """Streams a Gemini request; the returned response holds the joined chunks (text, usage)."""
+    response = await model.generate_content_async(contents, stream=True)
+    async for chunk in response:
+        tap.feed(chunk.text if chunk.parts else None)
+        if chunk.candidates and getattr(chunk.candidates[0].finish_reason, "name", None) == "MAX_TOKENS":
+            raise tap.truncated("max_output_tokens reached")
+    tap.check_complete()
+    return response
+
+
+async def _stream_openai(client: Any, tap: _StreamTap, **request: Any) -> Any:
+    """Streams an OpenAI structured-output request and returns the final parsed completion."""
+    async with client.beta.chat.completions.stream(stream_options={"include_usage": True}, **request) as stream:
+        async for event in stream:
+            if event.type == "content.delta":
+                tap.feed(event.delta)
+            elif event.type == "chunk" and event.chunk.choices and event.chunk.choices[0].finish_reason == "length":
+                raise tap.truncated("max tokens reached")
+        completion = await stream.get_final_completion()
+    tap.check_complete()
+    return completion
+
+
+async def _stream_mock(text: str, latency: float, tap: _StreamTap, chunks: int = 20):
+    """Replays a mock response in chunks, spread over its simulated latency."""
+    size = max(1, -(-len(text) // chunks))
+    for start in range(0, len(text), size):
+        await asyncio.sleep(latency / chunks)
+        tap.feed(text[start:start + size])
+    tap.check_complete()
+
+
+def use_context_cache(prefix: Optional[PromptPrefix]) -> bool:
+    """True if requests with this prefix are sent through a provider context cache."""
+    return bool(prefix) and LLM_CONTEXT_CACHE_ENABLED and prefix.estimated_tokens() >= LLM_CONTEXT_CACHE_MIN_TOKENS
+
+# Sanitized Gemini schemas per response_schema class (schemas are static, so they never go stale)
+_sanitized_schema_cache: Dict[Type[BaseModel], Dict[str, Any]] = {}
+_sanitized_schema_lock = threading.Lock()
+
 class GoogleGeminiProvider(LLMProvider):
+    # Maximum pooled GenerativeModel instances per provider (least recently used are dropped)
+    MODEL_POOL_SIZE = 64
+
     def __init__(self, model_name: str = "gemini-1.5-flash", api_key: Optional[str] = None):
         import google.generativeai as genai
         self.model_name = model_name
@@ -54,6 +217,94 @@ class GoogleGeminiProvider(LLMProvider):
             raise ValueError("GOOGLE_API_KEY not found.")
         
         genai.configure(api_key=self.api_key)
+        self._model_pool: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._model_pool_lock = threading.Lock()
+
+    def _get_sanitized_schema(self, response_schema: Type[BaseModel]) -> Dict[str, Any]:
+        """
+        Returns the sanitized JSON schema for a Pydantic class, computed once per class.
+        The returned dict is shared and must not be modified.
+        """
+        schema = _sanitized_schema_cache.get(response_schema)
+        if schema is None:
+            schema = self._sanitize_schema(response_schema.model_json_schema())
+            with _sanitized_schema_lock:
+                _sanitized_schema_cache[response_schema] = schema
+        return schema
+
+    def _get_model(self, generation_config: Dict[str, Any], system_instruction: Optional[str], response_schema: Optional[Type[BaseModel]],
+                   cached_content: Any = None):
+        """
+        Returns a pooled GenerativeModel for (model, system instruction or cached content, generation config).
+        The schema is identified by its class, the instruction by its hash.
+        """
+        import google.generativeai as genai
+
+        if cached_content is not None:
+            instruction_hash = f"cached:{cached_content.name}"
+        else:
+            instruction_hash = hashlib.sha256(system_instruction.encode("utf-8")).hexdigest() if system_instruction else None
+        config_key = tuple(sorted((k, v) for k, v in generation_config.items() if k != "response_schema"))
+        key = (self.model_name, instruction_hash, config_key, response_schema)
+
+        with self._model_pool_lock:
+            model = self._model_pool.get(key)
+            if model is not None:
+                self._model_pool.move_to_end(key)
+                return model
+
+        if cached_content is not None:
+            # The cached content carries the system instruction
+            model = genai.GenerativeModel.from_cached_content(cached_content, generation_config=generation_config)
+        else:
+            model = genai.GenerativeModel(
+                model_name=self.model_name,
+                generation_config=generation_config,
+                system_instruction=system_instruction
+            )
+        with self._model_pool_lock:
+            self._model_pool[key] = model
+            while len(self._model_pool) > self.MODEL_POOL_SIZE:
+                self._model_pool.popitem(last=False)
+        return model
+
+    async def _get_cached_content(self, prefix: PromptPrefix) -> Any:
+        """
+        Returns the Gemini CachedContent holding the prefix (system part as system
+        instruction, submission as content), creating it on first use.
+        Returns None if the cache cannot be created; the request is then sent uncached.
+        """
+        registry = get_context_cache_registry()
+        handle = registry.get("gemini", self.model_name, prefix.key)
+        if handle is not None:
+            return handle.resource
+
+        def create():
+            import datetime
+            from google.generativeai import caching
+            with registry.creation_lock("gemini", self.model_name, prefix.key):
+                handle = registry.get("gemini", self.model_name, prefix.key, count=False)
+                if handle is not None:  # created by a concurrent step meanwhile
+                    return handle.resource
+                cached_content = caching.CachedContent.create(
+                    model=self.model_name,
+                    display_name=f"quorum-{prefix.key[:16]}",
+                    system_instruction=prefix.system or None,
+                    contents=[prefix.context] if prefix.context else None,
+                    ttl=datetime.timedelta(seconds=LLM_CONTEXT_CACHE_TTL)
+                )
+                tokens = getattr(cached_content.usage_metadata, "total_token_count", 0) or prefix.estimated_tokens()
+                logger.info(f"[GeminiProvider] Created context cache {cached_content.name} ({tokens} tokens)")
+                return registry.put("gemini", self.model_name, prefix.key, cached_content.name,
+                                    LLM_CONTEXT_CACHE_TTL, tokens, resource=cached_content).resource
+
+        with start_span("llm.context_cache.create", model=self.model_name) as span:
+            try:
+                return await asyncio.to_thread(create)
+            except Exception as e:
+                span.set_error(e)
+                logger.warning(f"[GeminiProvider] Context cache unavailable, sending the prefix uncached: {e}")
+                return None
 
     def _sanitize_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -124,10 +375,10 @@ class GoogleGeminiProvider(LLMProvider):
         prompt: str, 
         system_instruction: Optional[str] = None,
         response_schema: Optional[Type[BaseModel]] = None,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        prefix: Optional[PromptPrefix] = None,
+        on_partial: Optional[PartialCallback] = None
     ) -> Union[str, Dict[str, Any]]:
-        import google.generativeai as genai
-        
         generation_config = {
             "temperature": temperature,
             "max_output_tokens": 8192,
@@ -136,8 +387,7 @@ class GoogleGeminiProvider(LLMProvider):
         # Native Structured Output Support
         if response_schema:
             try:
-                raw_schema = response_schema.model_json_schema()
-                sanitized_schema = self._sanitize_schema(raw_schema)
+                sanitized_schema = self._get_sanitized_schema(response_schema)
                 
                 logger.info(f"[GeminiProvider] Enabling Structured Output for schema: {response_schema.__name__}")
                 generation_config["response_mime_type"] = "application/json"
@@ -147,23 +397,50 @@ class GoogleGeminiProvider(LLMProvider):
                 generation_config["response_mime_type"] = "application/json"
                 generation_config["response_schema"] = response_schema
         
-        # ASYNC CHANGE: Using GenerativeModel instance
-        model = genai.GenerativeModel(
-            model_name=self.model_name,
-            generation_config=generation_config,
-            system_instruction=system_instruction
-        )
+        # Cached prefix tokens still count against the tokens/min quota
+        estimated = estimate_tokens(prompt, system_instruction) + (prefix.estimated_tokens() if prefix else 0)
+        cached_content = await self._get_cached_content(prefix) if use_context_cache(prefix) else None
+        if cached_content is not None:
+            # A request on cached content cannot set a system instruction:
+            # the step-specific part goes first in the user content instead
+            contents = "\n\n".join(part for part in (system_instruction, prompt) if part)
+            model = self._get_model(generation_config, None, response_schema, cached_content)
+        else:
+            if prefix:
+                system_instruction, prompt = prefix.apply(system_instruction, prompt)
+            contents = prompt
+            # ASYNC CHANGE: Using GenerativeModel instance (pooled per prompt/config)
+            model = self._get_model(generation_config, system_instruction, response_schema)
 
         try:
             logger.info(f"[GeminiProvider] Calling {self.model_name} (ASYNC)...")
 
             # ASYNC CHANGE: generate_content_async
-            response = await model.generate_content_async(prompt)
+            # Admission is per attempt (inside the retry), so retries also respect the quota
+            # An open circuit fails fast, before waiting for quota
+            # A truncated stream is raised after the guard: the provider answered, so it is no breaker failure
+            truncated = None
+            with circuit_guard("gemini", self.model_name):
+                async with get_llm_governor().slot(self.model_name, estimated):
+                    tap = _stream_tap(self.model_name, response_schema, on_partial)
+                    request = _stream_gemini(model, contents, tap) if tap else model.generate_content_async(contents)
+                    try:
+                        response = await _record_call(self.model_name, request, gemini_token_counts, gemini_cached_tokens)
+                    except StreamTruncatedError as e:
+                        truncated = e
+                    except Exception:
+                        if cached_content is not None:
+                            # Possibly deleted or expired on the server; the retry recreates it
+                            get_context_cache_registry().invalidate("gemini", self.model_name, prefix.key)
+                        raise
+            if truncated is not None:
+                raise truncated
             
             if not response.parts:
                  finish_reason = response.candidates[0].finish_reason if response.candidates else 'Unknown'
                  msg = f"Gemini returned no content. Finish reason: {finish_reason}"
                  logger.error(msg)
+                 mark_last_call_failed(msg)
                  raise ValueError(msg)
 
             text_response = response.text
@@ -177,6 +454,7 @@ class GoogleGeminiProvider(LLMProvider):
                     try:
                         return json.loads(clean_text)
                     except:
+                        mark_last_call_failed("Invalid JSON")
                         raise ValueError(f"Invalid JSON received from Gemini: {text_response[:100]}...")
             
             return text_response
@@ -197,39 +475,70 @@ class OpenAIProvider(LLMProvider):
         prompt: str, 
         system_instruction: Optional[str] = None,
         response_schema: Optional[Type[BaseModel]] = None,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        prefix: Optional[PromptPrefix] = None,
+        on_partial: Optional[PartialCallback] = None
     ) -> Union[str, Dict[str, Any]]:
         
+        # OpenAI caches prompt prefixes automatically: the shared prefix goes first,
+        # so every step of an execution starts with the same tokens
         messages = []
+        if prefix and prefix.system:
+            messages.append({"role": "system", "content": prefix.system})
+        if prefix and prefix.context:
+            messages.append({"role": "user", "content": prefix.context})
         if system_instruction:
             messages.append({"role": "system", "content": system_instruction})
         messages.append({"role": "user", "content": prompt})
 
+        extra = {}
+        if use_context_cache(prefix):
+            # Routes requests with the same prefix to the same cache
+            extra["extra_body"] = {"prompt_cache_key": prefix.key[:32]}
+            registry = get_context_cache_registry()
+            if registry.get("openai", self.model_name, prefix.key) is None:
+                registry.put("openai", self.model_name, prefix.key, prefix.key[:32], LLM_CONTEXT_CACHE_TTL, prefix.estimated_tokens())
+
         try:
             logger.info(f"[OpenAIProvider] Calling {self.model_name} (ASYNC)...")
             
+            governor = get_llm_governor()
+            estimated = estimate_tokens(prompt, system_instruction) + (prefix.estimated_tokens() if prefix else 0)
+
             if response_schema:
                 logger.info(f"[OpenAIProvider] Enforcing schema: {response_schema.__name__} (Structured Outputs)")
-                completion = await self.client.beta.chat.completions.parse(
-                    model=self.model_name,
-                    messages=messages,
-                    response_format=response_schema,
-                    temperature=temperature
-                )
+                structured = dict(model=self.model_name, messages=messages, response_format=response_schema,
+                                  temperature=temperature, **extra)
+                tap = _stream_tap(self.model_name, response_schema, on_partial)
+                truncated = None
+                with circuit_guard("openai", self.model_name):
+                    async with governor.slot(self.model_name, estimated):
+                        request = (_stream_openai(self.client, tap, **structured) if tap
+                                   else self.client.beta.chat.completions.parse(**structured))
+                        try:
+                            completion = await _record_call(self.model_name, request, openai_token_counts, openai_cached_tokens)
+                        except StreamTruncatedError as e:
+                            truncated = e  # raised below, outside the breaker (see GeminiProvider)
+                if truncated is not None:
+                    raise truncated
                 parsed_obj = completion.choices[0].message.parsed
                 if not parsed_obj:
                      refusal = completion.choices[0].message.refusal
                      msg = f"OpenAI refused to generate structured output: {refusal}"
                      logger.error(msg)
+                     mark_last_call_failed(msg)
                      raise ValueError(msg)
                 
                 return parsed_obj.model_dump()
             else:
-                completion = await self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=messages,
-                    temperature=temperature
-                )
+                with circuit_guard("openai", self.model_name):
+                    async with governor.slot(self.model_name, estimated):
+                        completion = await _record_call(self.model_name, self.client.chat.completions.create(
+                            model=self.model_name,
+                            messages=messages,
+                            temperature=temperature,
+                            **extra
+                        ), openai_token_counts, openai_cached_tokens)
                 return completion.choices[0].message.content
 
         except Exception as e:
@@ -237,15 +546,46 @@ class OpenAIProvider(LLMProvider):
             raise e
 
 class MockProvider(LLMProvider):
-    async def generate(self, prompt: str, system_instruction: Optional[str] = None, response_schema: Optional[Type[BaseModel]] = None, temperature: float = 0.7) -> Union[str, Dict[str, Any]]:
+    def __init__(self, latency: Optional[str] = None):
+        from backend.mock_llm import LatencyModel
+        # Simulated network latency (MOCK_LLM_LATENCY), e.g. "lognormal:2.0:0.5"
+        self.latency = LatencyModel.parse(latency or MOCK_LLM_LATENCY)
+        self._service = None
+
+    async def generate(self, prompt: str, system_instruction: Optional[str] = None, response_schema: Optional[Type[BaseModel]] = None, temperature: float = 0.7,
+                       prefix: Optional[PromptPrefix] = None, on_partial: Optional[PartialCallback] = None) -> Union[str, Dict[str, Any]]:
         from backend.mock_llm import MockLLMService
         logger.info(f"[MockProvider] Calling Mock Service (Simulating Async)...")
+
+        # Simulated context cache: the first request with a prefix "creates" it,
+        # later ones within the TTL report the prefix as cached prompt tokens
+        cached_tokens = 0
+        if use_context_cache(prefix):
+            registry = get_context_cache_registry()
+            if registry.get("mock", "mock", prefix.key) is not None:
+                cached_tokens = prefix.estimated_tokens()
+            else:
+                registry.put("mock", "mock", prefix.key, f"cachedContents/mock-{prefix.key[:16]}",
+                             LLM_CONTEXT_CACHE_TTL, prefix.estimated_tokens())
+        if prefix:
+            system_instruction, prompt = prefix.apply(system_instruction, prompt)
         
         # Simulate network delay for verification of async behavior
-        await asyncio.sleep(0.5)
-
-        mock = MockLLMService()
-        result = mock.generate_content(prompt, system_instruction)
+        with start_span("llm.request", kind="CLIENT", model="mock"):
+            started = time.perf_counter()
+            if self._service is None:
+                self._service = MockLLMService()
+            result = self._service.generate_content(
+                prompt, system_instruction, response_schema.__name__ if response_schema else None
+            )
+            tap = _stream_tap("mock", response_schema, on_partial)
+            if tap:
+                await _stream_mock(result, self.latency.sample(), tap)
+            else:
+                await asyncio.sleep(self.latency.sample())
+            # Estimated tokens, so usage reports work in mock mode too
+            record_llm_call("mock", estimate_tokens(prompt, system_instruction), estimate_tokens(result), time.perf_counter() - started,
+                            cached_prompt_tokens=cached_tokens)
         
         if response_schema:
             try:
@@ -263,8 +603,27 @@ class LLMFactory:
             return MockProvider()
             
         if provider_type.lower() == "gemini":
-            return GoogleGeminiProvider(model_name=model_name or "gemini-1.5-flash")
+            provider = GoogleGeminiProvider(model_name=model_name or "gemini-1.5-flash")
         elif provider_type.lower() == "openai":
-            return OpenAIProvider(model_name=model_name or "gpt-4o")
+            provider = OpenAIProvider(model_name=model_name or "gpt-4o")
         else:
             raise ValueError(f"Unknown provider: {provider_type}")
+
+        if LLM_CACHE_ENABLED:
+            from backend.llm_cache import CachedLLMProvider
+            provider = CachedLLMProvider(provider)
+
+        return provider
+
+    _pool: Dict[str, LLMProvider] = {}
+
+    @staticmethod
+    def get_provider(model_name: str) -> LLMProvider:
+        """
+        Shared provider for a model named in a workflow (model mapping or fallback
+        chain); the provider type is inferred from the model name.
+        """
+        if model_name not in LLMFactory._pool:
+            provider_type = "openai" if model_name.startswith(("gpt", "o1", "o3", "o4")) else "gemini"
+            LLMFactory._pool[model_name] = LLMFactory.create_provider(provider_type, model_name)
+        return LLMFactory._pool[model_name]
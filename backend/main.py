@@ -1,13 +1,21 @@
 import os
+import asyncio
 import shutil
 import json
 from typing import List, Dict, Any, Optional
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
-from tinydb import TinyDB, Query
+from tinydb import Query
+from src.database.sqlite_storage import open_database
+from src.database.job_queue import get_job_queue, RUN_EXECUTION, RESUME_EXECUTION
+from src.components.metrics import registry as metrics_registry
+from src.components.tracing import render_waterfall
 
 from backend.processor import PDFProcessor
 from backend.engine import WorkflowEngine
+from backend.events import TERMINAL_EVENTS
+from backend.batch import BatchRunner, parse_submission_zip
 from backend.api.hooks_router import router as hooks_router
 from backend.api.tools_router import router as tools_router
 from backend.api.agents_router import router as agents_router
@@ -16,7 +24,8 @@ from backend.api.admin_router import router as admin_router
 from backend.api.llm_router import router as llm_router
 from backend.api.config_router import router as config_router
 from dotenv import load_dotenv
-from backend.config import DB_PATH, DATA_DIR
+from backend.config import DB_PATH, DATA_DIR, BATCH_MAX_CONCURRENCY
+from config import EXECUTION_MODE
 
 # Load environment variables
 load_dotenv()
@@ -78,8 +87,13 @@ os.makedirs(DATA_DIR, exist_ok=True)
 # Ensure data dir exists
 os.makedirs(DATA_DIR, exist_ok=True)
 
-db = TinyDB(DB_PATH, encoding='utf-8')
+db = open_database(DB_PATH, encoding='utf-8')
 engine = WorkflowEngine(DB_PATH)
+batch_runner = BatchRunner(
+    engine,
+    max_concurrency=BATCH_MAX_CONCURRENCY,
+    job_queue=get_job_queue() if EXECUTION_MODE == "worker" else None
+)
 
 # Initialize/Seed Components
 engine.register_component("PDFExtractor", "processor", "PDFProcessor")
@@ -107,6 +121,20 @@ class WorkflowExecutionRequest(BaseModel):
     workflow_id: str
     inputs: Dict[str, Any] = {}
 
+def _schedule_execution(background_tasks: BackgroundTasks, execution_id: str, inputs: Optional[Dict[str, Any]] = None, resume: bool = False):
+    """
+    Runs an execution in this process (EXECUTION_MODE=inline) or hands it to
+    the worker tier via the durable job queue (EXECUTION_MODE=worker).
+    """
+    if EXECUTION_MODE == "worker":
+        job_id = get_job_queue().enqueue(RESUME_EXECUTION if resume else RUN_EXECUTION, {"execution_id": execution_id})
+        engine.executions_table.update({'job_id': job_id}, Query().execution_id == execution_id)
+    elif resume:
+        background_tasks.add_task(engine.resume_execution, execution_id)
+    else:
+        # FastAPI BackgroundTasks can handle async functions
+        background_tasks.add_task(engine.run_execution, execution_id, inputs)
+
 @app.post("/workflows")
 def create_workflow(request: WorkflowCreateRequest):
     """
@@ -125,13 +153,106 @@ async def execute_workflow(request: WorkflowExecutionRequest, background_tasks:
         execution_id = engine.create_execution(request.workflow_id, request.inputs)
         
         # 2. Schedule Execution in Background
-        # FastAPI BackgroundTasks can handle async functions
-        background_tasks.add_task(engine.run_execution, execution_id, request.inputs)
+        _schedule_execution(background_tasks, execution_id, request.inputs)
         
         return {"status": "started", "execution_id": execution_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+class BatchItem(BaseModel):
+    history_text: str
+    product_text: str
+    reflection_text: str
+    label: Optional[str] = None
+
+class BatchExecutionRequest(BaseModel):
+    workflow_id: str
+    items: List[BatchItem]
+
+@app.post("/executions/batch")
+async def execute_batch(request: BatchExecutionRequest, background_tasks: BackgroundTasks):
+    """
+    Starts one execution per submission (history/product/reflection triple).
+    Items run through a bounded worker pool; poll GET /executions/batch/{batch_id} for progress.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Batch has no items")
+    try:
+        batch_id = batch_runner.create_batch(request.workflow_id, [item.model_dump() for item in request.items])
+        background_tasks.add_task(batch_runner.run_batch, batch_id)
+        return {"status": "started", "batch_id": batch_id, "total": len(request.items)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/executions/batch/upload")
+async def execute_batch_upload(workflow_id: str, background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    """
+    Starts a batch from a zip archive: one folder per submission, containing
+    history/product/reflection files (PDF or text), e.g. student_01/history.pdf.
+    """
+    data = await file.read()
+    try:
+        # Unzipping and PDF extraction are CPU-bound: keep them off the event loop
+        items = await asyncio.to_thread(parse_submission_zip, data)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid zip archive: {e}")
+
+    incomplete = [item['label'] for item in items if not all(k in item for k in ('history_text', 'product_text', 'reflection_text'))]
+    if incomplete:
+        raise HTTPException(status_code=400, detail=f"Submissions missing history/product/reflection files: {incomplete}")
+    if not items:
+        raise HTTPException(status_code=400, detail="No submissions found in zip archive")
+
+    batch_id = batch_runner.create_batch(workflow_id, items)
+    background_tasks.add_task(batch_runner.run_batch, batch_id)
+    return {"status": "started", "batch_id": batch_id, "total": len(items), "labels": [item['label'] for item in items]}
+
+@app.get("/executions/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """
+    Returns per-item status and aggregate progress of a batch.
+    """
+    status = batch_runner.get_batch_status(batch_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return status
+
+@app.post("/executions/batch/{batch_id}/resume")
+async def resume_batch(batch_id: str, background_tasks: BackgroundTasks):
+    """
+    Re-runs the unfinished items of a batch, e.g. after a restart interrupted it.
+    Completed items are kept; interrupted or failed items continue from their checkpoint.
+    """
+    status = batch_runner.get_batch_status(batch_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    if batch_runner.is_running(batch_id):
+        raise HTTPException(status_code=409, detail="Batch is already running")
+    if status['progress']['completed'] == status['progress']['total']:
+        raise HTTPException(status_code=409, detail="Batch is already completed")
+
+    background_tasks.add_task(batch_runner.run_batch, batch_id)
+    return {"status": "resumed", "batch_id": batch_id, "remaining": status['progress']['total'] - status['progress']['completed']}
+
+@app.get("/executions/batch/{batch_id}/export")
+async def export_batch_results(batch_id: str, format: str = "json"):
+    """
+    Combined results of all items in a batch (format=json or format=csv).
+    """
+    if format not in ("json", "csv"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'csv'")
+
+    export = batch_runner.export_results(batch_id, format)
+    if export is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    if format == "csv":
+        return Response(
+            content=export,
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="batch_{batch_id}.csv"'}
+        )
+    return {"batch_id": batch_id, "results": export}
+
 @app.get("/executions/{execution_id}")
 async def get_execution_status(execution_id: str):
     """
@@ -142,6 +263,163 @@ async def get_execution_status(execution_id: str):
         raise HTTPException(status_code=404, detail="Execution not found")
     return status
 
+@app.get("/executions/{execution_id}/trace")
+async def get_execution_trace(execution_id: str):
+    """
+    Returns the full WorkflowState trace of an execution.
+    Traces are kept out of the execution record and loaded only on request.
+    """
+    if not engine.get_execution_status(execution_id):
+        raise HTTPException(status_code=404, detail="Execution not found")
+
+    try:
+        trace = engine.get_execution_trace(execution_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail="Trace blob is missing from the blob store")
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Execution has no trace (not completed yet)")
+    return trace
+
+@app.get("/executions/{execution_id}/usage")
+async def get_execution_usage(execution_id: str, calls: bool = False):
+    """
+    Token, latency, cost and retry accounting of an execution, per step and in total.
+    Set calls=true to include the individual LLM calls of each step.
+    """
+    try:
+        usage = engine.get_execution_usage(execution_id, include_calls=calls)
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail="Trace blob is missing from the blob store")
+    if usage is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    return usage
+
+@app.get("/executions/{execution_id}/timeline")
+async def get_execution_timeline(execution_id: str, format: str = "json"):
+    """
+    Span waterfall of an execution (execution -> step -> hooks, prompt construction,
+    LLM calls and retries, parsing, DB writes). format=text renders it as a plain-text chart.
+    """
+    # Waits for pending span writes and reads the span file: keep it off the event loop
+    timeline = await asyncio.to_thread(engine.get_execution_timeline, execution_id)
+    if timeline is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    if format == "text":
+        return Response(content=render_waterfall(timeline["traces"]), media_type="text/plain; charset=utf-8")
+    return timeline
+
+@app.get("/workflows/{workflow_id}/usage")
+async def get_workflow_usage(workflow_id: str):
+    """
+    Usage rollup over all executions of a workflow: totals, averages per
+    execution and per-step averages (which steps dominate latency and spend).
+    """
+    return engine.get_workflow_usage(workflow_id)
+
+# How often the SSE endpoint polls the job queue file for events relayed by workers
+SSE_RELAY_POLL_SECONDS = 0.5
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+@app.get("/executions/{execution_id}/events")
+async def stream_execution_events(execution_id: str, request: Request):
+    """
+    Server-Sent Events stream of execution progress
+    (execution_started, step_started, hook, step_partial, step_finished, step_failed,
+    execution_gated, execution_completed, execution_failed). step_partial events (streamed output
+    fields, LLM_STREAMING_ENABLED) are live only and not replayed on reconnect.
+    Events come from the in-process event bus; the DB is read only once. With
+    EXECUTION_MODE=worker they are relayed by the worker processes through the job
+    queue file and tailed from there (step_partial events are not relayed).
+    Reconnecting clients send Last-Event-ID to receive only missed events.
+    """
+    status = engine.get_execution_status(execution_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Execution not found")
+
+    try:
+        after_id = int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        after_id = 0
+
+    def stored_outcome(record: Dict[str, Any]) -> str:
+        event_type = 'execution_completed' if record['status'] == 'completed' else 'execution_failed'
+        return _format_sse({
+            "id": 0, "type": event_type, "execution_id": execution_id,
+            "result": record.get('result'), "error": record.get('error'),
+            "failed_step": record.get('failed_step')
+        })
+
+    async def relayed_events():
+        # Worker processes relay their events through the job queue file: tail it
+        queue, last_id, idle = get_job_queue(), after_id, 0.0
+        while not await request.is_disconnected():
+            events = await asyncio.to_thread(queue.events_after, execution_id, last_id)
+            for event in events:
+                last_id = event['id']
+                yield _format_sse(event)
+                if event['type'] in TERMINAL_EVENTS:
+                    return
+            if events:
+                idle = 0.0
+                continue
+            await asyncio.sleep(SSE_RELAY_POLL_SECONDS)
+            idle += SSE_RELAY_POLL_SECONDS
+            if idle >= 15:
+                idle = 0.0
+                # A run whose events were pruned, or whose worker died before relaying the end
+                record = engine.get_execution_status(execution_id) or {}
+                if record.get('status') in ('completed', 'failed') and not await asyncio.to_thread(queue.events_after, execution_id, last_id):
+                    yield stored_outcome(record)
+                    return
+                yield ": keep-alive\n\n"
+
+    async def event_stream():
+        # Finished before this process saw it (e.g. after a restart): report the stored outcome
+        if not engine.event_bus.has_history(execution_id) and status.get('status') in ('completed', 'failed'):
+            yield stored_outcome(status)
+            return
+
+        if EXECUTION_MODE == "worker":
+            async for chunk in relayed_events():
+                yield chunk
+            return
+
+        async for event in engine.event_bus.subscribe(execution_id, after_id=after_id, keepalive=15):
+            if await request.is_disconnected():
+                break
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield _format_sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"X-Accel-Buffering": "no"}
+    )
+
+@app.post("/executions/{execution_id}/resume")
+async def resume_execution(execution_id: str, background_tasks: BackgroundTasks):
+    """
+    Resumes a failed or interrupted execution from its last checkpoint.
+    Completed steps are reused; only the remaining steps are run.
+    """
+    status = engine.get_execution_status(execution_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    if status.get('status') in ('running', 'completed'):
+        raise HTTPException(status_code=409, detail=f"Execution is already {status.get('status')}")
+
+    _schedule_execution(background_tasks, execution_id, resume=True)
+
+    return {
+        "status": "resumed",
+        "execution_id": execution_id,
+        "completed_steps": status.get('completed_steps', [])
+    }
+
 @app.get("/executions/latest")
 async def get_latest_execution():
     """
@@ -234,10 +512,12 @@ async def run_orchestrator(
     handler = DataHandler()
 
     try:
-        # Extract text from uploaded files (Handler is sync, maybe should be async too in future)
-        history_text = handler.read_file_content(history_file)
-        product_text = handler.read_file_content(product_file)
-        reflection_text = handler.read_file_content(reflection_file)
+        # Extract text from uploaded files (sync handler; run off the event loop)
+        history_text, product_text, reflection_text = await asyncio.gather(
+            asyncio.to_thread(handler.read_file_content, history_file),
+            asyncio.to_thread(handler.read_file_content, product_file),
+            asyncio.to_thread(handler.read_file_content, reflection_file)
+        )
 
         # Prepare inputs for the workflow
         inputs = {
@@ -250,7 +530,7 @@ async def run_orchestrator(
         execution_id = engine.create_execution(workflow_id, inputs)
         
         # 2. Schedule Execution in Background
-        background_tasks.add_task(engine.run_execution, execution_id, inputs)
+        _schedule_execution(background_tasks, execution_id, inputs)
         
         return {
             "status": "started",
@@ -310,4 +590,62 @@ def introspect_codebase():
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
+    """
+    Liveness plus LLM provider health: "degraded" while a circuit breaker is
+    open (calls to that model fail fast or go to the workflow's fallback model).
+    """
+    from src.engine.circuit_breaker import get_circuit_breakers
+    circuits = get_circuit_breakers().snapshot()
+    degraded = any(c["state"] != "closed" for c in circuits.values())
+    return {"status": "degraded" if degraded else "ok", "llm_circuits": circuits}
+
+def _collect_runtime_metrics():
+    """
+    Scrape-time values for /metrics: queue depths and cache hit ratios,
+    read from the components that already keep them.
+    """
+    from backend.rate_limiter import get_llm_governor
+    from backend.prompt_cache import prompt_cache
+    from backend.config import LLM_CACHE_ENABLED, LLM_CONTEXT_CACHE_ENABLED
+    from src.components.pdf_extraction import get_pdf_extractor
+
+    governor = get_llm_governor().stats()
+    yield ("quorum_llm_queue_depth", "gauge", "LLM calls waiting for a concurrency slot or rate-limit quota.",
+           [({}, governor["queue_depth"])])
+    yield ("quorum_llm_in_flight", "gauge", "LLM calls currently in progress.", [({}, governor["in_flight"])])
+
+    if EXECUTION_MODE == "worker":
+        jobs = get_job_queue().stats()
+        yield ("quorum_job_queue_jobs", "gauge", "Jobs in the durable execution queue by status.",
+               [({"status": status}, count) for status, count in jobs.items()])
+
+    caches = {"prompt": prompt_cache.stats(), "pdf": get_pdf_extractor().stats()}
+    if LLM_CACHE_ENABLED:
+        from backend.llm_cache import get_llm_cache
+        caches["llm_response"] = get_llm_cache().stats()
+    if LLM_CONTEXT_CACHE_ENABLED:
+        from backend.context_cache import get_context_cache_registry
+        caches["llm_context"] = get_context_cache_registry().stats()
+    yield ("quorum_cache_hits_total", "counter", "Cache hits by cache.",
+           [({"cache": name}, stats["hits"]) for name, stats in caches.items()])
+    yield ("quorum_cache_misses_total", "counter", "Cache misses by cache.",
+           [({"cache": name}, stats["misses"]) for name, stats in caches.items()])
+    yield ("quorum_cache_hit_ratio", "gauge", "Cache hit ratio since start (or last clear).",
+           [({"cache": name}, stats["hit_ratio"]) for name, stats in caches.items()])
+
+metrics_registry.register_collector(_collect_runtime_metrics)
+
+@app.get("/metrics")
+def get_metrics():
+    """
+    Prometheus text exposition of this process's metrics: step, hook, LLM call and
+    DB operation latency histograms, active executions, queue depths and cache hit ratios.
+    """
+    return Response(content=metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/jobs/stats")
+def get_job_stats():
+    """
+    Job queue counts by status (queued, running, done, failed) for the worker tier.
+    """
+    return {"execution_mode": EXECUTION_MODE, "jobs": get_job_queue().stats()}
@@ -1,9 +1,62 @@
 import json
 import random
 import os
+import math
 from typing import Dict, Any, Optional
 from backend.config import get_mock_responses_path
 
+# Output schema names (lowercase) -> mock response key
+SCHEMA_KEYS = {
+    "tainteddata": "guard_agent",
+    "todistuskartta": "analyst_agent",
+    "argumentaatioanalyysi": "logician_agent",
+    "logiikkaauditointi": "falsifier_agent",
+    "kausaalinenauditointi": "causal_agent",
+    "performatiivisuusauditointi": "performativity_agent",
+    "etiikkajafakta": "fact_checker_agent",
+    "tuomiojapisteet": "judge_agent",
+    "xaireport": "xai_agent",
+}
+
+
+class LatencyModel:
+    """
+    Latency distribution of simulated LLM calls, parsed from a spec string:
+    "fixed:S", "uniform:LO:HI", "normal:MEAN:STD" (clamped at 0) or
+    "lognormal:MEDIAN:SIGMA" (long tail, like real provider latency).
+    A bare number is a fixed latency. All values are in seconds.
+    """
+
+    KINDS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+
+    def __init__(self, kind: str, params: tuple, seed: Optional[int] = None):
+        if kind not in self.KINDS or len(params) != self.KINDS[kind]:
+            raise ValueError(f"Invalid latency model: {kind}{params}")
+        self.kind = kind
+        self.params = params
+        self._random = random.Random(seed)
+
+    @classmethod
+    def parse(cls, spec: str, seed: Optional[int] = None) -> "LatencyModel":
+        parts = str(spec).strip().split(":")
+        if len(parts) == 1:
+            return cls("fixed", (float(parts[0]),), seed)
+        return cls(parts[0].lower(), tuple(float(p) for p in parts[1:]), seed)
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self._random.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, self._random.gauss(*self.params))
+        median, sigma = self.params
+        return self._random.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+    def __repr__(self):
+        return f"{self.kind}:{':'.join(f'{p:g}' for p in self.params)}"
+
+
 class MockLLMService:
     """
     Simulates LLM responses for testing and development without API costs.
@@ -26,9 +79,10 @@ class MockLLMService:
             print(f"[MockLLM] Error loading mock data: {e}")
             return {}
 
-    def generate_content(self, prompt: str, system_instruction: str = None) -> str:
+    def generate_content(self, prompt: str, system_instruction: str = None, schema_name: Optional[str] = None) -> str:
         """
-        Generates a mock response based on the prompt content.
+        Generates a mock response based on the requested output schema
+        (when given) or the prompt content.
         """
         print(f"[MockLLM] Intercepted call. Prompt length: {len(prompt)}")
         
@@ -38,7 +92,7 @@ class MockLLMService:
             f.write(f"System Instruction: {system_instruction}\n")
             f.write(f"Prompt Preview: {prompt[:100]}\n")
         
-        key = self._identify_prompt_type(prompt, system_instruction)
+        key = self._identify_prompt_type(prompt, system_instruction, schema_name)
         
         with open("mock_debug.log", "a", encoding="utf-8") as f:
             f.write(f"Identified Key: {key}\n")
@@ -62,25 +116,23 @@ class MockLLMService:
         print(f"[MockLLM] No specific mock found for '{key}'. Returning generic fallback.")
         return self._generate_fallback(key)
 
-    def _identify_prompt_type(self, prompt: str, system_instruction: str) -> str:
+    def _identify_prompt_type(self, prompt: str, system_instruction: str, schema_name: Optional[str] = None) -> str:
         """
         Heuristics to identify the prompt type.
-        Prioritizes system_instruction as it defines the agent's persona.
+        The requested output schema is exact; otherwise system_instruction is
+        checked first, as it defines the agent's persona.
         """
+        # 0. Requested Output Schema (Exact; data-driven prompts also mention the input schema)
+        if schema_name and schema_name.lower() in SCHEMA_KEYS:
+            return SCHEMA_KEYS[schema_name.lower()]
+
         # 1. Check System Instruction First (Most Reliable)
         if system_instruction:
             sys_lower = system_instruction.lower()
             
             # Check for Output Schema names (Most Reliable)
-            if "tainteddata" in sys_lower: return "guard_agent"
-            if "todistuskartta" in sys_lower: return "analyst_agent"
-            if "argumentaatioanalyysi" in sys_lower: return "logician_agent"
-            if "logiikkaauditointi" in sys_lower: return "falsifier_agent"
-            if "kausaalinenauditointi" in sys_lower: return "causal_agent"
-            if "performatiivisuusauditointi" in sys_lower: return "performativity_agent"
-            if "etiikkajafakta" in sys_lower: return "fact_checker_agent"
-            if "tuomiojapisteet" in sys_lower: return "judge_agent"
-            if "xaireport" in sys_lower: return "xai_agent"
+            for schema, key in SCHEMA_KEYS.items():
+                if schema in sys_lower: return key
 
             # Fallback: Check for specific Phase/Agent headers
             if "vaihe 1: vartija-agentti" in sys_lower: return "guard_agent"
@@ -1,7 +1,7 @@
-import fitz  # PyMuPDF
 import os
 from typing import Dict, Any
 from backend.component import BaseComponent
+from src.components.pdf_extraction import get_pdf_extractor
 
 class PDFProcessor(BaseComponent):
     """
@@ -39,11 +39,16 @@ class PDFProcessor(BaseComponent):
             raise FileNotFoundError(f"File not found: {file_path}")
 
         try:
-            doc = fitz.open(file_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            
-            return text.strip()
+            return get_pdf_extractor().extract_file(file_path).strip()
         except Exception as e:
             raise Exception(f"Failed to process PDF {file_path}: {str(e)}")
+
+    @staticmethod
+    def extract_text_from_bytes(data: bytes) -> str:
+        """
+        Extracts text from PDF content held in memory (e.g. a file inside an uploaded zip).
+        """
+        try:
+            return get_pdf_extractor().extract_text(data).strip()
+        except Exception as e:
+            raise Exception(f"Failed to process PDF from memory: {str(e)}")
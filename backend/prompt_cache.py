@@ -0,0 +1,109 @@
+import threading
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+import config
+
+
+class PromptCache:
+    """
+    Cache of compiled system prompts (all components of a step concatenated,
+    placeholders substituted), as (shared prefix, step-specific part) pairs.
+
+    Entries are keyed on (database, step_id, config version, banned-phrase
+    version, date). Editing components/steps or banned phrases bumps the
+    matching version, so stale prompts are never served; the date part
+    refreshes {{CURRENT_DATE}} daily. Versions are in-process counters.
+    With EXECUTION_MODE=worker, invalidations are also recorded in the job
+    queue, and each worker calls sync() before a job so it never runs with
+    prompts or banned phrases older than the API's edits. Edits made outside
+    the API (e.g. a script writing the DB directly) need
+    POST /config/prompt-cache/clear or a restart.
+    """
+
+    def __init__(self):
+        self.config_version = 0
+        self.banned_phrases_version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Tuple, Tuple[str, str]] = {}
+        self._shared_versions: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    def _key(self, db_path: str, step_id: str) -> Tuple:
+        return (db_path, step_id, self.config_version, self.banned_phrases_version, date.today().isoformat())
+
+    def get(self, db_path: str, step_id: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            prompt = self._entries.get(self._key(db_path, step_id))
+            if prompt is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return prompt
+
+    def put(self, db_path: str, step_id: str, prompt: Tuple[str, str]):
+        with self._lock:
+            key = self._key(db_path, step_id)
+            # Drop entries from older versions/dates; they can never be hit again
+            if any(k[2:] != key[2:] for k in self._entries):
+                self._entries = {k: v for k, v in self._entries.items() if k[2:] == key[2:]}
+            self._entries[key] = prompt
+
+    def _bump(self, config_changed: bool = False, phrases_changed: bool = False):
+        with self._lock:
+            self.config_version += config_changed
+            self.banned_phrases_version += phrases_changed
+            self._entries.clear()
+
+    @staticmethod
+    def _publish(*names: str):
+        # Worker processes hold their own caches; they pick this up in sync()
+        if config.EXECUTION_MODE == "worker":
+            from src.database.job_queue import get_job_queue
+            get_job_queue().bump_cache_versions(*names)
+
+    def invalidate_config(self):
+        """Call after components or steps change."""
+        self._bump(config_changed=True)
+        self._publish("config")
+
+    def invalidate_banned_phrases(self):
+        """Call after banned phrases change."""
+        self._bump(phrases_changed=True)
+        self._publish("banned_phrases")
+
+    def clear(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+        self._bump(config_changed=True, phrases_changed=True)
+        self._publish("config", "banned_phrases")
+
+    def sync(self, shared_versions: Dict[str, int]):
+        """
+        Applies invalidations made by other processes: `shared_versions` are the
+        versions recorded in the job queue. The first call only records them.
+        """
+        with self._lock:
+            seen, self._shared_versions = self._shared_versions, dict(shared_versions)
+        if seen is None:
+            return
+        changed = {name for name, version in shared_versions.items() if seen.get(name, 0) != version}
+        if changed:
+            print(f"[PromptCache] Invalidated by another process: {sorted(changed)}")
+            self._bump(config_changed="config" in changed, phrases_changed="banned_phrases" in changed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "config_version": self.config_version,
+                "banned_phrases_version": self.banned_phrases_version
+            }
+
+
+prompt_cache = PromptCache()
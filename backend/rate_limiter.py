@@ -0,0 +1,292 @@
+import time
+import asyncio
+import logging
+import sqlite3
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional, Tuple
+from src.components.tracing import start_span
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(*texts: Optional[str]) -> int:
+    """
+    Rough token estimate (~4 characters per token) used for tokens/min budgeting.
+    """
+    chars = sum(len(t) for t in texts if t)
+    return max(1, chars // 4)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate_per_minute`.
+    Callers reserve capacity up front; if the bucket goes negative they wait
+    until the deficit has been refilled, which keeps admission FIFO-ish.
+    """
+
+    # reserve() does file I/O and should run off the event loop
+    blocking = False
+
+    def __init__(self, rate_per_minute: float):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens: float, elapsed: float, amount: float) -> Tuple[float, float]:
+        """(tokens left, seconds to wait) after refilling for `elapsed` seconds and taking `amount`."""
+        tokens = min(self.capacity, tokens + elapsed * self.rate_per_minute / 60.0)
+        # A single request larger than the bucket would otherwise wait forever-ish
+        tokens -= min(amount, self.capacity)
+        return tokens, (0.0 if tokens >= 0 else -tokens * 60.0 / self.rate_per_minute)
+
+    def reserve(self, amount: float) -> float:
+        """
+        Takes `amount` from the bucket and returns how many seconds to wait before using it.
+        """
+        if self.rate_per_minute <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens, delay = self._take(self.tokens, now - self.updated_at, amount)
+            self.updated_at = now
+            return delay
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket whose state is a row in a SQLite file, so several processes
+    (the API and the workers of EXECUTION_MODE=worker) draw from one quota
+    instead of each getting the full limit.
+    """
+    blocking = True
+
+    def __init__(self, path: str, key: str, rate_per_minute: float):
+        super().__init__(rate_per_minute)
+        self.path = path
+        self.key = key
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    def reserve(self, amount: float) -> float:
+        if self.rate_per_minute <= 0:
+            return 0.0
+
+        conn = self._connect()
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent reservations serialize
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM rate_buckets WHERE key = ?", (self.key,)).fetchone()
+            now = time.time()
+            tokens, updated_at = row if row else (self.capacity, now)
+            tokens, delay = self._take(tokens, now - updated_at, amount)
+            conn.execute("INSERT OR REPLACE INTO rate_buckets (key, tokens, updated_at) VALUES (?, ?, ?)", (self.key, tokens, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return delay
+
+
+class _ConcurrencyLimiter:
+    """
+    Bounded semaphore that is not tied to a single event loop.
+    Waiters are woken in FIFO order via call_soon_threadsafe, so it is safe to
+    share between the API loop and loops created by asyncio.run (scripts, tests).
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        if self.limit <= 0:
+            return
+
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if future in self._waiters:
+                    self._waiters.remove(future)
+                    raise
+            # Slot was handed over just before cancellation; give it back
+            self.release()
+            raise
+
+    def release(self):
+        if self.limit <= 0:
+            return
+
+        with self._lock:
+            while self._waiters:
+                future = self._waiters.popleft()
+                if future.done():
+                    continue
+                # Slot is handed over directly; 'active' stays the same
+                future.get_loop().call_soon_threadsafe(_wake, future)
+                return
+            self.active -= 1
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class LLMGovernor:
+    """
+    Process-wide admission control for LLM calls.
+
+    - A bounded semaphore caps concurrent in-flight requests across all providers.
+    - Per-model token buckets enforce requests/min and tokens/min quotas.
+
+    Limits of 0 mean "unlimited". Per-model overrides are given as
+    {"model-name": {"rpm": 60, "tpm": 100000}}. With `shared_path`, the
+    quota buckets live in that SQLite file and are shared by every process
+    using it; the concurrency cap is always per process.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 0,
+        default_rpm: float = 0,
+        default_tpm: float = 0,
+        model_limits: Optional[Dict[str, Dict[str, float]]] = None,
+        shared_path: Optional[str] = None
+    ):
+        self.max_concurrency = max_concurrency
+        self.shared_path = shared_path
+        self.default_rpm = default_rpm
+        self.default_tpm = default_tpm
+        self.model_limits = model_limits or {}
+
+        self._semaphore = _ConcurrencyLimiter(max_concurrency)
+        self._buckets: Dict[str, Dict[str, TokenBucket]] = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._waiting_for_quota = 0
+        self._metrics: Dict[str, Dict[str, float]] = {}
+
+    def _get_buckets(self, model: str) -> Dict[str, TokenBucket]:
+        with self._lock:
+            if model not in self._buckets:
+                limits = self.model_limits.get(model, {})
+                rates = {"rpm": limits.get("rpm", self.default_rpm), "tpm": limits.get("tpm", self.default_tpm)}
+                self._buckets[model] = {
+                    kind: SharedTokenBucket(self.shared_path, f"{model}:{kind}", rate) if self.shared_path else TokenBucket(rate)
+                    for kind, rate in rates.items()
+                }
+            return self._buckets[model]
+
+    def _record(self, model: str, waited: float):
+        with self._lock:
+            m = self._metrics.setdefault(model, {
+                "requests": 0, "in_flight": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0
+            })
+            m["requests"] += 1
+            m["in_flight"] += 1
+            m["total_wait_seconds"] += waited
+            m["max_wait_seconds"] = max(m["max_wait_seconds"], waited)
+
+    def _finish(self, model: str):
+        with self._lock:
+            self._metrics[model]["in_flight"] -= 1
+
+    @staticmethod
+    def _reserve(buckets: Dict[str, TokenBucket], estimated_tokens: int) -> float:
+        return max(buckets["rpm"].reserve(1), buckets["tpm"].reserve(estimated_tokens))
+
+    @asynccontextmanager
+    async def slot(self, model: str, estimated_tokens: int = 1):
+        """
+        Waits for quota and a concurrency slot, then holds the slot for the duration of the call.
+        """
+        started = time.monotonic()
+        buckets = self._get_buckets(model)
+
+        with start_span("llm.queue_wait", model=model) as span:
+            if buckets["rpm"].blocking:
+                delay = await asyncio.to_thread(self._reserve, buckets, estimated_tokens)
+            else:
+                delay = self._reserve(buckets, estimated_tokens)
+            if delay > 0:
+                logger.info(f"[LLMGovernor] Throttling {model} for {delay:.2f}s (quota)")
+                span.set_attribute("quota_delay_seconds", round(delay, 3))
+                with self._lock:
+                    self._waiting_for_quota += 1
+                try:
+                    await asyncio.sleep(delay)
+                finally:
+                    with self._lock:
+                        self._waiting_for_quota -= 1
+
+            await self._semaphore.acquire()
+        self._record(model, time.monotonic() - started)
+        try:
+            yield
+        finally:
+            self._finish(model)
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {}
+            for model, m in self._metrics.items():
+                models[model] = dict(m)
+                models[model]["avg_wait_seconds"] = m["total_wait_seconds"] / m["requests"] if m["requests"] else 0.0
+            return {
+                "max_concurrency": self.max_concurrency,
+                "default_rpm": self.default_rpm,
+                "default_tpm": self.default_tpm,
+                "shared_quota": self.shared_path is not None,
+                "in_flight": self._semaphore.active if self.max_concurrency > 0 else sum(m["in_flight"] for m in self._metrics.values()),
+                "queue_depth": self._semaphore.queued + self._waiting_for_quota,
+                "models": models
+            }
+
+
+_governor_instance: Optional[LLMGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def get_llm_governor() -> LLMGovernor:
+    """
+    Returns the process-wide governor shared by all providers (created on first use).
+    """
+    global _governor_instance
+    with _governor_lock:
+        if _governor_instance is None:
+            import config
+            from backend.config import LLM_MAX_CONCURRENCY, LLM_RPM_LIMIT, LLM_TPM_LIMIT, LLM_MODEL_RATE_LIMITS
+            # Worker processes and the API share one quota through the job queue file
+            shared_path = config.JOB_QUEUE_PATH if config.EXECUTION_MODE == "worker" else None
+            _governor_instance = LLMGovernor(LLM_MAX_CONCURRENCY, LLM_RPM_LIMIT, LLM_TPM_LIMIT, LLM_MODEL_RATE_LIMITS, shared_path)
+        return _governor_instance
@@ -6,6 +6,7 @@ from tinydb import TinyDB, Query
 # Add project root to sys.path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from src.database.client import UTF8JSONStorage
+from src.database.sqlite_storage import open_database
 from backend.config import DB_PATH
 
 # Paths
@@ -53,7 +54,7 @@ def seed_database(target_db_path=None):
             print(f"Error decoding seed data: {e}")
             return
 
-    db = TinyDB(db_path_to_use, storage=UTF8JSONStorage)
+    db = open_database(db_path_to_use, storage=UTF8JSONStorage)
     db.drop_tables()
     
     components_table = db.table('components')
@@ -113,6 +114,11 @@ def seed_database(target_db_path=None):
         workflows_table.upsert(workflow, Workflow.id == workflow['id'])
         print(f"Upserted workflow: {workflow['id']}")
         
+    # Tables were dropped and rebuilt: compiled prompts are stale
+    from backend.prompt_cache import prompt_cache
+    prompt_cache.invalidate_config()
+    prompt_cache.invalidate_banned_phrases()
+
     print("Database seeding completed.")
 
 if __name__ == "__main__":
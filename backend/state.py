@@ -30,6 +30,8 @@ class WorkflowState(BaseModel):
     execution_id: str
     start_time: datetime = Field(default_factory=datetime.now)
     current_step_name: str = "init"
+    # Step IDs that have finished successfully (used for checkpoint/resume)
+    completed_steps: List[str] = Field(default_factory=list)
     
     # Syötteet (Read-only agenteille)
     inputs: InputData
@@ -50,3 +52,7 @@ class WorkflowState(BaseModel):
 
     # Apumuuttujat (esim. hakutulokset, jotka eivät ole skeemassa)
     aux_data: Dict[str, Any] = Field(default_factory=dict)
+
+    # LLM usage per step ID: tokens, latency, cost, retries and the individual calls
+    # (see src/engine/usage.py). Kept in checkpoints, so resumed runs keep earlier spend.
+    usage: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
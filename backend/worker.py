@@ -0,0 +1,189 @@
+"""
+Worker tier for executions.
+
+Runs N worker processes that pull jobs from the durable job queue
+(src/database/job_queue.py) and execute them, independently of the API
+process. Used when EXECUTION_MODE=worker.
+
+    python -m backend.worker --workers 4
+"""
+import os
+import sys
+import time
+import signal
+import socket
+import asyncio
+import argparse
+import threading
+import multiprocessing
+from typing import Any, Dict
+
+# Allow running as a script from the project root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from src.database.job_queue import get_job_queue, RUN_EXECUTION, RESUME_EXECUTION, SRC_WORKFLOW
+
+
+# Relayed events are only needed while clients stream a run; finished runs report their stored outcome
+EVENT_RETENTION_SECONDS = 24 * 3600
+
+
+class Heartbeat:
+    """
+    Extends a job's lease from a background thread, so a long CPU-bound
+    step that blocks the event loop does not let the lease expire.
+    """
+
+    def __init__(self, queue, job_id: str, worker_id: str):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        interval = max(self.queue.lease_seconds / 3, 0.1)
+        while not self._stop.wait(interval):
+            if not self.queue.heartbeat(self.job_id, self.worker_id):
+                print(f"[Worker {self.worker_id}] Lost lease on job {self.job_id}; it may be re-run elsewhere")
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+async def process_job(engine, job: Dict[str, Any]):
+    """
+    Runs one job. A job claimed for the second time (its previous worker died)
+    resumes the execution from its last checkpoint instead of starting over.
+    """
+    payload = job['payload']
+
+    if job['kind'] == RUN_EXECUTION:
+        record = engine.get_execution_status(payload['execution_id'])
+        if not record:
+            raise ValueError(f"Execution {payload['execution_id']} not found")
+        if record.get('status') == 'completed':
+            return
+        if job['attempts'] > 1 and engine.get_execution_checkpoint(record):
+            await engine.resume_execution(payload['execution_id'])
+        else:
+            await engine.run_execution(payload['execution_id'], engine.get_execution_inputs(record))
+
+    elif job['kind'] == RESUME_EXECUTION:
+        await engine.resume_execution(payload['execution_id'])
+
+    elif job['kind'] == SRC_WORKFLOW:
+        from src.api.routers.orchestrator_router import run_workflow_background
+        await asyncio.to_thread(run_workflow_background, payload['job_id'], payload['file_paths'], payload['workflow_id'])
+
+    else:
+        raise ValueError(f"Unknown job kind: {job['kind']}")
+
+
+async def worker_loop(worker_id: str, poll_interval: float, stop: threading.Event):
+    from backend.engine import WorkflowEngine
+    from backend.config import DB_PATH
+    from backend.prompt_cache import prompt_cache
+
+    engine = WorkflowEngine(DB_PATH)
+    queue = get_job_queue()
+    # The API streams this process's execution events from the queue file
+    engine.event_bus.relay = queue.append_event
+    prompt_cache.sync(await asyncio.to_thread(queue.cache_versions))
+    print(f"[Worker {worker_id}] Ready (queue: {queue.path})")
+
+    while not stop.is_set():
+        job = await asyncio.to_thread(queue.claim, worker_id)
+        if job is None:
+            await asyncio.sleep(poll_interval)
+            continue
+
+        print(f"[Worker {worker_id}] Job {job['id']} ({job['kind']}), attempt {job['attempts']}/{job['max_attempts']}")
+        # Prompt and banned-phrase caches are per process: drop what the API invalidated since the last job
+        prompt_cache.sync(await asyncio.to_thread(queue.cache_versions))
+        with Heartbeat(queue, job['id'], worker_id):
+            try:
+                await process_job(engine, job)
+            except Exception as e:
+                # The engine already retries LLM calls and records the failure on the
+                # execution; re-running a failed execution is left to /resume.
+                print(f"[Worker {worker_id}] Job {job['id']} failed: {e}")
+                queue.fail(job['id'], worker_id, str(e), retry=False)
+                continue
+        queue.complete(job['id'], worker_id)
+        queue.prune_events(EVENT_RETENTION_SECONDS)
+
+    print(f"[Worker {worker_id}] Stopped")
+
+
+def run_worker(poll_interval: float):
+    """Entry point of one worker process."""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        if stop.is_set():
+            raise KeyboardInterrupt  # second signal: exit now, the lease will expire
+        print(f"[Worker {worker_id}] Stopping after the current job...")
+        stop.set()
+
+    # Ctrl+C reaches the whole process group; the supervisor forwards it as SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    try:
+        asyncio.run(worker_loop(worker_id, poll_interval, stop))
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cognitive Quorum execution workers")
+    parser.add_argument("--workers", type=int, default=config.WORKER_PROCESSES, help="Number of worker processes")
+    parser.add_argument("--poll-interval", type=float, default=config.WORKER_POLL_INTERVAL, help="Seconds between polls of an empty queue")
+    args = parser.parse_args(argv)
+
+    def spawn():
+        process = multiprocessing.Process(target=run_worker, args=(args.poll_interval,))
+        process.start()
+        return process
+
+    print(f"[Worker] Starting {args.workers} worker process(es)")
+    processes = [spawn() for _ in range(args.workers)]
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        if stopping:
+            print("[Worker] Forcing shutdown")
+        stopping = True
+        # First signal: workers finish their current job. Second signal: they exit immediately.
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    while not stopping:
+        time.sleep(1)
+        for index, process in enumerate(processes):
+            if not process.is_alive() and not stopping:
+                # Crashed worker: its job is reclaimed after the lease expires
+                print(f"[Worker] Process {process.pid} exited with code {process.exitcode}; restarting")
+                processes[index] = spawn()
+
+    print("[Worker] Shutting down, waiting for running jobs to finish...")
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark: per-call CPU overhead of GoogleGeminiProvider.generate.
+
+The network call is replaced by an instant fake response, so the numbers are
+the provider's own work per call (schema sanitizing, GenerativeModel setup,
+response parsing). "before" rebuilds everything on every call like the
+original implementation; "after" uses the schema cache and model pool.
+
+Run from the project root:
+    python benchmarks/bench_gemini_provider.py [calls]
+"""
+import os
+import sys
+import time
+import asyncio
+from unittest.mock import MagicMock, AsyncMock, patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+import google.generativeai as genai
+from backend.llm_provider import GoogleGeminiProvider, _sanitized_schema_cache
+from backend.schemas import TuomioJaPisteet
+
+SYSTEM_INSTRUCTION = "You are a meticulous analyst. " * 400  # ~12 kB, like a compiled step prompt
+
+
+def _fake_response():
+    response = MagicMock()
+    response.parts = [MagicMock()]
+    response.text = '{"x": 1}'
+    return response
+
+
+async def _run(provider: GoogleGeminiProvider, calls: int, reset_caches: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        if reset_caches:
+            _sanitized_schema_cache.clear()
+            provider._model_pool.clear()
+        await provider.generate("prompt", system_instruction=SYSTEM_INSTRUCTION, response_schema=TuomioJaPisteet)
+    return (time.perf_counter() - start) / calls
+
+
+def main(calls: int = 200):
+    fake_response = _fake_response()
+    with patch.object(genai.GenerativeModel, "generate_content_async", AsyncMock(return_value=fake_response)), \
+         patch("backend.llm_provider.get_llm_governor") as governor:
+        governor.return_value.slot.return_value.__aenter__ = AsyncMock()
+        governor.return_value.slot.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        provider = GoogleGeminiProvider(model_name="gemini-2.5-flash")
+        before = asyncio.run(_run(provider, calls, reset_caches=True))
+        after = asyncio.run(_run(provider, calls, reset_caches=False))
+
+    print(f"Per-call provider overhead over {calls} calls ({TuomioJaPisteet.__name__} schema):")
+    print(f"  before (no caching): {before * 1e6:9.1f} us")
+    print(f"  after  (cached):     {after * 1e6:9.1f} us")
+    print(f"  speedup:             {before / after:9.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
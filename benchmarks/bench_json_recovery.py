@@ -0,0 +1,166 @@
+"""
+Benchmark: recovering JSON from long LLM outputs.
+
+"before" is the previous _clean_and_parse_json scan (regex repair pass, then
+raw_decode retried at every '{', re-balancing the whole remaining suffix
+after each failure; copied here, as parsing no longer uses it);
+"after" is the single-pass scanner in src.components.json_recovery. Inputs
+are a synthetic agent answer of about 60k characters (the size Gemini
+returns with max_output_tokens=65536): complete in a Markdown fence,
+truncated mid-string or right after a key, and preceded by brace-heavy
+prose.
+
+Run from the project root:
+    python benchmarks/bench_json_recovery.py [characters]
+"""
+import io
+import os
+import re
+import sys
+import json
+import time
+import contextlib
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.components.hooks.parsing import _clean_and_parse_json
+
+
+def _repair_json_string(text: str) -> str:
+    """
+    Attempts to repair common JSON syntax errors, specifically invalid escape sequences and unescaped control characters.
+    """
+    # 1. Fix invalid \u escapes (e.g., \u00 or \uXXXX where X is not hex)
+    text = re.sub(r'\\u(?![0-9a-fA-F]{4})', r'\\\\u', text)
+
+    # 2. Fix unescaped backslashes that aren't part of a valid escape sequence
+    text = re.sub(r'\\(?![/\"\\bfnrtu])', r'\\\\', text)
+
+    # 3. Fix unescaped control characters (newlines, tabs) inside strings
+    # We use a regex to identify JSON strings and then escape control chars within them.
+    # Pattern matches a double-quoted string, handling escaped quotes.
+    # We use a callback to process the content of the string.
+    def escape_controls(match):
+        content = match.group(0)
+        # Don't escape the surrounding quotes
+        inner = content[1:-1]
+        # Replace literal newlines with \n and tabs with \t
+        inner = inner.replace('\n', '\\n').replace('\r', '').replace('\t', '\\t')
+        return f'"{inner}"'
+
+    # Regex for JSON string: " ( escaped char OR non-quote/non-backslash )* "
+    # We need to be careful not to match across the whole file if quotes are unbalanced, 
+    # but for repair we assume somewhat valid structure.
+    # [^"\\] matches any char that is not " or \
+    # \\. matches any escaped char (e.g. \", \\, \n)
+    # We use DOTALL to match newlines in [^"\\] implicitly (since it's a negated class)
+    # Actually [^...] matches newlines by default.
+    json_string_pattern = r'"(?:[^"\\]|\\.)*"'
+    
+    # We only apply this if we detect potential unescaped newlines to avoid performance hit on huge files
+    if '\n' in text or '\t' in text:
+        text = re.sub(json_string_pattern, escape_controls, text)
+
+    return text
+
+
+def _balance_braces(text: str) -> str:
+    stack, escape, in_string = [], False, False
+    for char in text:
+        if char == '\\':
+            escape = not escape
+            continue
+        if char == '"' and not escape:
+            in_string = not in_string
+        if not in_string:
+            if char == '{':
+                stack.append('}')
+            elif char == '[':
+                stack.append(']')
+            elif char in '}]' and stack and stack[-1] == char:
+                stack.pop()
+        escape = False
+    if in_string:
+        text += '"'
+    while stack:
+        text += stack.pop()
+    return text
+
+
+def before(text: str):
+    candidates = []
+    decoder = json.JSONDecoder()
+    repaired = _repair_json_string(text)
+    stripped = repaired.strip()
+    if stripped and stripped[-1] not in '}]':
+        repaired = _balance_braces(repaired)
+    for json_str in re.findall(r'```(?:json)?\s*(\{.*?\})\s*```', repaired, re.DOTALL):
+        try:
+            candidates.append(json.loads(json_str))
+        except json.JSONDecodeError:
+            pass
+    idx = 0
+    while idx < len(repaired):
+        start = repaired.find('{', idx)
+        if start == -1:
+            break
+        try:
+            obj, idx = decoder.raw_decode(repaired, start)
+            candidates.append(obj)
+        except json.JSONDecodeError:
+            try:
+                candidates.append(json.loads(_balance_braces(repaired[start:])))
+                break
+            except json.JSONDecodeError:
+                pass
+            idx = start + 1
+    for obj in candidates:
+        if isinstance(obj, dict) and 'metadata' in obj:
+            return obj
+    return candidates[-1] if candidates else {"raw_output": text}
+
+
+def after(text: str):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _clean_and_parse_json(text)
+
+
+def _make_answer(characters: int) -> str:
+    findings, size, index = [], 0, 0
+    while size < characters:
+        finding = {
+            "id": index,
+            "claim": f"Väite {index}: argumentti perustuu lähteeseen [{index}] ja sen tulkintaan.",
+            "evidence": {"quote": "Lainaus tekstistä,\nrivinvaihdolla", "score": index % 5},
+        }
+        findings.append(finding)
+        size += len(json.dumps(finding, ensure_ascii=False)) + 8
+        index += 1
+    answer = {"metadata": {"agentti": "ANALYYTIKKO", "vaihe": 3}, "havainnot": findings}
+    return json.dumps(answer, ensure_ascii=False, indent=2)
+
+
+def _timed(func, text: str):
+    start = time.perf_counter()
+    result = func(text)
+    return time.perf_counter() - start, result
+
+
+def main(characters: int = 60_000):
+    answer = _make_answer(characters)
+    cases = {
+        "complete, fenced": f"Tässä vastaus:\n```json\n{answer}\n```",
+        "truncated mid-string": answer[:characters],
+        "truncated after key": answer[:answer.rindex('": ', 0, characters) + 3],
+        "noisy prose + answer": "Mietin {rakennetta} ja {muotoa}. " * (characters // 64) + answer,
+    }
+    print(f"Synthetic answer: {len(answer)} characters")
+    for name, text in cases.items():
+        old, old_result = _timed(before, text)
+        new, new_result = _timed(after, text)
+        found = ("metadata" in old_result, "metadata" in new_result)
+        print(f"  {name:22s} before {old * 1000:9.1f} ms   after {new * 1000:7.1f} ms   ({old / new:6.1f}x)  metadata found: {found}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 60_000)
@@ -0,0 +1,66 @@
+"""
+Benchmark: PDF text extraction, original single-threaded loop vs. PDFExtractionService.
+
+A synthetic text-heavy PDF is generated with PyMuPDF. "before" is the original
+`text += page.get_text()` loop; "parallel" is a cold (uncached) extraction
+through the process pool; "cached" is the same upload extracted again.
+
+Run from the project root:
+    python benchmarks/bench_pdf_extraction.py [pages]
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import fitz  # PyMuPDF
+from src.components.pdf_extraction import PDFExtractionService
+
+PARAGRAPH = "Oppija kuvaa prosessia, jossa tekoälyä käytettiin argumentoinnin tukena ja lähteitä arvioitiin kriittisesti. " * 6
+
+
+def _make_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for index in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(40, 40, 560, 800), f"Sivu {index + 1}\n" + PARAGRAPH * 4, fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _before(data: bytes) -> str:
+    doc = fitz.open(stream=data, filetype="pdf")
+    text = ""
+    for page in doc:
+        text += page.get_text()
+    return text
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(pages: int = 600):
+    data = _make_pdf(pages)
+    service = PDFExtractionService(max_workers=min(4, os.cpu_count() or 1), parallel_min_pages=32)
+    # Start the pool outside the measurement; a server keeps it warm between uploads
+    service._get_pool().submit(len, b"").result()
+
+    before, expected = _timed(_before, data)
+    parallel, text = _timed(service.extract_text, data)
+    cached, _ = _timed(service.extract_text, data)
+    service.shutdown()
+
+    assert text == expected, "parallel extraction must match the sequential output"
+    print(f"Extracting {pages} pages ({len(data) / 1e6:.1f} MB, {len(text) / 1e6:.1f} M chars), {service.max_workers} workers:")
+    print(f"  before (sequential): {before * 1000:9.1f} ms")
+    print(f"  parallel (cold):     {parallel * 1000:9.1f} ms  ({before / parallel:.1f}x)")
+    print(f"  cached (re-upload):  {cached * 1000:9.1f} ms  ({before / cached:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 600)
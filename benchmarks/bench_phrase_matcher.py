@@ -0,0 +1,68 @@
+"""
+Benchmark: banned-phrase scanning of large inputs.
+
+"before" is the original GuardAgent loop (`phrase in text_lower` for every
+phrase, plus reloading the phrase list); "after" is a prebuilt PhraseMatcher,
+which also reports every match position. Both matcher paths are timed at
+each size; PhraseMatcher.AUTOMATON_MIN_PHRASES is set where the Aho-Corasick
+automaton starts beating the str.find loop.
+
+Run from the project root:
+    python benchmarks/bench_phrase_matcher.py [megabytes]
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.components.phrase_matcher import PhraseMatcher
+
+WORDS = ("essee argumentti lähde väite perustelu analyysi tekoäly oppiminen "
+         "reflektio prosessi tuotos historia arviointi kriteeri näyttö").split()
+
+
+def _make_text(megabytes: float) -> str:
+    rng = random.Random(42)
+    words = [rng.choice(WORDS) for _ in range(int(megabytes * 1_000_000 / 9))]
+    return " ".join(words)
+
+
+def _make_phrases(count: int):
+    rng = random.Random(count)
+    return [" ".join(rng.choice(WORDS) for _ in range(3)) + f" {index}" for index in range(count)]
+
+
+def before(phrases, text: str):
+    text_lower = text.lower()
+    return [phrase for phrase in (p.lower() for p in phrases) if phrase in text_lower]
+
+
+def _timed(func, *args, repeat: int = 3) -> float:
+    """Best of `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(megabytes: float = 5.0):
+    text = _make_text(megabytes)
+    print(f"Synthetic input: {len(text) / 1e6:.1f} MB")
+    print(f"  {'phrases':>7}  {'before':>9}  {'str.find':>9}  {'automaton':>9}  default")
+    for count in (50, 100, 200, 300, 500, 1000):
+        phrases = _make_phrases(count)
+        direct = PhraseMatcher(phrases, automaton_min_phrases=count + 1)
+        automaton = PhraseMatcher(phrases, automaton_min_phrases=0)
+        assert sorted(automaton.find_phrases(text)) == sorted(direct.find_phrases(text)) == sorted(before(phrases, text))
+        old = _timed(before, phrases, text)
+        find, walk = _timed(direct.find_phrases, text), _timed(automaton.find_phrases, text)
+        path = "automaton" if PhraseMatcher(phrases).uses_automaton else "str.find"
+        print(f"  {count:7d}  {old * 1000:6.1f} ms  {find * 1000:6.1f} ms  {walk * 1000:6.1f} ms  {path}")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 5.0)
@@ -0,0 +1,94 @@
+"""
+Benchmark: PII redaction of large chat histories.
+
+"before" is the original sanitize loop (per-character isprintable join, then
+re.findall + re.sub for each of the five patterns); "after" is
+strip_non_printable + the single-pass redact_pii. The input is a synthetic
+chat history with PII sprinkled in; a second run doubles the size to show
+linear scaling, and a third uses a long token without "@" (e.g. pasted
+base64), which made the old email pattern quadratic.
+
+Run from the project root:
+    python benchmarks/bench_pii_redaction.py [megabytes]
+"""
+import os
+import re
+import sys
+import time
+import random
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.components.pii_redaction import redact_pii, strip_non_printable
+
+OLD_PATTERNS = {
+    "EMAIL": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
+    "PHONE_FI": r"(?:\+358|0)\s?(?:4[0-9]|50|457)\s?[0-9]{3,4}\s?[0-9]{3,4}",
+    "HETU": r"[0-3][0-9][0-1][0-9][0-9]{2}[+-A][0-9]{3}[0-9A-FHJ-NPR-Y]",
+    "CREDIT_CARD": r"\b(?:\d[ -]*?){13,16}\b",
+    "IP_ADDRESS": r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b"
+}
+
+LINES = [
+    "Käyttäjä: Voitko auttaa minua jäsentämään esseen argumentit selkeämmin?\n",
+    "Tekoäly: Toki. Aloitetaan väitteestä ja sen perusteluista, sitten vastaväitteet.\n",
+    "Käyttäjä: Lähetin luonnoksen osoitteeseen matti.meikalainen@example.fi eilen.\n",
+    "Käyttäjä: Soita numeroon 040 123 4567 jos tarvitset lisätietoja.\n",
+    "Tekoäly: Palvelimen osoite 192.168.10.24 ei liity tehtävään, poistetaan se.\n",
+    "Käyttäjä: Henkilötunnukseni 131052-308T oli vahingossa liitteessä.\n",
+]
+
+
+def _make_history(megabytes: float) -> str:
+    rng = random.Random(42)
+    target = int(megabytes * 1_000_000)
+    parts, size = [], 0
+    while size < target:
+        line = rng.choice(LINES[:2] * 8 + LINES[2:])
+        parts.append(line)
+        size += len(line)
+    return "".join(parts)
+
+
+def before(text: str):
+    clean = "".join(ch for ch in text if ch.isprintable())
+    counts = {}
+    for pii_type, pattern in OLD_PATTERNS.items():
+        matches = re.findall(pattern, clean)
+        if matches:
+            counts[pii_type] = len(matches)
+            clean = re.sub(pattern, f"[REDACTED_{pii_type}]", clean)
+    return clean, counts
+
+
+def after(text: str):
+    result = redact_pii(strip_non_printable(text))
+    return result["text"], result["counts"]
+
+
+def _timed(func, text: str) -> float:
+    start = time.perf_counter()
+    func(text)
+    return time.perf_counter() - start
+
+
+def main(megabytes: float = 5.0):
+    history = _make_history(megabytes)
+    old_text, old_counts = before(history)
+    new_text, new_counts = after(history)
+    assert new_counts == old_counts, (new_counts, old_counts)
+    assert new_text == old_text
+
+    print(f"Synthetic chat history: {len(history) / 1e6:.1f} MB, PII found: {new_counts}")
+    for scale in (1, 2):
+        text = history * scale
+        old, new = _timed(before, text), _timed(after, text)
+        print(f"  {len(text) / 1e6:5.1f} MB  before {old * 1000:8.1f} ms   after {new * 1000:8.1f} ms   ({old / new:.1f}x)")
+
+    token = "QUJD" * 5_000  # 20 kB run of address characters without "@"
+    old, new = _timed(before, token), _timed(after, token)
+    print(f"  20 kB token without '@'  before {old * 1000:8.1f} ms   after {new * 1000:8.1f} ms   ({old / new:.0f}x)")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 5.0)
@@ -0,0 +1,326 @@
+"""
+Benchmark: end-to-end pipeline throughput and latency with a simulated LLM.
+
+Runs the seeded 9-step audit workflow through WorkflowEngine.run_execution
+(backend) and/or the src Orchestrator (run_workflow_async), fully offline:
+the backend uses MockProvider with MOCK_LLM_LATENCY, the src tier a mock
+LLM handler with the same latency model that answers with minimal
+schema-valid JSON (its V1 models do not accept the canned V2 responses).
+
+Every scenario (target x input size x concurrency) runs in a fresh process
+against a temporary database, after one warm-up execution, so peak RSS and
+caches are per scenario. Reported: throughput, p50/p95/max execution
+latency, LLM calls, failed executions and peak RSS. With --latency 0 the
+numbers are the pipeline's own overhead (engine, storage, hooks, parsing);
+STORAGE_BACKEND and the other settings are taken from the environment.
+
+Run from the project root:
+    python benchmarks/bench_pipeline.py [--target engine|orchestrator|both]
+        [--latency lognormal:0.2:0.5] [--sizes 2000,50000] [--concurrency 1,8]
+        [--executions 16] [--json results.json] [--baseline results.json]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SEED_PATH = os.path.join(ROOT, 'data', 'seed_data.json')
+ENGINE_WORKFLOW = "sequential_audit_chain"
+ORCHESTRATOR_WORKFLOW = "bench_sequence"
+# src hooks that call external services
+NETWORK_HOOKS = {"execute_google_search", "execute_rag_retrieval"}
+
+WORDS = ("analyysi argumentti lähde päätelmä tutkimus kehys menetelmä tulos arviointi synteesi "
+         "the evidence suggests that this approach improves reasoning about complex systems").split()
+
+
+def _input_texts(chars: int, seed: int) -> dict:
+    rng = random.Random(seed)
+
+    def text(size):
+        words, length = [], 0
+        while length < size:
+            word = rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        return " ".join(words)[:size]
+
+    return {"history_text": text(chars), "product_text": text(chars), "reflection_text": text(max(chars // 4, 1))}
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))]
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def _schema_instance(node: dict, defs: dict):
+    """Minimal instance of a JSON schema (first enum value, minimum numbers, one array item)."""
+    if "$ref" in node:
+        return _schema_instance(defs[node["$ref"].split("/")[-1]], defs)
+    if "const" in node:
+        return node["const"]
+    if "enum" in node:
+        return node["enum"][0]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in node:
+            options = [option for option in node[key] if option.get("type") != "null"] or node[key]
+            return _schema_instance(options[0], defs)
+    kind = node.get("type")
+    if kind == "object" or "properties" in node:
+        return {name: _schema_instance(child, defs) for name, child in node.get("properties", {}).items()}
+    if kind == "array":
+        return [_schema_instance(node.get("items", {}), defs)]
+    if kind == "integer":
+        return int(node.get("minimum", 1))
+    if kind == "number":
+        return float(node.get("minimum", 0.5))
+    if kind == "boolean":
+        return False
+    return "mock" if kind == "string" else None
+
+
+class MockLLMHandler:
+    """Stands in for src LLMHandler: simulated latency, schema-valid JSON answers."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def call_llm_async(self, prompts, model="mock"):
+        import asyncio
+        from backend.rate_limiter import estimate_tokens
+        from src.engine.usage import record_llm_call
+
+        started = time.perf_counter()
+        await asyncio.sleep(self.latency.sample())
+        answer = "{}"
+        # Executor appends the output schema as "...following schema:\n{json}\n\nEnsure ..."
+        for prompt in reversed(prompts):
+            content = prompt["content"]
+            if "following schema:\n" in content:
+                schema = json.loads(content.split("following schema:\n", 1)[1].rsplit("\n\nEnsure", 1)[0])
+                answer = json.dumps(_schema_instance(schema, schema.get("$defs", {})), ensure_ascii=False)
+                break
+        full_prompt = "\n\n".join(prompt["content"] for prompt in prompts)
+        record_llm_call("mock", estimate_tokens(full_prompt), estimate_tokens(answer), time.perf_counter() - started)
+        return answer
+
+
+async def _run_all(run_one, inputs: dict, executions: int, concurrency: int) -> dict:
+    import asyncio
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async def timed(index):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await run_one(index, inputs)
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(i) for i in range(executions)))
+    return {"wall_seconds": time.perf_counter() - started, "latencies": latencies, "failed": failures}
+
+
+def _engine_runner(workdir: str, seed: dict):
+    from backend.engine import WorkflowEngine
+
+    engine = WorkflowEngine(os.path.join(workdir, "bench_db.json"))
+    for table, rows in (("components", seed["components"]), ("steps", seed["steps"]), ("workflows", seed["workflows"])):
+        engine.db.table(table).insert_multiple(rows)
+    calls = []
+
+    async def run_one(index, inputs):
+        execution_id = engine.create_execution(ENGINE_WORKFLOW, inputs)
+        await engine.run_execution(execution_id, inputs)
+        calls.append(engine.get_execution_usage(execution_id)["totals"]["calls"])
+
+    return run_one, calls
+
+
+def _orchestrator_runner(workdir: str, seed: dict, latency):
+    import config
+    config.DB_PATH = os.path.join(workdir, "bench_src_db.json")  # read when DatabaseClient is first created
+    from src.database.client import DatabaseClient
+    from src.engine.orchestrator import Orchestrator
+    from src.components.hook_registry import HookRegistry
+
+    db = DatabaseClient()
+    db.get_table("components").insert_multiple(seed["components"])
+    for step in seed["steps"]:
+        execution_config = dict(step["execution_config"])
+        for phase in ("pre_hooks", "post_hooks"):
+            execution_config[phase] = [
+                hook for hook in (execution_config.get(phase) or [])
+                if hook in HookRegistry._registry and hook not in NETWORK_HOOKS
+            ]
+        db.get_table("steps").insert(dict(step, execution_config=execution_config))
+    db.get_table("workflows").insert({"id": ORCHESTRATOR_WORKFLOW, "sequence": [step["id"] for step in seed["steps"]]})
+
+    handler = MockLLMHandler(latency)
+    calls = []
+
+    async def run_one(index, inputs):
+        orchestrator = Orchestrator()
+        orchestrator.executor.llm_handler = handler
+        await orchestrator.run_workflow_async(ORCHESTRATOR_WORKFLOW, dict(inputs))
+        calls.append(orchestrator.usage["totals"]["calls"])
+
+    return run_one, calls
+
+
+def _run_scenario(scenario: dict) -> dict:
+    """Runs one scenario; called in a fresh process."""
+    import asyncio
+
+    workdir = tempfile.mkdtemp(prefix="quorum_bench_")
+    os.environ.update({
+        "USE_MOCK_LLM": "true",
+        "MOCK_LLM_LATENCY": scenario["latency"],
+        "LLM_CACHE_ENABLED": "false",
+        "GOOGLE_SEARCH_API_KEY": "",  # keep the search hooks offline
+        "TRACE_DIR": os.path.join(workdir, "traces"),
+        "LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.sqlite"),
+    })
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+    os.chdir(workdir)  # debug files (mock_debug.log) stay out of the project
+
+    with open(SEED_PATH, encoding="utf-8") as f:
+        seed = json.load(f)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if scenario["target"] == "engine":
+            run_one, calls = _engine_runner(workdir, seed)
+        else:
+            from backend.mock_llm import LatencyModel
+            run_one, calls = _orchestrator_runner(workdir, seed, LatencyModel.parse(scenario["latency"]))
+
+        inputs = _input_texts(scenario["chars"], seed=scenario["chars"])
+        asyncio.run(_run_all(run_one, inputs, 1, 1))  # warm-up: imports, prompt cache, DB indexes
+        calls.clear()
+        result = asyncio.run(_run_all(run_one, inputs, scenario["executions"], scenario["concurrency"]))
+
+    latencies = result["latencies"]
+    return dict(
+        scenario,
+        completed=len(latencies),
+        failed=result["failed"],
+        wall_seconds=result["wall_seconds"],
+        throughput=len(latencies) / result["wall_seconds"] if result["wall_seconds"] else 0.0,
+        p50_ms=_percentile(latencies, 0.50) * 1000,
+        p95_ms=_percentile(latencies, 0.95) * 1000,
+        max_ms=max(latencies, default=0.0) * 1000,
+        llm_calls=sum(calls),
+        peak_rss_mb=_peak_rss_mb()
+    )
+
+
+def _scenario_key(result: dict) -> tuple:
+    return result["target"], result["chars"], result["concurrency"], result["latency"]
+
+
+def _print_results(results: list, baseline: dict):
+    header = f"{'target':<13}{'chars':>8}{'conc':>6}{'runs':>6}{'fail':>6}{'exec/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'calls':>7}{'RSS MB':>8}"
+    print(header + ("  vs baseline (throughput / p95)" if baseline else ""))
+    for r in results:
+        rss = f"{r['peak_rss_mb']:8.0f}" if r["peak_rss_mb"] is not None else f"{'n/a':>8}"
+        line = (f"{r['target']:<13}{r['chars']:>8}{r['concurrency']:>6}{r['completed']:>6}{r['failed']:>6}"
+                f"{r['throughput']:>9.2f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['max_ms']:>10.1f}{r['llm_calls']:>7}{rss}")
+        previous = baseline.get(_scenario_key(r))
+        if previous and previous["throughput"] and previous["p95_ms"]:
+            line += (f"  {(r['throughput'] / previous['throughput'] - 1) * 100:+6.1f}%"
+                     f" / {(r['p95_ms'] / previous['p95_ms'] - 1) * 100:+6.1f}%")
+        print(line)
+
+
+def _regressions(results: list, baseline: dict, tolerance: float) -> list:
+    found = []
+    for r in results:
+        previous = baseline.get(_scenario_key(r))
+        if not previous:
+            continue
+        if previous["throughput"] and r["throughput"] < previous["throughput"] * (1 - tolerance):
+            found.append(f"{_scenario_key(r)}: throughput {previous['throughput']:.2f} -> {r['throughput']:.2f}/s")
+        if previous["p95_ms"] and r["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            found.append(f"{_scenario_key(r)}: p95 {previous['p95_ms']:.1f} -> {r['p95_ms']:.1f} ms")
+        if r["failed"] > previous["failed"]:
+            found.append(f"{_scenario_key(r)}: {r['failed']} failed executions (baseline {previous['failed']})")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target", choices=("engine", "orchestrator", "both"), default="both")
+    parser.add_argument("--latency", default="lognormal:0.2:0.5",
+                        help="Mock LLM latency: fixed:S, uniform:LO:HI, normal:MEAN:STD or lognormal:MEDIAN:SIGMA (seconds)")
+    parser.add_argument("--sizes", default="2000,50000", help="Characters per input text (comma-separated)")
+    parser.add_argument("--concurrency", default="1,8", help="Executions in flight (comma-separated)")
+    parser.add_argument("--executions", type=int, default=16, help="Measured executions per scenario")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Compare against results written earlier with --json")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Relative slowdown against --baseline reported as a regression (exit code 1)")
+    args = parser.parse_args()
+
+    targets = ("engine", "orchestrator") if args.target == "both" else (args.target,)
+    scenarios = [
+        {"target": target, "chars": int(chars), "concurrency": int(concurrency),
+         "executions": args.executions, "latency": args.latency}
+        for target in targets
+        for chars in args.sizes.split(",")
+        for concurrency in args.concurrency.split(",")
+    ]
+
+    results = []
+    spawn = multiprocessing.get_context("spawn")
+    for scenario in scenarios:
+        print(f"Running {scenario['target']} chars={scenario['chars']} concurrency={scenario['concurrency']} ...", file=sys.stderr)
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            results.append(pool.submit(_run_scenario, scenario).result())
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {_scenario_key(r): r for r in json.load(f)["results"]}
+
+    print(f"\nMock LLM latency: {args.latency}, {args.executions} executions per scenario")
+    _print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=2)
+
+    regressions = _regressions(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,6 +13,69 @@ DB_DIR = os.path.join(DATA_DIR, 'db')
 SEED_DATA_PATH = os.path.join(DATA_DIR, 'seed_data.json')
 DB_PATH = os.path.join(DB_DIR, 'db.json')
 
+# Storage backend for all TinyDB-style tables: "sqlite" (indexed, row-level writes)
+# or "tinydb" (legacy single JSON file). SQLite files live next to the JSON path (db.json -> db.sqlite).
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite").lower()
+
+# Where executions run: "inline" (FastAPI background task in the API process) or
+# "worker" (durable job queue, processed by `python -m backend.worker`).
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "inline").lower()
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", os.path.join(DATA_DIR, 'jobs.sqlite'))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))  # reclaimed if no heartbeat for this long
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "2"))
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "1.0"))
+
+# PDF extraction (src/components/pdf_extraction.py): documents with at least
+# PDF_PARALLEL_MIN_PAGES pages are split across PDF_EXTRACT_WORKERS processes.
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))
+PDF_CACHE_MAX_CHARS = int(os.getenv("PDF_CACHE_MAX_CHARS", "50000000"))  # extracted text kept in memory
+
+# LLM pricing for usage/cost accounting (src/engine/usage.py): USD per million
+# [input, output, cached input] tokens, matched on the longest model-name prefix.
+# Without a cached price, context-cached input tokens are priced as input.
+# Override with a JSON object, e.g. LLM_PRICING='{"gemini-2.5-pro": [1.25, 10.0, 0.31]}'.
+LLM_PRICING = {
+    "gemini-1.5-flash": [0.075, 0.30, 0.01875],
+    "gemini-1.5-pro": [1.25, 5.00, 0.3125],
+    "gemini-2.0-flash": [0.10, 0.40, 0.025],
+    "gemini-2.5-flash": [0.30, 2.50, 0.075],
+    "gemini-2.5-flash-lite": [0.10, 0.40, 0.025],
+    "gemini-2.5-pro": [1.25, 10.00, 0.31],
+    "gpt-4o": [2.50, 10.00, 1.25],
+    "gpt-4o-mini": [0.15, 0.60, 0.075],
+}
+LLM_PRICING.update(json.loads(os.getenv("LLM_PRICING", "{}")))
+
+# Model fallback and hedged requests (src/engine/model_routing.py). Workflows
+# configure fallback chains next to default_model_mapping ("fallback_models",
+# optional "latency_budgets" and "hedge_percentile"). A step whose model has not
+# answered within the LLM_HEDGE_PERCENTILE of its recent latencies also sends the
+# request to the next model and keeps the first answer. Until LLM_HEDGE_MIN_SAMPLES
+# calls have been observed, LLM_HEDGE_DEFAULT_BUDGET seconds are used (0 = no hedging).
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_DEFAULT_BUDGET = float(os.getenv("LLM_HEDGE_DEFAULT_BUDGET", "120"))
+
+# Circuit breaker per (provider, model) (src/engine/circuit_breaker.py): opens when
+# at least LLM_CIRCUIT_ERROR_RATE of the last LLM_CIRCUIT_WINDOW calls failed (and
+# LLM_CIRCUIT_MIN_CALLS were made). Calls then fail fast (or go to the workflow's
+# fallback model) for LLM_CIRCUIT_OPEN_SECONDS, after which LLM_CIRCUIT_HALF_OPEN_PROBES
+# probe calls decide whether it closes again.
+LLM_CIRCUIT_BREAKER_ENABLED = os.getenv("LLM_CIRCUIT_BREAKER_ENABLED", "True").lower() == "true"
+LLM_CIRCUIT_WINDOW = int(os.getenv("LLM_CIRCUIT_WINDOW", "20"))
+LLM_CIRCUIT_MIN_CALLS = int(os.getenv("LLM_CIRCUIT_MIN_CALLS", "5"))
+LLM_CIRCUIT_ERROR_RATE = float(os.getenv("LLM_CIRCUIT_ERROR_RATE", "0.5"))
+LLM_CIRCUIT_OPEN_SECONDS = float(os.getenv("LLM_CIRCUIT_OPEN_SECONDS", "30"))
+LLM_CIRCUIT_HALF_OPEN_PROBES = int(os.getenv("LLM_CIRCUIT_HALF_OPEN_PROBES", "1"))
+
+# Tracing (src/components/tracing.py): spans of every execution run are written
+# as JSON lines to TRACE_DIR/<execution_id>.jsonl (GET /executions/{id}/timeline).
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "True").lower() == "true"
+TRACE_DIR = os.getenv("TRACE_DIR", os.path.join(DATA_DIR, 'traces'))
+TRACE_RETENTION_DAYS = float(os.getenv("TRACE_RETENTION_DAYS", "7"))
+
 # Ensure DB Directory Exists
 os.makedirs(DB_DIR, exist_ok=True)
 
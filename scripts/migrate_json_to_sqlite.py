@@ -0,0 +1,31 @@
+import sys
+import os
+import argparse
+
+# Add project root to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.database.sqlite_storage import migrate_json_to_sqlite, sqlite_path_for
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+DEFAULT_SOURCES = [
+    os.path.join(DATA_DIR, 'db.json'),
+    os.path.join(DATA_DIR, 'db_mock.json'),
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copy TinyDB JSON databases into SQLite storage.")
+    parser.add_argument("sources", nargs="*", default=DEFAULT_SOURCES, help="TinyDB JSON files to migrate")
+    parser.add_argument("--force", action="store_true", help="Replace tables that already exist in the SQLite file")
+    args = parser.parse_args()
+
+    for source in args.sources:
+        if not os.path.exists(source):
+            print(f"Skipping {source}: file not found")
+            continue
+
+        target = sqlite_path_for(source)
+        print(f"Migrating {source} -> {target}")
+        counts = migrate_json_to_sqlite(source, target, force=args.force)
+        for table, count in counts.items():
+            print(f"  {table}: {count} documents")
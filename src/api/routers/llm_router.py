@@ -12,11 +12,11 @@ class LLMRequest(BaseModel):
 @router.post("/generate")
 async def generate_text(request: LLMRequest):
     """
-    Wraps LLMHandler.call_llm.
+    Wraps LLMHandler.call_llm_async.
     """
     try:
         handler = LLMHandler()
-        response = handler.call_llm(request.prompts, model=request.model)
+        response = await handler.call_llm_async(request.prompts, model=request.model)
         return {"response": response}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -3,8 +3,11 @@ from typing import List, Dict, Any
 import uuid
 import shutil
 import os
+import config
 from src.engine.orchestrator import Orchestrator
 from src.api.routers.db_router import get_db
+from src.database.job_queue import get_job_queue, SRC_WORKFLOW
+from src.components.pdf_extraction import get_pdf_extractor
 
 router = APIRouter()
 
@@ -15,6 +18,7 @@ def run_workflow_background(job_id: str, file_paths: Dict[str, str], workflow_id
     Updates job status in DB.
     """
     db = get_db()
+    orchestrator = None
     try:
         # Update status to RUNNING
         db.upsert_document("jobs", job_id, {"status": "RUNNING"})
@@ -31,12 +35,7 @@ def run_workflow_background(job_id: str, file_paths: Dict[str, str], workflow_id
                 ext = os.path.splitext(path)[1].lower()
                 
                 if ext == ".pdf":
-                    import fitz  # PyMuPDF
-                    text = ""
-                    with fitz.open(path) as doc:
-                        for page in doc:
-                            text += page.get_text()
-                    inputs[key] = text
+                    inputs[key] = get_pdf_extractor().extract_file(path)
                 else:
                     # Default to text reading
                     with open(path, "r", encoding="utf-8") as f:
@@ -57,15 +56,16 @@ def run_workflow_background(job_id: str, file_paths: Dict[str, str], workflow_id
         # Update status to COMPLETED
         db.upsert_document("jobs", job_id, {
             "status": "COMPLETED",
-            "result": result
+            "result": result,
+            "usage": orchestrator.usage
         })
         
     except Exception as e:
         print(f"Job {job_id} failed: {e}")
-        db.upsert_document("jobs", job_id, {
-            "status": "FAILED",
-            "error": str(e)
-        })
+        failed = {"status": "FAILED", "error": str(e)}
+        if orchestrator is not None:
+            failed["usage"] = orchestrator.usage
+        db.upsert_document("jobs", job_id, failed)
     finally:
         # Cleanup temp files
         for path in file_paths.values():
@@ -112,8 +112,15 @@ async def run_workflow(
         "created_at": str(uuid.uuid1()) # Timestamp proxy
     })
 
-    # Trigger Background Task
-    background_tasks.add_task(run_workflow_background, job_id, file_paths, workflow_id)
+    # Trigger Background Task (or hand it to the worker tier, see backend/worker.py)
+    if config.EXECUTION_MODE == "worker":
+        get_job_queue().enqueue(SRC_WORKFLOW, {
+            "job_id": job_id,
+            "file_paths": {key: os.path.abspath(path) for key, path in file_paths.items()},
+            "workflow_id": workflow_id
+        })
+    else:
+        background_tasks.add_task(run_workflow_background, job_id, file_paths, workflow_id)
 
     return {"job_id": job_id, "status": "PENDING"}
 
@@ -128,5 +135,6 @@ async def get_status(job_id: str):
         "job_id": job_id,
         "status": doc.get("status"),
         "result": doc.get("result"),
-        "error": doc.get("error")
+        "error": doc.get("error"),
+        "usage": doc.get("usage")
     }
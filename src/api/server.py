@@ -46,11 +46,13 @@ async def startup_event():
 
 @app.get("/")
 async def health_check():
-    """Health check endpoint."""
+    """Health check endpoint, with the LLM circuit breaker states."""
+    from src.engine.circuit_breaker import get_circuit_breakers
     return {
         "status": "healthy",
         "service": "Cognitive Quorum API",
-        "version": "2.0.0"
+        "version": "2.0.0",
+        "llm_circuits": get_circuit_breakers().snapshot()
     }
 
 # Import and Include Routers
@@ -0,0 +1,224 @@
+import json
+import re
+from typing import Any, Iterator, List, Optional, Tuple
+
+# Where a JSON value may start in free text. An object has to open with a key
+# (or be empty), which skips prose braces like "{x}" without trying to parse them.
+_OBJECT_START = re.compile(r'\{\s*["}]')
+_VALUE_START = re.compile(r'\{\s*["}]|\[\s*[\[\]{"\-0-9tfn]')
+
+_STRUCTURAL = re.compile(r'[{}\[\]",]')
+_STRING_SPECIAL = re.compile(r'["\\\x00-\x1f]')
+_HEX4 = re.compile(r'[0-9a-fA-F]{4}')
+
+_CLOSERS = {'{': '}', '[': ']'}
+_VALID_ESCAPES = frozenset('"\\/bfnrt')
+_CONTROL_ESCAPES = {'\n': '\\n', '\r': '', '\t': '\\t'}
+
+
+class _Container:
+    __slots__ = ("closer", "start", "comma", "comma_piece")
+
+    def __init__(self, closer: str, start: int):
+        self.closer = closer
+        self.start = start          # buffer offset of the opening bracket
+        self.comma: Optional[int] = None       # buffer offset of the last comma
+        self.comma_piece: Optional[int] = None  # index of that comma in the piece list
+
+
+def _copy_string(text: str, pos: int, pieces: List[str]) -> Tuple[bool, int, int]:
+    """
+    Copies a JSON string body starting after its opening quote, repairing it on
+    the way: invalid escapes get their backslash escaped, raw control characters
+    are escaped. Returns (closed, position after the string, characters written).
+    """
+    written = 0
+    while True:
+        match = _STRING_SPECIAL.search(text, pos)
+        if match is None:
+            rest = text[pos:]
+            pieces.append(rest)
+            return False, len(text), written + len(rest)
+
+        index = match.start()
+        if index > pos:
+            pieces.append(text[pos:index])
+            written += index - pos
+        char = text[index]
+
+        if char == '"':
+            pieces.append('"')
+            return True, index + 1, written + 1
+        if char == '\\':
+            following = text[index + 1:index + 2]
+            if not following:
+                # Truncated right after the backslash: drop it
+                return False, len(text), written
+            if following in _VALID_ESCAPES:
+                piece, pos = text[index:index + 2], index + 2
+            elif following == 'u' and _HEX4.match(text, index + 2):
+                piece, pos = text[index:index + 6], index + 6
+            else:
+                piece, pos = '\\\\', index + 1
+        else:
+            piece = _CONTROL_ESCAPES[char] if char in _CONTROL_ESCAPES else '\\u%04x' % ord(char)
+            pos = index + 1
+
+        pieces.append(piece)
+        written += len(piece)
+
+
+def _parse_spans(document: str, spans: List[Tuple[int, int]]) -> List[Any]:
+    """Parses the outermost nested containers that are valid JSON on their own."""
+    values = []
+    covered_until = -1
+    for start, end in sorted(spans):
+        if start < covered_until:
+            continue
+        try:
+            values.append(json.loads(document[start:end]))
+            covered_until = end
+        except ValueError:
+            pass
+    return values
+
+
+def _close_truncated(document: str, stack: List[_Container], in_string: bool) -> Iterator[str]:
+    """
+    Completions for a document cut off mid-value: first as-is (closing the open
+    string and containers), then rolled back to the last complete element.
+    """
+    closers = ''.join(container.closer for container in reversed(stack))
+    if in_string:
+        tail = document + '"'
+    else:
+        tail = document.rstrip()
+        if tail.endswith(','):
+            tail = tail[:-1]
+        elif tail.endswith(':'):
+            tail += ' null'
+    yield tail + closers
+
+    for level in range(len(stack) - 1, -1, -1):
+        container = stack[level]
+        # An open innermost container with no complete element is emptied,
+        # unless it is the top-level value itself
+        if container.comma is not None or 0 < level == len(stack) - 1:
+            cut = container.comma if container.comma is not None else container.start + 1
+            yield document[:cut] + ''.join(c.closer for c in reversed(stack[:level + 1]))
+            if container.comma is not None:
+                return
+
+
+def _scan_value(text: str, start: int, allow_arrays: bool) -> Tuple[int, List[Any]]:
+    """
+    Scans one top-level value starting at text[start] ('{' or '['), copying a
+    repaired version of it into a buffer. Returns (position after the value,
+    parsed values). Every character is visited once; runs of ordinary
+    characters are copied as slices.
+    """
+    pieces: List[str] = []
+    size = 0
+    stack: List[_Container] = []
+    spans: List[Tuple[int, int]] = []  # closed containers that may be candidates
+    in_string = False
+    pos = start
+    length = len(text)
+
+    while pos < length:
+        match = _STRUCTURAL.search(text, pos)
+        if match is None:
+            rest = text[pos:]
+            pieces.append(rest)
+            size += len(rest)
+            pos = length
+            break
+
+        index = match.start()
+        if index > pos:
+            pieces.append(text[pos:index])
+            size += index - pos
+        char = text[index]
+        pos = index + 1
+
+        if char == '"':
+            pieces.append('"')
+            closed, pos, written = _copy_string(text, pos, pieces)
+            size += 1 + written
+            if not closed:
+                in_string = True
+                break
+        elif char in _CLOSERS:
+            stack.append(_Container(_CLOSERS[char], size))
+            pieces.append(char)
+            size += 1
+        elif char == ',':
+            stack[-1].comma, stack[-1].comma_piece = size, len(pieces)
+            pieces.append(char)
+            size += 1
+        else:
+            if not any(container.closer == char for container in stack):
+                continue  # stray closer: drop it
+            while stack:
+                container = stack.pop()
+                # Trailing comma before the closer
+                if container.comma_piece is not None and all(
+                        piece.isspace() for piece in pieces[container.comma_piece + 1:]):
+                    pieces[container.comma_piece] = ''
+                    size -= 1
+                # Closers that don't match are auto-closed up to the matching one
+                pieces.append(container.closer)
+                size += 1
+                if container.closer == '}' or allow_arrays:
+                    spans.append((container.start, size))
+                if container.closer == char:
+                    break
+
+            if not stack:
+                document = ''.join(pieces)
+                try:
+                    return pos, [json.loads(document)]
+                except ValueError:
+                    return pos, _parse_spans(document, spans[:-1])
+
+    # Reached the end of the text with open containers: truncated output
+    document = ''.join(pieces)
+    for attempt in _close_truncated(document, stack, in_string):
+        try:
+            return pos, [json.loads(attempt)]
+        except ValueError:
+            continue
+    return pos, _parse_spans(document, spans)
+
+
+def iter_json_candidates(text: str, allow_arrays: bool = False) -> Iterator[Any]:
+    """
+    Yields the JSON values embedded in LLM output, in order, in a single pass.
+
+    Tolerates surrounding prose and Markdown fences, invalid escapes, raw
+    newlines inside strings, trailing commas, mismatched closers and
+    truncation (open strings and containers are closed). When a value is
+    broken beyond that, its largest valid nested objects are yielded instead.
+    Only objects are yielded unless `allow_arrays` is set.
+    """
+    if not text:
+        return
+    start_pattern = _VALUE_START if allow_arrays else _OBJECT_START
+    pos = 0
+    while True:
+        match = start_pattern.search(text, pos)
+        if match is None:
+            return
+        pos, values = _scan_value(text, match.start(), allow_arrays)
+        yield from values
+
+
+def select_candidate(candidates: List[Any]) -> Optional[Any]:
+    """
+    Picks the parsed value that looks like the agent's answer: the first one
+    with a 'metadata' key, otherwise the last one (usually the final answer).
+    """
+    for candidate in candidates:
+        if isinstance(candidate, dict) and 'metadata' in candidate:
+            return candidate
+    return candidates[-1] if candidates else None
@@ -0,0 +1,222 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# One field update: (dotted path, value so far, complete). Paths use object keys
+# and array indices, e.g. "executive_summary" or "sections.2.content".
+FieldUpdate = Tuple[str, Any, bool]
+
+_START, _VALUE, _VALUE_OR_END, _KEY, _KEY_OR_END, _COLON, _AFTER_VALUE, _STRING, _SCALAR, _DONE = range(10)
+
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_CHARS = frozenset("-+0123456789.eEtruefalsn")
+_WHITESPACE = frozenset(" \t\r\n")
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class JSONStreamError(ValueError):
+    """The streamed text is not valid JSON (or ended before the document was complete)."""
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON document as it arrives in chunks. feed() returns the fields
+    that changed in the chunk: completed scalar values, and the text so far of
+    a string value that is still being written (complete=False), so long
+    fields can be shown while they are generated.
+
+    Text before the first '{' or '[' (e.g. a ```json fence) and after the
+    document is ignored. close() raises JSONStreamError if the document was
+    cut off, without waiting for a parse of the full text to fail.
+    """
+
+    def __init__(self):
+        self._stack: List[List[Any]] = []  # [closer, current key or array index]
+        self._state = _START
+        self._text: List[str] = []         # decoded characters of the current string
+        self._is_key = False
+        self._escape: Optional[str] = None  # escape sequence read so far (after the backslash)
+        self._high_surrogate: Optional[int] = None
+        self._token: List[str] = []
+        self._consumed = 0
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    @property
+    def path(self) -> str:
+        return ".".join(str(frame[1]) for frame in self._stack)
+
+    def _error(self, message: str, position: int) -> JSONStreamError:
+        return JSONStreamError(f"{message} at character {self._consumed + position}")
+
+    def feed(self, chunk: str) -> List[FieldUpdate]:
+        updates: Dict[str, Tuple[Any, bool]] = {}
+        i, n = 0, len(chunk)
+        while i < n:
+            state = self._state
+            if state == _STRING:
+                i = self._read_string(chunk, i, updates)
+                continue
+            c = chunk[i]
+            if state == _SCALAR:
+                if c in _SCALAR_CHARS:
+                    self._token.append(c)
+                    i += 1
+                    continue
+                self._end_scalar(updates, i)
+                continue
+            i += 1
+            if c in _WHITESPACE:
+                continue
+            if state == _START:
+                if c in "{[":
+                    self._open(c)
+            elif state == _DONE:
+                break
+            elif state in (_VALUE, _VALUE_OR_END):
+                if c == "]" and state == _VALUE_OR_END:
+                    self._close()
+                elif c in "{[":
+                    self._open(c)
+                elif c == '"':
+                    self._start_string(is_key=False)
+                elif c in "-0123456789tfn":
+                    self._token = [c]
+                    self._state = _SCALAR
+                else:
+                    raise self._error(f"Unexpected {c!r}, expected a value", i - 1)
+            elif state in (_KEY, _KEY_OR_END):
+                if c == "}" and state == _KEY_OR_END:
+                    self._close()
+                elif c == '"':
+                    self._start_string(is_key=True)
+                else:
+                    raise self._error(f"Unexpected {c!r}, expected a key", i - 1)
+            elif state == _COLON:
+                if c != ":":
+                    raise self._error(f"Unexpected {c!r}, expected ':'", i - 1)
+                self._state = _VALUE
+            elif state == _AFTER_VALUE:
+                frame = self._stack[-1]
+                if c == ",":
+                    if frame[0] == "}":
+                        self._state = _KEY
+                    else:
+                        frame[1] += 1
+                        self._state = _VALUE
+                elif c == frame[0]:
+                    self._close()
+                else:
+                    raise self._error(f"Unexpected {c!r}, expected ',' or {frame[0]!r}", i - 1)
+
+        if self._state == _STRING and not self._is_key:
+            text = "".join(self._text)
+            self._text = [text]
+            updates[self.path] = (text, False)
+        self._consumed += n
+        return [(path, value, complete) for path, (value, complete) in updates.items()]
+
+    def close(self):
+        """Raises JSONStreamError unless a complete document was read."""
+        if self._state == _DONE:
+            return
+        if self._state == _START:
+            raise JSONStreamError("No JSON document in the response")
+        where = " inside a string" if self._state == _STRING else ""
+        raise JSONStreamError(
+            f"Truncated JSON: {len(self._stack)} unclosed container(s){where} at '{self.path}' "
+            f"after {self._consumed} characters"
+        )
+
+    def _open(self, c: str):
+        if c == "{":
+            self._stack.append(["}", None])
+            self._state = _KEY_OR_END
+        else:
+            self._stack.append(["]", 0])
+            self._state = _VALUE_OR_END
+
+    def _close(self):
+        self._stack.pop()
+        self._state = _AFTER_VALUE if self._stack else _DONE
+
+    def _start_string(self, is_key: bool):
+        self._is_key = is_key
+        self._text = []
+        self._state = _STRING
+
+    def _end_value(self, value: Any, updates: Dict[str, Tuple[Any, bool]]):
+        updates[self.path] = (value, True)
+        self._state = _AFTER_VALUE
+
+    def _end_scalar(self, updates: Dict[str, Tuple[Any, bool]], position: int):
+        token = "".join(self._token)
+        try:
+            value = json.loads(token)
+        except ValueError:
+            raise self._error(f"Invalid value {token!r}", position) from None
+        self._end_value(value, updates)
+
+    def _read_string(self, chunk: str, i: int, updates: Dict[str, Tuple[Any, bool]]) -> int:
+        n = len(chunk)
+        while i < n:
+            if self._escape is not None:
+                i = self._read_escape(chunk, i)
+                continue
+            match = _STRING_SPECIAL.search(chunk, i)
+            if match is None:
+                self._text.append(chunk[i:])
+                return n
+            self._text.append(chunk[i:match.start()])
+            i = match.end()
+            if match.group() == "\\":
+                self._escape = ""
+                continue
+            self._flush_surrogate()
+            text = "".join(self._text)
+            if self._is_key:
+                self._stack[-1][1] = text
+                self._state = _COLON
+            else:
+                self._end_value(text, updates)
+            return i
+        return i
+
+    def _read_escape(self, chunk: str, i: int) -> int:
+        if self._escape == "":
+            c = chunk[i]
+            if c == "u":
+                self._escape = "u"
+            elif c in _ESCAPES:
+                self._flush_surrogate()
+                self._text.append(_ESCAPES[c])
+                self._escape = None
+            else:
+                raise self._error(f"Invalid escape '\\{c}'", i)
+            return i + 1
+        # \uXXXX: collect the four hex digits, possibly across chunks
+        take = chunk[i:i + 5 - len(self._escape)]
+        self._escape += take
+        if len(self._escape) == 5:
+            try:
+                code = int(self._escape[1:], 16)
+            except ValueError:
+                raise self._error(f"Invalid escape '\\{self._escape}'", i) from None
+            self._escape = None
+            if 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+                self._text.append(chr(0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)))
+                self._high_surrogate = None
+            else:
+                self._flush_surrogate()
+                if 0xD800 <= code < 0xDC00:
+                    self._high_surrogate = code
+                else:
+                    self._text.append(chr(code))
+        return i + len(take)
+
+    def _flush_surrogate(self):
+        if self._high_surrogate is not None:
+            self._text.append(chr(self._high_surrogate))
+            self._high_surrogate = None
@@ -0,0 +1,180 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def _open_pdf(data: bytes):
+    import fitz  # PyMuPDF
+    return fitz.open(stream=data, filetype="pdf")
+
+
+def _extract_page_range(data: bytes, start: int, stop: int) -> List[str]:
+    """Process-pool task: text of pages [start, stop)."""
+    with _open_pdf(data) as doc:
+        return [doc[index].get_text() for index in range(start, stop)]
+
+
+class PDFExtractionService:
+    """
+    Text extraction for uploaded PDFs (PyMuPDF).
+
+    Results are cached by the SHA-256 of the file bytes, so re-uploads of the
+    same document (e.g. the shared assignment prompt) are free. Large documents
+    are split into page ranges that are extracted in a process pool; pages are
+    collected into a list and joined once.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        parallel_min_pages: int = 32,
+        pages_per_chunk: int = 16,
+        cache_max_chars: int = 50_000_000
+    ):
+        self.max_workers = max_workers
+        self.parallel_min_pages = parallel_min_pages
+        self.pages_per_chunk = pages_per_chunk
+        self.cache_max_chars = cache_max_chars
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_chars = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _get_cached(self, digest: str) -> Optional[str]:
+        with self._lock:
+            text = self._cache.get(digest)
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._cache.move_to_end(digest)
+            return text
+
+    def _put_cached(self, digest: str, text: str):
+        if len(text) > self.cache_max_chars:
+            return
+        with self._lock:
+            if digest in self._cache:
+                return
+            self._cache[digest] = text
+            self._cache_chars += len(text)
+            # Evict least recently used documents until under the size budget
+            while self._cache_chars > self.cache_max_chars:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_chars -= len(evicted)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    def _page_ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        return [(start, min(start + self.pages_per_chunk, page_count)) for start in range(0, page_count, self.pages_per_chunk)]
+
+    def iter_pages(self, data: bytes) -> Iterator[str]:
+        """
+        Yields the text of each page in order, without building the whole document
+        text first. Cached documents are not split back into pages; they are
+        yielded as a single chunk.
+        """
+        digest = self.content_hash(data)
+        cached = self._get_cached(digest)
+        if cached is not None:
+            yield cached
+            return
+
+        pages, chars = [], 0
+        for page_text in self._extract_pages(data):
+            chars += len(page_text)
+            if chars <= self.cache_max_chars:
+                pages.append(page_text)
+            yield page_text
+        if chars <= self.cache_max_chars:
+            self._put_cached(digest, "".join(pages))
+
+    def _extract_pages(self, data: bytes) -> Iterator[str]:
+        with _open_pdf(data) as doc:
+            page_count = doc.page_count
+            if page_count < self.parallel_min_pages or self.max_workers <= 1:
+                for page in doc:
+                    yield page.get_text()
+                return
+
+        # map() submits every range up front and returns results in page order,
+        # so the first pages are available while later ranges are still running
+        ranges = self._page_ranges(page_count)
+        done = 0
+        try:
+            chunks = self._get_pool().map(
+                _extract_page_range,
+                [data] * len(ranges),
+                [start for start, _ in ranges],
+                [stop for _, stop in ranges]
+            )
+            for chunk in chunks:
+                yield from chunk
+                done += len(chunk)
+        except BrokenProcessPool:
+            # A crashed worker takes the pool down; start a fresh one next time
+            with self._lock:
+                self._pool = None
+            print("[PDFExtraction] Process pool failed; extracting the remaining pages sequentially")
+            yield from _extract_page_range(data, done, page_count)
+
+    def extract_text(self, data: bytes) -> str:
+        """
+        Returns the text of a PDF held in memory (pages concatenated).
+        """
+        return "".join(self.iter_pages(data))
+
+    def extract_file(self, path: str) -> str:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found: {path}")
+        with open(path, "rb") as handle:
+            return self.extract_text(handle.read())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "cached_documents": len(self._cache),
+                "cached_chars": self._cache_chars,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "max_workers": self.max_workers,
+                "parallel_min_pages": self.parallel_min_pages
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+_pdf_extractor: Optional[PDFExtractionService] = None
+
+
+def get_pdf_extractor() -> PDFExtractionService:
+    """Process-wide extraction service configured from the root config."""
+    global _pdf_extractor
+    if _pdf_extractor is None:
+        import config
+        _pdf_extractor = PDFExtractionService(
+            max_workers=config.PDF_EXTRACT_WORKERS,
+            parallel_min_pages=config.PDF_PARALLEL_MIN_PAGES,
+            cache_max_chars=config.PDF_CACHE_MAX_CHARS
+        )
+    return _pdf_extractor
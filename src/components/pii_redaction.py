@@ -0,0 +1,71 @@
+import re
+from typing import Any, Dict, List
+
+# PII patterns, in priority order: where two patterns match at the same position,
+# the earlier one wins. Email local parts only start at the beginning of a run of
+# address characters, so long tokens without "@" are scanned once, not once per character.
+PII_PATTERNS = {
+    "EMAIL": r"(?<![a-zA-Z0-9._%+-])[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
+    "PHONE_FI": r"(?:\+358|0)\s?(?:4[0-9]|50|457)\s?[0-9]{3,4}\s?[0-9]{3,4}",
+    "HETU": r"[0-3][0-9][0-1][0-9][0-9]{2}[-+A-FU-Y][0-9]{3}[0-9A-FHJ-NPR-Y]",
+    "CREDIT_CARD": r"\b(?:\d[ -]*?){13,16}\b",
+    "IP_ADDRESS": r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b"
+}
+
+# Every pattern except EMAIL starts with a digit or "+": one lookahead lets the
+# scanner skip those four alternatives at all other positions
+_DIGIT_LED = ("PHONE_FI", "HETU", "CREDIT_CARD", "IP_ADDRESS")
+PII_REGEX = re.compile(
+    f"(?P<EMAIL>{PII_PATTERNS['EMAIL']})"
+    + "|(?=[0-9+])(?:" + "|".join(f"(?P<{name}>{PII_PATTERNS[name]})" for name in _DIGIT_LED) + ")"
+)
+
+# Non-printable characters that actually occur in pasted text (line breaks, tabs,
+# C1 controls, no-break/zero-width spaces); removed with a fast regex scan
+_COMMON_NON_PRINTABLE = re.compile(r"[\x00-\x1f\x7f-\xa0\xad\u200b-\u200f\u2028-\u202f\ufeff]+")
+
+
+class _PrintableTable(dict):
+    """
+    str.translate table that drops non-printable characters (same rule as
+    str.isprintable). Each distinct code point is classified once and cached,
+    so the per-character work stays in C.
+    """
+
+    def __missing__(self, codepoint: int):
+        value = codepoint if chr(codepoint).isprintable() else None
+        self[codepoint] = value
+        return value
+
+
+_printable_table = _PrintableTable()
+
+
+def strip_non_printable(text: str) -> str:
+    """Removes non-printable characters (control characters, line breaks, ...)."""
+    if text.isprintable():
+        return text
+    text = _COMMON_NON_PRINTABLE.sub("", text)
+    if text.isprintable():
+        return text
+    # Rare characters (other format/separator/unassigned code points)
+    return text.translate(_printable_table)
+
+
+def redact_pii(text: str) -> Dict[str, Any]:
+    """
+    Detects and redacts all PII types in a single scan of `text`.
+
+    Returns {"text": redacted text, "counts": {type: n}, "offsets": [{"type", "start", "end"}]}
+    where offsets refer to the input text. Each match is replaced with [REDACTED_<TYPE>].
+    """
+    counts: Dict[str, int] = {}
+    offsets: List[Dict[str, Any]] = []
+
+    def replace(match: re.Match) -> str:
+        pii_type = match.lastgroup
+        counts[pii_type] = counts.get(pii_type, 0) + 1
+        offsets.append({"type": pii_type, "start": match.start(), "end": match.end()})
+        return f"[REDACTED_{pii_type}]"
+
+    return {"text": PII_REGEX.sub(replace, text), "counts": counts, "offsets": offsets}
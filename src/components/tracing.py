@@ -0,0 +1,345 @@
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Span model following OpenTelemetry semantics (trace/span ids, parent links,
+# unix-nanosecond timestamps, OK/ERROR status, attributes and events), kept
+# dependency-free. Finished spans are written as JSON lines, one file per
+# execution, by a background thread, and read back for GET /executions/{id}/timeline.
+
+STATUS_UNSET = "UNSET"
+STATUS_OK = "OK"
+STATUS_ERROR = "ERROR"
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_span_id", "execution_id", "kind",
+                 "start_time_unix_nano", "end_time_unix_nano", "attributes", "events",
+                 "status_code", "status_message")
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str], execution_id: str,
+                 attributes: Optional[Dict[str, Any]] = None, kind: str = "INTERNAL",
+                 start_time_unix_nano: Optional[int] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_span_id = parent_span_id
+        self.execution_id = execution_id
+        self.kind = kind
+        self.start_time_unix_nano = start_time_unix_nano or time.time_ns()
+        self.end_time_unix_nano: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status_code = STATUS_UNSET
+        self.status_message: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({"name": name, "time_unix_nano": time.time_ns(), "attributes": attributes})
+
+    def set_error(self, error: Any):
+        self.status_code = STATUS_ERROR
+        self.status_message = str(error)[:500]
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.end_time_unix_nano or time.time_ns()
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_time_unix_nano,
+            "end_time_unix_nano": end,
+            "status": {"code": self.status_code, "message": self.status_message},
+            "attributes": self.attributes,
+            "events": self.events
+        }
+
+
+class _NoopSpan:
+    """Returned outside a trace, so instrumented code never has to check."""
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def add_event(self, name: str, **attributes):
+        pass
+
+    def set_error(self, error: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+class JsonLinesSpanExporter:
+    """
+    Writes finished spans to <directory>/<execution_id>.jsonl.
+
+    Spans are buffered in memory per trace and handed to a background writer
+    thread when the trace's root span ends (or MAX_BUFFERED_SPANS have piled
+    up), so exporting never does file I/O on the event loop. read() includes
+    the buffered spans of a run still in progress. The writer deletes span
+    files not modified for `retention_days` (0 = keep forever).
+    An execution runs in one process at a time, so appends never interleave across processes.
+    """
+
+    MAX_BUFFERED_SPANS = 1000
+    PRUNE_INTERVAL_SECONDS = 3600
+
+    def __init__(self, directory: str, retention_days: float = 0):
+        self.directory = directory
+        self.retention_days = retention_days
+        self._buffers: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}  # trace_id -> (execution_id, spans)
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Tuple[str, List[Dict[str, Any]]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._last_prune = 0.0
+
+    def _path(self, execution_id: str) -> str:
+        safe_id = "".join(c for c in execution_id if c.isalnum() or c in "-_") or "unknown"
+        return os.path.join(self.directory, f"{safe_id}.jsonl")
+
+    def export(self, span: Span):
+        with self._lock:
+            execution_id, spans = self._buffers.setdefault(span.trace_id, (span.execution_id, []))
+            spans.append(span.to_dict())
+            if span.parent_span_id is not None and len(spans) < self.MAX_BUFFERED_SPANS:
+                return
+            if span.parent_span_id is None:
+                del self._buffers[span.trace_id]
+            else:
+                self._buffers[span.trace_id] = (execution_id, [])
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="span-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+        self._queue.put((execution_id, spans))
+
+    def _run(self):
+        while True:
+            execution_id, spans = self._queue.get()
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self._path(execution_id), "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(span, ensure_ascii=False, default=str) + "\n" for span in spans)
+                self._prune()
+            except OSError as e:
+                print(f"[Tracing] Failed to write spans of execution {execution_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _prune(self):
+        now = time.time()
+        if not self.retention_days or now - self._last_prune < self.PRUNE_INTERVAL_SECONDS:
+            return
+        self._last_prune = now
+        cutoff = now - self.retention_days * 86400
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".jsonl") and entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass  # removed concurrently
+
+    def flush(self):
+        """Waits until every span handed to the writer is on disk."""
+        self._queue.join()
+
+    def close(self):
+        """Writes the spans of unfinished runs too (process exit)."""
+        with self._lock:
+            pending, self._buffers = list(self._buffers.values()), {}
+        for execution_id, spans in pending:
+            if spans:
+                self._queue.put((execution_id, spans))
+        self.flush()
+
+    def read(self, execution_id: str) -> List[Dict[str, Any]]:
+        self.flush()
+        spans = []
+        path = self._path(execution_id)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        spans.append(json.loads(line))
+                    except ValueError:
+                        continue  # partially written line of a crashed process
+        with self._lock:
+            for buffered_execution, buffered in self._buffers.values():
+                if buffered_execution == execution_id:
+                    spans.extend(buffered)
+        return spans
+
+
+_exporter: Optional[JsonLinesSpanExporter] = None
+
+
+def get_exporter() -> Optional[JsonLinesSpanExporter]:
+    """Process-wide exporter from the root config (None when TRACING_ENABLED is off)."""
+    global _exporter
+    if _exporter is None:
+        import config
+        if not config.TRACING_ENABLED:
+            return None
+        _exporter = JsonLinesSpanExporter(config.TRACE_DIR, retention_days=config.TRACE_RETENTION_DAYS)
+    return _exporter
+
+
+def current_span():
+    return _current_span.get() or NOOP_SPAN
+
+
+def _export(span: Span):
+    exporter = get_exporter()
+    if exporter is None:
+        return
+    try:
+        exporter.export(span)
+    except OSError as e:
+        print(f"[Tracing] Failed to export span {span.name}: {e}")
+
+
+@contextmanager
+def start_trace(name: str, execution_id: str, **attributes) -> Iterator[Span]:
+    """
+    Starts the root span of an execution run. Each run (including resumes) is its own trace.
+    """
+    span = Span(name, uuid.uuid4().hex, None, execution_id, dict(attributes, **{"execution.id": execution_id}))
+    with _activate(span):
+        yield span
+
+
+@contextmanager
+def start_span(name: str, kind: str = "INTERNAL", **attributes) -> Iterator[Any]:
+    """
+    Starts a child of the current span. Outside a trace this yields a no-op span,
+    so library code (providers, storage) can be instrumented unconditionally.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    span = Span(name, parent.trace_id, parent.span_id, parent.execution_id, attributes, kind)
+    with _activate(span):
+        yield span
+
+
+@contextmanager
+def _activate(span: Span) -> Iterator[Span]:
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.set_error(e if str(e) else type(e).__name__)
+        raise
+    else:
+        if span.status_code == STATUS_UNSET:
+            span.status_code = STATUS_OK
+    finally:
+        _current_span.reset(token)
+        span.end_time_unix_nano = time.time_ns()
+        _export(span)
+
+
+def record_span(name: str, start_time_unix_nano: int, error: Optional[str] = None, **attributes):
+    """
+    Records an already finished child span of the current span (ending now),
+    for code that cannot wrap its work in a with-block.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return
+    span = Span(name, parent.trace_id, parent.span_id, parent.execution_id, attributes,
+                start_time_unix_nano=start_time_unix_nano)
+    if error:
+        span.set_error(error)
+    else:
+        span.status_code = STATUS_OK
+    span.end_time_unix_nano = time.time_ns()
+    _export(span)
+
+
+def build_timeline(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Waterfall view of exported spans: one entry per trace (execution run), with
+    its spans in depth-first order and times in ms relative to the trace start.
+    """
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    for span in spans:
+        traces.setdefault(span["trace_id"], []).append(span)
+
+    timeline = []
+    for trace_id, trace_spans in traces.items():
+        by_id = {span["span_id"]: span for span in trace_spans}
+        children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for span in trace_spans:
+            # Spans whose parent was never exported (crashed run) are shown as roots
+            parent = span["parent_span_id"] if span["parent_span_id"] in by_id else None
+            children.setdefault(parent, []).append(span)
+        for siblings in children.values():
+            siblings.sort(key=lambda s: s["start_time_unix_nano"])
+
+        trace_start = min(span["start_time_unix_nano"] for span in trace_spans)
+        trace_end = max(span["end_time_unix_nano"] for span in trace_spans)
+        ordered = []
+        pending = [(span, 0) for span in reversed(children.get(None, []))]
+        while pending:
+            span, depth = pending.pop()
+            ordered.append({
+                "name": span["name"],
+                "span_id": span["span_id"],
+                "parent_span_id": span["parent_span_id"],
+                "depth": depth,
+                "offset_ms": round((span["start_time_unix_nano"] - trace_start) / 1e6, 3),
+                "duration_ms": round((span["end_time_unix_nano"] - span["start_time_unix_nano"]) / 1e6, 3),
+                "status": span["status"]["code"],
+                "error": span["status"].get("message"),
+                "attributes": span["attributes"]
+            })
+            pending.extend((child, depth + 1) for child in reversed(children.get(span["span_id"], [])))
+
+        timeline.append({
+            "trace_id": trace_id,
+            "start_time_unix_nano": trace_start,
+            "duration_ms": round((trace_end - trace_start) / 1e6, 3),
+            "spans": ordered
+        })
+    timeline.sort(key=lambda trace: trace["start_time_unix_nano"])
+    return timeline
+
+
+# Attribute shown next to the span name in the text waterfall
+_LABEL_ATTRIBUTES = ("step.id", "hook", "model", "db.table")
+
+
+def render_waterfall(timeline: List[Dict[str, Any]], width: int = 60) -> str:
+    """Plain-text waterfall of build_timeline() output."""
+    lines = []
+    for trace in timeline:
+        total = trace["duration_ms"] or 1.0
+        lines.append(f"trace {trace['trace_id']}  {trace['duration_ms']:.1f} ms")
+        for span in trace["spans"]:
+            start = int(span["offset_ms"] / total * width)
+            length = max(1, int(span["duration_ms"] / total * width))
+            bar = " " * start + "#" * min(length, width - start)
+            detail = next((span["attributes"][key] for key in _LABEL_ATTRIBUTES if key in span["attributes"]), None)
+            label = ("  " * span["depth"] + span["name"] + (f" {detail}" if detail is not None else ""))[:40]
+            marker = " !" if span["status"] == STATUS_ERROR else ""
+            lines.append(f"{label:<40} |{bar:<{width}}| {span['offset_ms']:>9.1f} +{span['duration_ms']:.1f} ms{marker}")
+        lines.append("")
+    return "\n".join(lines)
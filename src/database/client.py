@@ -3,6 +3,7 @@ from tinydb.storages import Storage
 import json
 import os
 import config
+from src.database.sqlite_storage import open_database
 
 class UTF8JSONStorage(Storage):
     def __init__(self, path):
@@ -32,7 +33,7 @@ class DatabaseClient:
         if cls._instance is None:
             cls._instance = super(DatabaseClient, cls).__new__(cls)
             # Use path from config
-            cls._db = TinyDB(config.DB_PATH, storage=UTF8JSONStorage)
+            cls._db = open_database(config.DB_PATH, storage=UTF8JSONStorage)
         return cls._instance
 
     @property
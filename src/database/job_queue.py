@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Job kinds (handled by backend/worker.py)
+RUN_EXECUTION = "run_execution"        # backend WorkflowEngine execution
+RESUME_EXECUTION = "resume_execution"  # backend execution resumed from its checkpoint
+SRC_WORKFLOW = "src_workflow"          # src Orchestrator job (/orchestrator/run of the src API)
+
+
+class JobQueue:
+    """
+    Durable job queue in a local SQLite file, shared by the API processes
+    (producers) and the worker processes (consumers, see backend/worker.py).
+
+    Delivery is at-least-once: a worker leases a job for `lease_seconds` and
+    extends the lease with heartbeat(). If the worker dies, the lease expires
+    and the next claim() hands the job to another worker. A job that has been
+    claimed max_attempts times without finishing is marked failed.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60.0, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    worker_id TEXT,
+                    lease_expires REAL,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    execution_id TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_events_execution ON events (execution_id, id)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        return job
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> str:
+        """
+        Adds a job and returns its id.
+        """
+        job_id = str(uuid.uuid4())
+        now = datetime.now().isoformat()
+        self._connect().execute(
+            "INSERT INTO jobs (id, kind, payload, status, max_attempts, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(payload), QUEUED, max_attempts or self.max_attempts, now, now)
+        )
+        return job_id
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Leases the oldest runnable job to `worker_id`: a queued job, or a running
+        job whose lease has expired (its worker stopped heartbeating).
+        Returns the job (with the incremented `attempts`) or None if there is nothing to do.
+        """
+        conn = self._connect()
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers never claim the same job
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired jobs that used up their attempts are not retried again
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, worker_id = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+                (FAILED, "Lease expired after the last attempt", datetime.now().isoformat(), RUNNING, now)
+            )
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? OR (status = ? AND lease_expires < ?) ORDER BY created_at LIMIT 1",
+                (QUEUED, RUNNING, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            if row["status"] == RUNNING:
+                print(f"[JobQueue] Reclaiming job {row['id']} from worker {row['worker_id']} (lease expired)")
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (RUNNING, worker_id, now + self.lease_seconds, datetime.now().isoformat(), row["id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row["id"])
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """
+        Extends the lease. Returns False if the job is no longer leased to this worker.
+        """
+        cursor = self._connect().execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+            (time.time() + self.lease_seconds, datetime.now().isoformat(), job_id, worker_id, RUNNING)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = ?, lease_expires = NULL, error = NULL, updated_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+            (DONE, datetime.now().isoformat(), job_id, worker_id, RUNNING)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> bool:
+        """
+        Records a failed attempt. The job is queued again while attempts remain
+        (and `retry` is True), otherwise it is marked failed.
+        """
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = CASE WHEN ? AND attempts < max_attempts THEN ? ELSE ? END, "
+            "worker_id = NULL, lease_expires = NULL, error = ?, updated_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+            (retry, QUEUED, FAILED, error, datetime.now().isoformat(), job_id, worker_id, RUNNING)
+        )
+        return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def bump_cache_versions(self, *names: str):
+        """
+        Marks process-local caches as stale (e.g. "config" after a component edit).
+        Workers compare the versions when they claim a job and drop stale entries.
+        """
+        conn = self._connect()
+        for name in names:
+            conn.execute(
+                "INSERT INTO cache_versions (name, version) VALUES (?, 1) "
+                "ON CONFLICT (name) DO UPDATE SET version = version + 1",
+                (name,)
+            )
+
+    def cache_versions(self) -> Dict[str, int]:
+        return {row["name"]: row["version"] for row in self._connect().execute("SELECT name, version FROM cache_versions")}
+
+    def append_event(self, event: Dict[str, Any]):
+        """
+        Relays an execution event published in a worker process, so the API's
+        SSE endpoint (which runs in another process) can tail it with events_after().
+        """
+        self._connect().execute(
+            "INSERT INTO events (execution_id, type, payload, created_at) VALUES (?, ?, ?, ?)",
+            (event["execution_id"], event["type"], json.dumps(event, ensure_ascii=False, default=str), time.time())
+        )
+
+    def events_after(self, execution_id: str, after_id: int = 0) -> List[Dict[str, Any]]:
+        """
+        Relayed events of an execution with a row id above `after_id`; the row id
+        replaces the event's in-process id. Without `after_id`, starts at the latest
+        execution_started, so a resumed run does not replay the previous run's end.
+        """
+        conn = self._connect()
+        if not after_id:
+            row = conn.execute(
+                "SELECT MAX(id) FROM events WHERE execution_id = ? AND type = 'execution_started'", (execution_id,)
+            ).fetchone()
+            after_id = row[0] - 1 if row and row[0] else 0
+        rows = conn.execute(
+            "SELECT id, payload FROM events WHERE execution_id = ? AND id > ? ORDER BY id", (execution_id, after_id)
+        ).fetchall()
+        return [dict(json.loads(row["payload"]), id=row["id"]) for row in rows]
+
+    def prune_events(self, max_age_seconds: float):
+        self._connect().execute("DELETE FROM events WHERE created_at < ?", (time.time() - max_age_seconds,))
+
+    def stats(self) -> Dict[str, int]:
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for row in self._connect().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row["status"]] = row["n"]
+        return counts
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide queue configured from the root config (JOB_QUEUE_PATH etc.)."""
+    global _job_queue
+    if _job_queue is None:
+        import config
+        _job_queue = JobQueue(config.JOB_QUEUE_PATH, lease_seconds=config.JOB_LEASE_SECONDS, max_attempts=config.JOB_MAX_ATTEMPTS)
+    return _job_queue
@@ -0,0 +1,392 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Union
+
+from tinydb import TinyDB
+from tinydb.table import Document
+
+from src.components.metrics import DB_OPERATION_SECONDS
+from src.components.tracing import record_span
+
+# Document fields that get an expression index in every table.
+# Equality queries on these (Query().id == x, ...) are answered by the index
+# instead of scanning and decoding every row.
+INDEXED_FIELDS = ("id", "execution_id", "workflow_id", "start_time")
+
+
+def _field_expr(field: str) -> str:
+    # Must be spelled exactly like the index expression for SQLite to use the index
+    return f"json_extract(data, '$.{field}')"
+
+
+class SQLiteTable:
+    """
+    A table stored as rows of JSON documents in SQLite.
+    Implements the subset of the TinyDB Table API used in this project
+    (insert, search, get, update, upsert, remove, all, ...), so callers keep
+    using tinydb.Query conditions unchanged.
+    """
+
+    def __init__(self, database: "SQLiteDatabase", name: str):
+        self._database = database
+        self.name = name
+        self._sql_name = '"t_' + name.replace('"', '""') + '"'
+
+        with self._database.transaction() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._sql_name} ("
+                " doc_id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " data TEXT NOT NULL)"
+            )
+            for field in INDEXED_FIELDS:
+                index_name = '"idx_' + name.replace('"', '""') + '_' + field + '"'
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {self._sql_name} ({_field_expr(field)})")
+
+    def __repr__(self):
+        return f"<SQLiteTable name='{self.name}', total={len(self)}>"
+
+    # --- Query planning ---
+
+    @staticmethod
+    def _index_term(term) -> Optional[tuple]:
+        """
+        Returns (sql, params) for a TinyDB equality term on an indexed field, else None.
+        """
+        if not isinstance(term, tuple) or len(term) != 3 or term[0] != '==':
+            return None
+        _, path, value = term
+        if len(path) != 1 or path[0] not in INDEXED_FIELDS:
+            return None
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            return None
+        return f"{_field_expr(path[0])} = ?", [value]
+
+    def _index_clause(self, cond) -> Optional[tuple]:
+        """
+        Derives a WHERE clause that narrows the candidate rows for `cond`.
+        The condition itself is always re-checked in Python, so the clause
+        only has to be a superset of the real matches.
+        """
+        term = getattr(cond, '_hash', None)
+        if term is None:
+            return None
+
+        direct = self._index_term(term)
+        if direct:
+            return direct
+
+        op = term[0] if isinstance(term, tuple) and term else None
+        if op == 'and':
+            for sub in term[1]:
+                clause = self._index_term(sub)
+                if clause:
+                    return clause
+        elif op == 'or':
+            clauses = [self._index_term(sub) for sub in term[1]]
+            if clauses and all(clauses):
+                sql = " OR ".join(f"({c[0]})" for c in clauses)
+                return sql, [p for c in clauses for p in c[1]]
+        return None
+
+    def _select(self, cond=None, doc_ids: Optional[Iterable[int]] = None) -> List[Document]:
+        sql = f"SELECT doc_id, data FROM {self._sql_name}"
+        params: List[Any] = []
+
+        if doc_ids is not None:
+            doc_ids = list(doc_ids)
+            if not doc_ids:
+                return []
+            sql += f" WHERE doc_id IN ({','.join('?' * len(doc_ids))})"
+            params.extend(doc_ids)
+        elif cond is not None:
+            clause = self._index_clause(cond)
+            if clause:
+                sql += f" WHERE {clause[0]}"
+                params.extend(clause[1])
+
+        sql += " ORDER BY doc_id"
+        with DB_OPERATION_SECONDS.time(operation="read", table=self.name):
+            with self._database.lock:
+                rows = self._database.connection.execute(sql, params).fetchall()
+
+            docs = [Document(json.loads(data), doc_id) for doc_id, data in rows]
+            if cond is not None:
+                docs = [doc for doc in docs if cond(doc)]
+        return docs
+
+    # --- TinyDB Table API ---
+
+    def insert(self, document: Mapping) -> int:
+        if not isinstance(document, Mapping):
+            raise ValueError('Document is not a Mapping')
+
+        with self._database.transaction(self.name) as conn:
+            if isinstance(document, Document):
+                conn.execute(
+                    f"INSERT INTO {self._sql_name} (doc_id, data) VALUES (?, ?)",
+                    (document.doc_id, json.dumps(dict(document), ensure_ascii=False))
+                )
+                return document.doc_id
+            cursor = conn.execute(
+                f"INSERT INTO {self._sql_name} (data) VALUES (?)",
+                (json.dumps(dict(document), ensure_ascii=False),)
+            )
+            return cursor.lastrowid
+
+    def insert_multiple(self, documents: Iterable[Mapping]) -> List[int]:
+        return [self.insert(document) for document in documents]
+
+    def all(self) -> List[Document]:
+        return self._select()
+
+    def search(self, cond) -> List[Document]:
+        return self._select(cond)
+
+    def get(self, cond=None, doc_id: Optional[int] = None, doc_ids: Optional[List[int]] = None):
+        if doc_id is not None:
+            docs = self._select(doc_ids=[doc_id])
+            return docs[0] if docs else None
+        if doc_ids is not None:
+            return self._select(doc_ids=doc_ids)
+        if cond is not None:
+            docs = self._select(cond)
+            return docs[0] if docs else None
+        raise RuntimeError('You have to pass either cond or doc_id or doc_ids')
+
+    def contains(self, cond=None, doc_id: Optional[int] = None) -> bool:
+        if doc_id is not None:
+            return self.get(doc_id=doc_id) is not None
+        if cond is not None:
+            return self.get(cond) is not None
+        raise RuntimeError('You have to pass either cond or doc_id')
+
+    def count(self, cond) -> int:
+        return len(self.search(cond))
+
+    def update(
+        self,
+        fields: Union[Mapping, Callable[[Dict], None]],
+        cond=None,
+        doc_ids: Optional[Iterable[int]] = None
+    ) -> List[int]:
+        """
+        Updates matching documents row by row; unrelated rows are never touched.
+        """
+        updated = []
+        # Read-modify-write under one lock so concurrent updates of the same row do not interleave
+        with self._database.transaction(self.name) as conn:
+            docs = self._select(cond, doc_ids)
+            for doc in docs:
+                if callable(fields):
+                    fields(doc)
+                else:
+                    doc.update(fields)
+                conn.execute(
+                    f"UPDATE {self._sql_name} SET data = ? WHERE doc_id = ?",
+                    (json.dumps(dict(doc), ensure_ascii=False), doc.doc_id)
+                )
+                updated.append(doc.doc_id)
+        return updated
+
+    def update_multiple(self, updates: Iterable[tuple]) -> List[int]:
+        updated = []
+        for fields, cond in updates:
+            updated.extend(self.update(fields, cond))
+        return updated
+
+    def upsert(self, document: Mapping, cond=None) -> List[int]:
+        if isinstance(document, Document) and cond is None:
+            if self.contains(doc_id=document.doc_id):
+                return self.update(document, doc_ids=[document.doc_id])
+            return [self.insert(document)]
+
+        if cond is None:
+            raise ValueError("If you don't specify a search query, you must specify a doc_id. "
+                             "Hint: use a table.Document object.")
+
+        updated = self.update(document, cond)
+        if updated:
+            return updated
+        return [self.insert(document)]
+
+    def remove(self, cond=None, doc_ids: Optional[Iterable[int]] = None) -> List[int]:
+        if cond is None and doc_ids is None:
+            raise RuntimeError('Use truncate() to remove all documents')
+
+        removed = [doc.doc_id for doc in self._select(cond, doc_ids)]
+        if removed:
+            with self._database.transaction(self.name) as conn:
+                conn.executemany(f"DELETE FROM {self._sql_name} WHERE doc_id = ?", [(i,) for i in removed])
+        return removed
+
+    def truncate(self):
+        with self._database.transaction(self.name) as conn:
+            conn.execute(f"DELETE FROM {self._sql_name}")
+
+    def __len__(self) -> int:
+        with self._database.lock:
+            return self._database.connection.execute(f"SELECT COUNT(*) FROM {self._sql_name}").fetchone()[0]
+
+    def __iter__(self):
+        return iter(self.all())
+
+
+class SQLiteDatabase:
+    """
+    Drop-in replacement for a TinyDB instance backed by a single SQLite file (WAL mode).
+    Each write touches only the affected rows instead of re-serializing the whole database.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        # Other processes (workers, scripts) may hold the write lock briefly
+        self.connection.execute("PRAGMA busy_timeout=5000")
+        self._tables: Dict[str, SQLiteTable] = {}
+
+    def transaction(self, table: Optional[str] = None):
+        """Write transaction; writes to a named table are timed (DB_OPERATION_SECONDS, db.write span)."""
+        return _Transaction(self, table)
+
+    def table(self, name: str) -> SQLiteTable:
+        with self.lock:
+            if name not in self._tables:
+                self._tables[name] = SQLiteTable(self, name)
+            return self._tables[name]
+
+    def tables(self) -> set:
+        """Names of all tables that contain documents (like TinyDB.tables())."""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 't\\_%' ESCAPE '\\'"
+            ).fetchall()
+        return {row[0][2:] for row in rows if len(self.table(row[0][2:]))}
+
+    def drop_table(self, name: str):
+        # Rows are deleted rather than the table dropped, so SQLiteTable objects
+        # held elsewhere (e.g. by WorkflowEngine) stay valid after a reseed.
+        table = self.table(name)
+        with self.transaction() as conn:
+            conn.execute(f"DELETE FROM {table._sql_name}")
+            conn.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table._sql_name.strip('"'),))
+
+    def drop_tables(self):
+        for name in self.tables():
+            self.drop_table(name)
+
+    def close(self):
+        with _open_lock:
+            if _open_databases.get(os.path.abspath(self.path)) is self:
+                del _open_databases[os.path.abspath(self.path)]
+        with self.lock:
+            self.connection.close()
+
+
+class _Transaction:
+    """Holds the database lock and commits (or rolls back) on exit."""
+
+    def __init__(self, database: SQLiteDatabase, table: Optional[str] = None):
+        self.database = database
+        self.table = table
+        self.started = 0.0
+        self.started_ns = 0
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.started = time.perf_counter()
+        self.started_ns = time.time_ns()
+        self.database.lock.acquire()
+        return self.database.connection
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.database.connection.commit()
+            else:
+                self.database.connection.rollback()
+        finally:
+            self.database.lock.release()
+            if self.table is not None:
+                DB_OPERATION_SECONDS.observe(time.perf_counter() - self.started, operation="write", table=self.table)
+                record_span("db.write", self.started_ns, error=str(exc) if exc else None, **{"db.table": self.table})
+
+
+_open_databases: Dict[str, SQLiteDatabase] = {}
+_open_lock = threading.RLock()
+
+
+def sqlite_path_for(json_path: str) -> str:
+    """Maps a TinyDB JSON path (data/db.json) to its SQLite counterpart (data/db.sqlite)."""
+    return os.path.splitext(json_path)[0] + ".sqlite"
+
+
+def migrate_json_to_sqlite(json_path: str, sqlite_path: Optional[str] = None, force: bool = False) -> Dict[str, int]:
+    """
+    Copies every table of a TinyDB JSON file into a SQLite database, keeping doc_ids.
+    Existing SQLite tables are only replaced when `force` is set.
+    Returns the number of migrated documents per table.
+    """
+    sqlite_path = sqlite_path or sqlite_path_for(json_path)
+
+    with open(json_path, 'r', encoding='utf-8') as handle:
+        content = handle.read().strip()
+    data = json.loads(content) if content else {}
+
+    db = SQLiteDatabase(sqlite_path)
+    counts = {}
+    try:
+        for table_name, documents in (data or {}).items():
+            if not isinstance(documents, dict):
+                continue
+            if table_name in db.tables():
+                if not force:
+                    print(f"Skipping table '{table_name}': already present in {sqlite_path}")
+                    continue
+                db.drop_table(table_name)
+
+            table = db.table(table_name)
+            for doc_id, document in documents.items():
+                table.insert(Document(document, int(doc_id)))
+            counts[table_name] = len(documents)
+    finally:
+        db.close()
+
+    return counts
+
+
+def open_database(path: str, backend: Optional[str] = None, **tinydb_kwargs):
+    """
+    Opens the project database with the configured storage backend.
+
+    - "sqlite" (default): SQLiteDatabase next to `path` (db.json -> db.sqlite).
+      On first use the existing JSON file is imported automatically.
+    - "tinydb": the legacy full-file JSON storage, opened with `tinydb_kwargs`.
+    """
+    if backend is None:
+        import config
+        backend = config.STORAGE_BACKEND
+
+    if backend == "tinydb":
+        return TinyDB(path, **tinydb_kwargs)
+    if backend != "sqlite":
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    sqlite_path = path if path.endswith(".sqlite") else sqlite_path_for(path)
+
+    # One shared connection per file and process; callers such as get_db() open the database per request
+    with _open_lock:
+        key = os.path.abspath(sqlite_path)
+        if key not in _open_databases:
+            if not os.path.exists(sqlite_path) and os.path.exists(path) and path != sqlite_path:
+                print(f"Migrating {path} to SQLite storage at {sqlite_path}...")
+                migrate_json_to_sqlite(path, sqlite_path)
+            _open_databases[key] = SQLiteDatabase(sqlite_path)
+        return _open_databases[key]
@@ -0,0 +1,181 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+import config
+from src.components import metrics
+from src.components.tracing import current_span
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider/model whose circuit is open."""
+
+    def __init__(self, provider: str, model: str, retry_after: float):
+        super().__init__(f"Circuit open for {provider}/{model}; retry in {retry_after:.0f}s")
+        self.provider = provider
+        self.model = model
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Health of one (provider, model). Closed: calls pass, and their outcomes fill a
+    window of the last `window` calls; when `error_rate` of at least `min_calls`
+    failed, the circuit opens. Open: calls are rejected for `open_seconds`.
+    Half-open: up to `probes` calls are let through; a failed probe opens the
+    circuit again, `probes` successful ones close it.
+    """
+
+    def __init__(self, provider: str, model: str, window: int = 20, min_calls: int = 5, error_rate: float = 0.5,
+                 open_seconds: float = 30.0, probes: int = 1):
+        self.provider = provider
+        self.model = model
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.open_seconds = open_seconds
+        self.probes = max(1, probes)
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        metrics.LLM_CIRCUIT_STATE.set(0, provider=provider, model=model)
+
+    def _transition(self, state: str, reason: str = ""):
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        if state != CLOSED:
+            self._probes_in_flight = self._probe_successes = 0
+        else:
+            self._outcomes.clear()
+        metrics.LLM_CIRCUIT_STATE.set(_STATE_VALUES[state], provider=self.provider, model=self.model)
+        print(f"[CircuitBreaker] {self.provider}/{self.model} -> {state}{f' ({reason})' if reason else ''}")
+
+    def _refresh(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN, "probing")
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def acquire(self):
+        """Admits one call or raises CircuitOpenError."""
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._probes_in_flight < self.probes - self._probe_successes:
+                self._probes_in_flight += 1
+                return
+            self.rejected += 1
+            retry_after = max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+        metrics.LLM_CIRCUIT_REJECTIONS.inc(provider=self.provider, model=self.model)
+        current_span().add_event("llm.circuit_open", provider=self.provider, model=self.model)
+        raise CircuitOpenError(self.provider, self.model, retry_after)
+
+    def record_success(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._probe_successes += 1
+                if self._probe_successes >= self.probes:
+                    self._transition(CLOSED, "probe succeeded")
+            elif self._state == CLOSED:
+                self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._transition(OPEN, "probe failed")
+            elif self._state == CLOSED:
+                self._outcomes.append(False)
+                failures = self._outcomes.count(False)
+                if len(self._outcomes) >= self.min_calls and failures >= self.error_rate * len(self._outcomes):
+                    self._transition(OPEN, f"{failures}/{len(self._outcomes)} calls failed")
+
+    def release(self):
+        """Ends an admitted call without an outcome (e.g. cancelled after losing a hedged race)."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            return {
+                "state": self._state,
+                "recent_calls": len(self._outcomes),
+                "recent_failures": self._outcomes.count(False),
+                "rejected": self.rejected,
+                "retry_after_seconds": round(max(0.0, self._opened_at + self.open_seconds - time.monotonic()), 1)
+                if self._state == OPEN else 0.0
+            }
+
+
+class CircuitBreakerRegistry:
+    """One breaker per (provider, model), shared by every agent and handler in the process."""
+
+    def __init__(self):
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, model: str) -> CircuitBreaker:
+        with self._lock:
+            if (provider, model) not in self._breakers:
+                self._breakers[(provider, model)] = CircuitBreaker(
+                    provider, model,
+                    window=config.LLM_CIRCUIT_WINDOW,
+                    min_calls=config.LLM_CIRCUIT_MIN_CALLS,
+                    error_rate=config.LLM_CIRCUIT_ERROR_RATE,
+                    open_seconds=config.LLM_CIRCUIT_OPEN_SECONDS,
+                    probes=config.LLM_CIRCUIT_HALF_OPEN_PROBES
+                )
+            return self._breakers[(provider, model)]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {f"{b.provider}/{b.model}": b.snapshot() for b in breakers}
+
+    def clear(self):
+        with self._lock:
+            self._breakers.clear()
+
+
+_registry = CircuitBreakerRegistry()
+
+
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    return _registry
+
+
+@contextmanager
+def circuit_guard(provider: str, model: str) -> Iterator[None]:
+    """
+    Wraps one provider call: rejects it while the circuit is open and records
+    its outcome. Works around sync and async calls alike.
+    """
+    if not config.LLM_CIRCUIT_BREAKER_ENABLED:
+        yield
+        return
+    breaker = _registry.get(provider, model)
+    breaker.acquire()
+    try:
+        yield
+    except Exception:
+        breaker.record_failure()
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    breaker.record_success()
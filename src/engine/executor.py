@@ -1,4 +1,6 @@
-from typing import Any
+import json
+import asyncio
+from typing import Any, Optional
 from src.database.client import DatabaseClient
 from src.models.schema_registry import SchemaRegistry
 from src.components.hook_registry import HookRegistry
@@ -7,13 +9,17 @@ from src.engine.llm_handler import LLMHandler
 from tinydb import Query
 
 class Executor:
+    MAX_RETRIES = 5
+
     def __init__(self):
         self.db_client = DatabaseClient()
         self.llm_handler = LLMHandler()
 
-    def execute_step(self, step_id: str, context: dict[str, Any], model_override: str = None) -> dict[str, Any]:
-        print(f"[EXECUTOR] Executing Step: {step_id}")
-        
+    def _prepare_step(self, step_id: str, context: dict[str, Any]) -> tuple[dict, dict, dict[str, Any], list[dict[str, str]]]:
+        """
+        Loads the step, validates the input, runs pre-hooks and builds the initial prompts.
+        Returns (step, execution_config, current_data, prompts).
+        """
         # 1. Load Step Definition
         steps_table = self.db_client.get_table('steps')
         step = steps_table.get(Query().id == step_id)
@@ -48,11 +54,6 @@ class Executor:
             if hook_result:
                 current_data.update(hook_result)
 
-        # 4. LLM Execution & 6. Output Validation (Retry Loop)
-        max_retries = 5
-        attempt = 0
-        last_error = None
-        
         # Prepare initial prompts
         current_prompts = []
         for prompt_id in config.get('llm_prompts', []):
@@ -63,7 +64,6 @@ class Executor:
             else:
                 print(f"[EXECUTOR] Warning: Prompt {prompt_id} not found.")
 
-        import json
         data_context = f"\n\nCONTEXT DATA:\n{json.dumps(current_data, indent=2, default=str)}"
         current_prompts.append({"content": data_context})
 
@@ -78,14 +78,61 @@ class Executor:
             except Exception as e:
                 print(f"[EXECUTOR] Warning: Failed to inject schema for {output_schema_name}: {e}")
 
-        while attempt < max_retries:
-            attempt += 1
-            print(f"[EXECUTOR] Attempt {attempt}/{max_retries} for Step {step_id}")
+        return step, config, current_data, current_prompts
+
+    def _process_output(self, step: dict, config: dict, current_data: dict[str, Any]) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+        """
+        Parses the LLM output, runs post-hooks and validates the result.
+        Returns (output, None) on success or (None, error) when the attempt should be retried.
+        """
+        # 5. Automatic JSON Parsing (Run BEFORE hooks so they have access to data)
+        output_schema_name = step.get('output_schema')
+        if output_schema_name and 'llm_output' in current_data and isinstance(current_data['llm_output'], str):
+             try:
+                 from src.components.hooks.parsing import _clean_and_parse_json
+                 parsed_llm = _clean_and_parse_json(current_data['llm_output'])
+                 if isinstance(parsed_llm, dict):
+                     current_data.update(parsed_llm)
+                     print(f"[EXECUTOR] Auto-parsed LLM output for {output_schema_name}")
+             except Exception as e:
+                 print(f"[EXECUTOR] Auto-parsing failed: {e}")
+
+        # 6. Post-Hooks (Run on every attempt to ensure fresh parsing)
+        for hook_name in config.get('post_hooks', []):
+            hook_func = HookRegistry.get_hook(hook_name)
+            hook_result = hook_func(current_data)
+            if hook_result:
+                current_data.update(hook_result)
+
+        # 7. Output Validation
+        if output_schema_name:
+            OutputModel = SchemaRegistry.get_schema(output_schema_name)
+            try:
+                validated_output = OutputModel(**current_data)
+                print(f"[EXECUTOR] Output Validated: {output_schema_name}")
+                return validated_output.dict(), None
+            except Exception as e:
+                print(f"[EXECUTOR] Validation Failed: {e}")
+                return None, str(e)
+        return current_data, None
+
+    @staticmethod
+    def _add_feedback(current_prompts: list[dict[str, str]], last_error: str):
+        # Add error feedback to prompts
+        feedback = f"\n\nSYSTEM: Your previous response failed validation. Error: {last_error}. Please correct your JSON output to match the schema exactly."
+        current_prompts.append({"content": feedback})
+
+    def execute_step(self, step_id: str, context: dict[str, Any], model_override: str = None) -> dict[str, Any]:
+        print(f"[EXECUTOR] Executing Step: {step_id}")
+        step, config, current_data, current_prompts = self._prepare_step(step_id, context)
+
+        # 4. LLM Execution & 6. Output Validation (Retry Loop)
+        last_error = None
+        for attempt in range(1, self.MAX_RETRIES + 1):
+            print(f"[EXECUTOR] Attempt {attempt}/{self.MAX_RETRIES} for Step {step_id}")
             
             if attempt > 1 and last_error:
-                # Add error feedback to prompts
-                feedback = f"\n\nSYSTEM: Your previous response failed validation. Error: {last_error}. Please correct your JSON output to match the schema exactly."
-                current_prompts.append({"content": feedback})
+                self._add_feedback(current_prompts, last_error)
 
             if current_prompts:
                 try:
@@ -97,42 +144,41 @@ class Executor:
                     last_error = f"LLM Call Failed: {e}"
                     continue # Retry loop
 
-            # 5. Automatic JSON Parsing (Run BEFORE hooks so they have access to data)
-            output_schema_name = step.get('output_schema')
-            if output_schema_name and 'llm_output' in current_data and isinstance(current_data['llm_output'], str):
-                 try:
-                     from src.components.hooks.parsing import _clean_and_parse_json
-                     parsed_llm = _clean_and_parse_json(current_data['llm_output'])
-                     if isinstance(parsed_llm, dict):
-                         current_data.update(parsed_llm)
-                         print(f"[EXECUTOR] Auto-parsed LLM output for {output_schema_name}")
-                 except Exception as e:
-                     print(f"[EXECUTOR] Auto-parsing failed: {e}")
-
-            # 6. Post-Hooks (Run on every attempt to ensure fresh parsing)
-            for hook_name in config.get('post_hooks', []):
-                hook_func = HookRegistry.get_hook(hook_name)
-                hook_result = hook_func(current_data)
-                if hook_result:
-                    current_data.update(hook_result)
-
-            # 7. Output Validation
-            # output_schema_name already retrieved above
-
-            if output_schema_name:
-                OutputModel = SchemaRegistry.get_schema(output_schema_name)
-                try:
-                    validated_output = OutputModel(**current_data)
-                    print(f"[EXECUTOR] Output Validated: {output_schema_name}")
-                    return validated_output.dict()
-                except Exception as e:
-                    print(f"[EXECUTOR] Validation Failed (Attempt {attempt}): {e}")
-                    last_error = str(e)
-                    # Loop continues to retry
-            else:
-                return current_data
+            output, last_error = self._process_output(step, config, current_data)
+            if output is not None:
+                return output
         
         # If loop finishes without success
-        raise Exception(f"Step {step_id} failed after {max_retries} attempts. Last error: {last_error}")
-        
-        return current_data
+        raise Exception(f"Step {step_id} failed after {self.MAX_RETRIES} attempts. Last error: {last_error}")
+
+    async def execute_step_async(self, step_id: str, context: dict[str, Any], model_override: str = None) -> dict[str, Any]:
+        """
+        Same as execute_step, but awaits the LLM natively and runs the blocking
+        DB/hook/validation work in a worker thread, so the event loop stays free
+        while a step is in flight.
+        """
+        print(f"[EXECUTOR] Executing Step (async): {step_id}")
+        step, config, current_data, current_prompts = await asyncio.to_thread(self._prepare_step, step_id, context)
+
+        last_error = None
+        for attempt in range(1, self.MAX_RETRIES + 1):
+            print(f"[EXECUTOR] Attempt {attempt}/{self.MAX_RETRIES} for Step {step_id}")
+
+            if attempt > 1 and last_error:
+                self._add_feedback(current_prompts, last_error)
+
+            if current_prompts:
+                try:
+                    llm_response = await self.llm_handler.call_llm_async(current_prompts, model=model_override or "gemini-1.5-flash")
+                    print(f"[DEBUG] Raw LLM Output: {llm_response[:1000]}...") # Print first 1000 chars
+                    current_data['llm_output'] = llm_response
+                except Exception as e:
+                    print(f"[EXECUTOR] LLM Call Failed (Attempt {attempt}): {e}")
+                    last_error = f"LLM Call Failed: {e}"
+                    continue # Retry loop
+
+            output, last_error = await asyncio.to_thread(self._process_output, step, config, current_data)
+            if output is not None:
+                return output
+
+        raise Exception(f"Step {step_id} failed after {self.MAX_RETRIES} attempts. Last error: {last_error}")
@@ -1,8 +1,12 @@
 import os
+import time
 from typing import Any
 import google.generativeai as genai
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import config
+from src.engine.usage import record_llm_call, gemini_token_counts, openai_token_counts
+from src.engine.model_routing import ModelRoute, current_route
+from src.engine.circuit_breaker import CircuitOpenError, circuit_guard
 
 class LLMHandler:
     def __init__(self):
@@ -15,8 +19,10 @@ class LLMHandler:
         # Initialize OpenAI
         if config.OPENAI_API_KEY:
             self.openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
+            self.async_openai_client = AsyncOpenAI(api_key=config.OPENAI_API_KEY)
         else:
             self.openai_client = None
+            self.async_openai_client = None
             print("[LLMHandler] Warning: OPENAI_API_KEY not found.")
 
     def _get_fallback_models(self, model_name: str) -> list[str]:
@@ -49,10 +55,8 @@ class LLMHandler:
         last_error = None
 
         for current_model in models_to_try:
-            print(f"[LLM] Calling {current_model}...")
-            print(f"--- [LLM CALL START] Model: {current_model} ---")
-            print(f"{full_prompt}")
-            print(f"--- [LLM CALL END] ---")
+            self._log_call(current_model, full_prompt)
+            started = time.perf_counter()
             try:
                 if "gemini" in current_model:
                     return self._call_gemini(full_prompt, current_model)
@@ -62,54 +66,163 @@ class LLMHandler:
                     return f"[Mock Response] Unknown model: {current_model}"
             except Exception as e:
                 last_error = e
-                print(f"[LLM] Error calling {current_model}: {e}")
-                
-                # Check for Rate Limit (429) or Quota Exceeded
-                is_rate_limit = "429" in str(e) or "Quota exceeded" in str(e) or "429" in str(e)
-                
-                if is_rate_limit:
-                    print(f"[LLM] Rate limit hit for {current_model}. Switching to fallback...")
-                else:
-                    print(f"[LLM] Error is not strictly rate limit, but trying fallback anyway...")
-                
+                self._log_failure(current_model, e, time.perf_counter() - started)
                 continue
 
+        self._raise_all_failed(last_error)
+
+    async def call_llm_async(self, prompts: list[dict[str, str]], model: str = "gemini-1.5-flash") -> str:
+        """
+        Async variant of call_llm: awaits the providers' native async clients instead
+        of blocking the event loop. The step's route (src/engine/model_routing.py)
+        supplies the workflow's fallback chain; a model that is slower than its
+        latency budget is hedged with the next one instead of waited out. Without
+        a configured chain, the built-in fallbacks are used on errors only.
+        """
+        full_prompt = "\n\n".join([p['content'] for p in prompts])
+
+        route = current_route() or ModelRoute(None, model)
+        if route.fallbacks:
+            route = route.with_models(model, route.fallbacks)
+        else:
+            # Built-in chain: only tried after a failure, never hedged (a second paid request)
+            route = ModelRoute(route.step_id, model, self._get_fallback_models(model), latency_budget=0)
+
+        async def request(current_model: str) -> str:
+            self._log_call(current_model, full_prompt)
+            started = time.perf_counter()
+            try:
+                return await self._call_model_async(full_prompt, current_model)
+            except Exception as e:
+                self._log_failure(current_model, e, time.perf_counter() - started)
+                raise
+
+        try:
+            return await route.call(request)
+        except Exception as e:
+            self._raise_all_failed(e)
+
+    async def _call_model_async(self, prompt: str, model_name: str) -> str:
+        if "gemini" in model_name:
+            return await self._call_gemini_async(prompt, model_name)
+        elif "gpt" in model_name:
+            return await self._call_openai_async(prompt, model_name)
+        return f"[Mock Response] Unknown model: {model_name}"
+
+    def _log_call(self, model_name: str, prompt: str):
+        print(f"[LLM] Calling {model_name}...")
+        print(f"--- [LLM CALL START] Model: {model_name} ---")
+        print(f"{prompt}")
+        print(f"--- [LLM CALL END] ---")
+
+    def _log_failure(self, model_name: str, error: Exception, latency: float = 0.0):
+        if isinstance(error, CircuitOpenError):
+            # Short-circuited: no request was sent, so there is no call to record
+            print(f"[LLM] Skipping {model_name}: {error}. Switching to fallback...")
+            return
+        print(f"[LLM] Error calling {model_name}: {error}")
+        record_llm_call(model_name, latency_seconds=latency, error=str(error))
+        
+        # Check for Rate Limit (429) or Quota Exceeded
+        is_rate_limit = "429" in str(error) or "Quota exceeded" in str(error)
+        
+        if is_rate_limit:
+            print(f"[LLM] Rate limit hit for {model_name}. Switching to fallback...")
+        else:
+            print(f"[LLM] Error is not strictly rate limit, but trying fallback anyway...")
+
+    def _raise_all_failed(self, last_error: Exception):
         # If all models fail
         error_msg = f"[LLM] All models failed. Last error: {last_error}"
         print(error_msg)
-        with open("llm_errors.txt", "a") as f:
-            f.write(f"{error_msg}\n")
+        # Calls rejected by an open circuit were already logged when it opened
+        if not isinstance(last_error, CircuitOpenError):
+            with open("llm_errors.txt", "a") as f:
+                f.write(f"{error_msg}\n")
         raise last_error or Exception("All models failed")
 
+    def _gemini_request(self, model_name: str):
+        model = genai.GenerativeModel(model_name)
+        # Use JSON mode for robustness
+        generation_config = genai.types.GenerationConfig(
+            response_mime_type="application/json",
+            max_output_tokens=65536
+        )
+        return model, generation_config
+
+    def _gemini_text(self, model_name: str, response: Any, started: float) -> str:
+        text = response.text
+        record_llm_call(model_name, *gemini_token_counts(response), latency_seconds=time.perf_counter() - started)
+        return text
+
+    def _openai_text(self, model_name: str, response: Any, started: float) -> str:
+        record_llm_call(model_name, *openai_token_counts(response), latency_seconds=time.perf_counter() - started)
+        return response.choices[0].message.content
+
+    def _log_gemini_error(self, model_name: str, prompt: str, error: Exception):
+        error_msg = f"[LLM] Error calling {model_name}: {error}"
+        print(error_msg)
+        with open("llm_errors.txt", "a") as f:
+            f.write(f"{error_msg}\nPrompt: {prompt[:100]}...\n\n")
+
     def _call_gemini(self, prompt: str, model_name: str) -> str:
         if not config.GOOGLE_API_KEY:
             return "[Error] GOOGLE_API_KEY missing."
         
         try:
-            model = genai.GenerativeModel(model_name)
-            # Use JSON mode for robustness
-            generation_config = genai.types.GenerationConfig(
-                response_mime_type="application/json",
-                max_output_tokens=65536
-            )
-            response = model.generate_content(prompt, generation_config=generation_config)
-            return response.text
+            model, generation_config = self._gemini_request(model_name)
+            started = time.perf_counter()
+            with circuit_guard("gemini", model_name):
+                response = model.generate_content(prompt, generation_config=generation_config)
+            return self._gemini_text(model_name, response, started)
+        except CircuitOpenError:
+            raise
         except Exception as e:
-            error_msg = f"[LLM] Error calling {model_name}: {e}"
-            print(error_msg)
-            with open("llm_errors.txt", "a") as f:
-                f.write(f"{error_msg}\nPrompt: {prompt[:100]}...\n\n")
+            self._log_gemini_error(model_name, prompt, e)
+            raise e
+
+    async def _call_gemini_async(self, prompt: str, model_name: str) -> str:
+        if not config.GOOGLE_API_KEY:
+            return "[Error] GOOGLE_API_KEY missing."
+
+        try:
+            model, generation_config = self._gemini_request(model_name)
+            started = time.perf_counter()
+            with circuit_guard("gemini", model_name):
+                response = await model.generate_content_async(prompt, generation_config=generation_config)
+            return self._gemini_text(model_name, response, started)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            self._log_gemini_error(model_name, prompt, e)
             raise e
 
     def _call_openai(self, prompt: str, model_name: str) -> str:
         if not self.openai_client:
             return "[Error] OPENAI_API_KEY missing."
 
-        response = self.openai_client.chat.completions.create(
-            model=model_name,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        return response.choices[0].message.content
+        started = time.perf_counter()
+        with circuit_guard("openai", model_name):
+            response = self.openai_client.chat.completions.create(
+                model=model_name,
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant."},
+                    {"role": "user", "content": prompt}
+                ]
+            )
+        return self._openai_text(model_name, response, started)
+
+    async def _call_openai_async(self, prompt: str, model_name: str) -> str:
+        if not self.async_openai_client:
+            return "[Error] OPENAI_API_KEY missing."
+
+        started = time.perf_counter()
+        with circuit_guard("openai", model_name):
+            response = await self.async_openai_client.chat.completions.create(
+                model=model_name,
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant."},
+                    {"role": "user", "content": prompt}
+                ]
+            )
+        return self._openai_text(model_name, response, started)
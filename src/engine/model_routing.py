@@ -0,0 +1,201 @@
+import time
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+import config
+from src.components import metrics
+from src.components.tracing import current_span
+from src.engine.circuit_breaker import CircuitOpenError
+
+
+class LatencyTracker:
+    """
+    Latencies of recent successful LLM calls per (step, model), used to
+    derive hedge delays. Steps have very different prompt and output sizes,
+    so each step keeps its own window.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[Tuple[Optional[str], str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, step_id: Optional[str], model: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault((step_id, model), deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, step_id: Optional[str], model: str, fraction: float) -> Optional[float]:
+        """Nearest-rank percentile, or None before LLM_HEDGE_MIN_SAMPLES calls were observed."""
+        with self._lock:
+            samples = sorted(self._samples.get((step_id, model), ()))
+        if not samples or len(samples) < config.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, max(0, int(fraction * len(samples) + 0.5) - 1))]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                f"{step_id or '*'}:{model}": {"samples": len(samples), "max_seconds": max(samples)}
+                for (step_id, model), samples in self._samples.items()
+            }
+
+
+_tracker = LatencyTracker()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    return _tracker
+
+
+class ModelRoute:
+    """
+    Models to use for one step: the primary model, then its fallback chain.
+    `latency_budget` (seconds) fixes the hedge delay; otherwise it is the
+    `percentile` of the step's recent latencies on the model being waited for.
+    """
+
+    def __init__(self, step_id: Optional[str], primary: Optional[str], fallbacks: Optional[List[str]] = None,
+                 latency_budget: Optional[float] = None, percentile: Optional[float] = None):
+        self.step_id = step_id
+        self.primary = primary
+        self.fallbacks = list(fallbacks or [])
+        self.latency_budget = latency_budget
+        self.percentile = percentile if percentile is not None else config.LLM_HEDGE_PERCENTILE
+
+    @property
+    def models(self) -> List[str]:
+        return [self.primary] + self.fallbacks
+
+    def with_models(self, primary: str, fallbacks: List[str]) -> "ModelRoute":
+        return ModelRoute(self.step_id, primary, fallbacks, self.latency_budget, self.percentile)
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """Seconds to wait for `model` before hedging to the next one (None = never)."""
+        if self.latency_budget is not None:
+            return self.latency_budget if self.latency_budget > 0 else None
+        observed = get_latency_tracker().percentile(self.step_id, model, self.percentile)
+        if observed is not None:
+            return observed
+        return config.LLM_HEDGE_DEFAULT_BUDGET or None
+
+    async def _timed(self, request: Callable[[str], Awaitable[Any]], model: str) -> Any:
+        started = time.perf_counter()
+        result = await request(model)
+        get_latency_tracker().observe(self.step_id, model, time.perf_counter() - started)
+        return result
+
+    async def call(self, request: Callable[[str], Awaitable[Any]]) -> Any:
+        """
+        Awaits request(model) for the primary model. If it has not answered within
+        its hedge delay, the next model in the chain is called as well and the first
+        answer wins; the slower call is cancelled. A failed call moves on to the next
+        model right away. Raises the last error when every model failed.
+        """
+        remaining = self.models
+        in_flight: Dict["asyncio.Task", Tuple[str, float]] = {}
+        last_error: Optional[BaseException] = None
+
+        def start(reason: Optional[str] = None):
+            model = remaining.pop(0)
+            if reason:
+                metrics.LLM_FALLBACKS.inc(model=model, reason=reason)
+                current_span().add_event("llm.fallback", model=model, reason=reason)
+                print(f"[ModelRouting] Step {self.step_id}: sending to fallback {model} ({reason})")
+            in_flight[asyncio.ensure_future(self._timed(request, model))] = (model, time.monotonic())
+
+        start()
+        try:
+            while in_flight:
+                timeout = None
+                if remaining:
+                    # The next hedge is due when the most recently started call exceeds its delay
+                    model, started = list(in_flight.values())[-1]
+                    delay = self.hedge_delay(model)
+                    if delay is not None:
+                        timeout = max(0.0, started + delay - time.monotonic())
+
+                done, _ = await asyncio.wait(list(in_flight), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    start("latency")
+                    continue
+                for task in done:
+                    in_flight.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                if remaining:
+                    start("circuit_open" if isinstance(last_error, CircuitOpenError) else "error")
+            raise last_error
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+def _for_step(mapping: Optional[Dict[str, Any]], step_id: str) -> Any:
+    mapping = mapping or {}
+    return mapping.get(step_id, mapping.get("*"))
+
+
+class RoutingPolicy:
+    """
+    Model routing of one workflow, read from the workflow record:
+        default_model_mapping: {step_id: model}
+        fallback_models: {step_id | "*": [model, ...]}
+        latency_budgets: {step_id | "*": seconds}   (0 = no hedging, fall back on errors only)
+        hedge_percentile: fraction, e.g. 0.9 (default config.LLM_HEDGE_PERCENTILE)
+    """
+
+    def __init__(self, workflow: Optional[Dict[str, Any]] = None):
+        workflow = workflow or {}
+        self.model_mapping = workflow.get("default_model_mapping") or {}
+        self.fallback_models = workflow.get("fallback_models") or {}
+        self.latency_budgets = workflow.get("latency_budgets") or {}
+        self.hedge_percentile = workflow.get("hedge_percentile")
+
+    def route(self, step_id: str, default_model: Optional[str]) -> ModelRoute:
+        """Route of one step; primary is None if neither the mapping nor the caller names a model."""
+        primary = self.model_mapping.get(step_id) or default_model
+        budget = _for_step(self.latency_budgets, step_id)
+        return ModelRoute(
+            step_id, primary,
+            fallbacks=_for_step(self.fallback_models, step_id),
+            latency_budget=float(budget) if budget is not None else None,
+            percentile=self.hedge_percentile
+        )
+
+
+# Routing of the running workflow and step. Context variables are copied into
+# asyncio tasks, so concurrent steps each see their own route.
+_current_policy: contextvars.ContextVar[Optional[RoutingPolicy]] = contextvars.ContextVar("model_routing_policy", default=None)
+_current_route: contextvars.ContextVar[Optional[ModelRoute]] = contextvars.ContextVar("model_route", default=None)
+
+
+@contextmanager
+def routing_policy(policy: RoutingPolicy) -> Iterator[RoutingPolicy]:
+    token = _current_policy.set(policy)
+    try:
+        yield policy
+    finally:
+        _current_policy.reset(token)
+
+
+def current_policy() -> RoutingPolicy:
+    return _current_policy.get() or RoutingPolicy()
+
+
+@contextmanager
+def use_route(route: Optional[ModelRoute]) -> Iterator[Optional[ModelRoute]]:
+    token = _current_route.set(route)
+    try:
+        yield route
+    finally:
+        _current_route.reset(token)
+
+
+def current_route() -> Optional[ModelRoute]:
+    return _current_route.get()
@@ -1,32 +1,85 @@
+import asyncio
 from typing import Dict, Any
 from src.database.client import DatabaseClient
 from src.engine.executor import Executor
+from src.engine.usage import collect_usage, rollup_steps
+from src.engine.model_routing import RoutingPolicy, use_route
 from tinydb import Query
 
 class Orchestrator:
     def __init__(self):
         self.db_client = DatabaseClient()
         self.executor = Executor()
+        # LLM usage of the last run, per step (see src/engine/usage.py)
+        self.step_usage: Dict[str, Dict[str, Any]] = {}
 
-    def run_workflow(self, workflow_id: str, initial_inputs: Dict[str, Any]) -> Dict[str, Any]:
-        print(f"[ORCHESTRATOR] Starting Workflow: {workflow_id}")
-        
+    def _load_workflow(self, workflow_id: str) -> Dict[str, Any]:
         workflows_table = self.db_client.get_table('workflows')
         workflow = workflows_table.get(Query().id == workflow_id)
         if not workflow:
             raise ValueError(f"Workflow {workflow_id} not found.")
+        return workflow
+
+    def _record_step_usage(self, step_id: str, collector):
+        self.step_usage[step_id] = dict(
+            collector.summary(), step_id=step_id, duration_seconds=round(collector.elapsed(), 4), call_log=collector.calls
+        )
+
+    @property
+    def usage(self) -> Dict[str, Any]:
+        """Token, latency and cost rollup of the last run (per step and total)."""
+        return rollup_steps(self.step_usage)
+
+    def run_workflow(self, workflow_id: str, initial_inputs: Dict[str, Any]) -> Dict[str, Any]:
+        print(f"[ORCHESTRATOR] Starting Workflow: {workflow_id}")
+        
+        workflow = self._load_workflow(workflow_id)
 
         context = initial_inputs.copy()
+        self.step_usage = {}
         
         for step_id in workflow['sequence']:
             print(f"[ORCHESTRATOR] Step: {step_id}")
             # Determine model override if any
             model_override = workflow.get('default_model_mapping', {}).get(step_id)
             
-            step_output = self.executor.execute_step(step_id, context, model_override)
+            with collect_usage() as collector:
+                try:
+                    step_output = self.executor.execute_step(step_id, context, model_override)
+                finally:
+                    self._record_step_usage(step_id, collector)
             
             # Update context
             context.update(step_output)
 
         print("[ORCHESTRATOR] Workflow Completed.")
         return context
+
+    async def run_workflow_async(self, workflow_id: str, initial_inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async variant of run_workflow for use inside the API's event loop.
+        Steps run via Executor.execute_step_async, so other requests are served meanwhile.
+        """
+        print(f"[ORCHESTRATOR] Starting Workflow (async): {workflow_id}")
+
+        workflow = await asyncio.to_thread(self._load_workflow, workflow_id)
+
+        context = initial_inputs.copy()
+        self.step_usage = {}
+        # Fallback chains and latency budgets of the workflow (hedged in LLMHandler.call_llm_async)
+        policy = RoutingPolicy(workflow)
+
+        for step_id in workflow['sequence']:
+            print(f"[ORCHESTRATOR] Step: {step_id}")
+            model_override = workflow.get('default_model_mapping', {}).get(step_id)
+
+            with collect_usage() as collector, use_route(policy.route(step_id, model_override)):
+                try:
+                    step_output = await self.executor.execute_step_async(step_id, context, model_override)
+                finally:
+                    self._record_step_usage(step_id, collector)
+
+            context.update(step_output)
+
+        print("[ORCHESTRATOR] Workflow Completed.")
+        return context
@@ -0,0 +1,272 @@
+import time
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import config
+from src.components import metrics
+
+# Collector for the step currently running in this context. Context variables are
+# copied into asyncio tasks and asyncio.to_thread calls, so concurrent steps each
+# see their own collector.
+_current_collector: contextvars.ContextVar[Optional["UsageCollector"]] = contextvars.ContextVar(
+    "llm_usage_collector", default=None
+)
+
+
+class UsageCollector:
+    """
+    Records every LLM call (including failed attempts and cache hits) made
+    while it is active. See collect_usage().
+    """
+
+    def __init__(self):
+        self.calls: List[Dict[str, Any]] = []
+        self.started = time.perf_counter()
+
+    def add(self, call: Dict[str, Any]):
+        # Calls within one step are sequential: consecutive failures on the
+        # same model before this call are the retries that led up to it
+        attempt = 1
+        for previous in reversed(self.calls):
+            if previous["model"] != call["model"] or not previous["error"]:
+                break
+            attempt += 1
+        call["attempt"] = attempt
+        self.calls.append(call)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> Dict[str, Any]:
+        return summarize_calls(self.calls)
+
+
+@contextmanager
+def collect_usage() -> Iterator[UsageCollector]:
+    """
+    Context manager that collects the usage of all LLM calls made inside it.
+    """
+    collector = UsageCollector()
+    token = _current_collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _current_collector.reset(token)
+
+
+def _price_for(model: str) -> Optional[Tuple[float, ...]]:
+    # Longest matching prefix, so "gemini-2.5-flash-lite" is not priced as "gemini-2.5-flash"
+    best = None
+    for prefix in config.LLM_PRICING:
+        if model.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return tuple(config.LLM_PRICING[best]) if best else None
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_prompt_tokens: int = 0) -> float:
+    """
+    Cost in USD from config.LLM_PRICING (USD per million input/output tokens,
+    optionally cached input tokens). cached_prompt_tokens is the part of
+    prompt_tokens served from a provider context cache. Unknown models cost 0.
+    """
+    price = _price_for(model or "")
+    if not price:
+        return 0.0
+    cached_prompt_tokens = min(cached_prompt_tokens, prompt_tokens)
+    cached_price = price[2] if len(price) > 2 else price[0]
+    return ((prompt_tokens - cached_prompt_tokens) * price[0] + cached_prompt_tokens * cached_price
+            + completion_tokens * price[1]) / 1_000_000
+
+
+def _observe_call(model: str, prompt_tokens: int, completion_tokens: int, cached_prompt_tokens: int,
+                  latency_seconds: float, cost: float, cached: bool, error: Optional[str]):
+    status = "error" if error else "cached" if cached else "ok"
+    metrics.LLM_CALL_SECONDS.observe(latency_seconds, model=model, status=status)
+    if prompt_tokens:
+        metrics.LLM_TOKENS.inc(prompt_tokens, model=model, kind="prompt")
+    if completion_tokens:
+        metrics.LLM_TOKENS.inc(completion_tokens, model=model, kind="completion")
+    if cached_prompt_tokens:
+        metrics.LLM_TOKENS.inc(cached_prompt_tokens, model=model, kind="cached_prompt")
+    if cost:
+        metrics.LLM_COST.inc(cost, model=model)
+
+
+def record_llm_call(
+    model: str,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    latency_seconds: float = 0.0,
+    cached: bool = False,
+    error: Optional[str] = None,
+    cached_prompt_tokens: int = 0
+) -> Optional[Dict[str, Any]]:
+    """
+    Adds one provider call to the process metrics and to the active collector
+    (the collector part is a no-op outside collect_usage).
+    Cache hits are recorded with zero tokens: they cost nothing.
+    cached_prompt_tokens are the prompt tokens the provider served from a
+    context cache (included in prompt_tokens, priced at the cached rate).
+    """
+    model = model or "unknown"
+    prompt_tokens, completion_tokens = int(prompt_tokens or 0), int(completion_tokens or 0)
+    cached_prompt_tokens = int(cached_prompt_tokens or 0)
+    cost = estimate_cost(model, prompt_tokens, completion_tokens, cached_prompt_tokens)
+    _observe_call(model, prompt_tokens, completion_tokens, cached_prompt_tokens, latency_seconds, cost, cached, error)
+
+    collector = _current_collector.get()
+    if collector is None:
+        return None
+    call = {
+        "model": model,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cached_prompt_tokens": cached_prompt_tokens,
+        "latency_seconds": round(latency_seconds, 4),
+        "cost_usd": cost,
+        "cached": cached,
+        "error": error
+    }
+    collector.add(call)
+    return call
+
+
+def mark_last_call_failed(error: str):
+    """
+    Flags the last recorded call as failed when its response turned out to be
+    unusable (empty, refused, invalid JSON), so the next attempt counts as a retry.
+    """
+    collector = _current_collector.get()
+    if collector is not None and collector.calls and not collector.calls[-1]["error"]:
+        collector.calls[-1]["error"] = error
+
+
+def gemini_token_counts(response: Any) -> Tuple[int, int]:
+    """(prompt, completion) token counts from a Gemini response's usage_metadata."""
+    metadata = getattr(response, "usage_metadata", None)
+    if metadata is None:
+        return 0, 0
+    return getattr(metadata, "prompt_token_count", 0) or 0, getattr(metadata, "candidates_token_count", 0) or 0
+
+
+def openai_token_counts(response: Any) -> Tuple[int, int]:
+    """(prompt, completion) token counts from an OpenAI completion's usage."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0
+    return getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0
+
+
+def gemini_cached_tokens(response: Any) -> int:
+    """Prompt tokens a Gemini response read from cached content."""
+    metadata = getattr(response, "usage_metadata", None)
+    return getattr(metadata, "cached_content_token_count", 0) or 0
+
+
+def openai_cached_tokens(response: Any) -> int:
+    """Prompt tokens an OpenAI completion read from the prompt cache."""
+    details = getattr(getattr(response, "usage", None), "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", 0) or 0
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {
+        "calls": 0, "failed_calls": 0, "retries": 0, "cached_calls": 0,
+        "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cached_prompt_tokens": 0,
+        "cost_usd": 0.0, "llm_seconds": 0.0
+    }
+
+
+def _add_totals(totals: Dict[str, Any], other: Dict[str, Any]):
+    for key in ("calls", "failed_calls", "retries", "cached_calls",
+                "prompt_tokens", "completion_tokens", "total_tokens", "cached_prompt_tokens", "cost_usd", "llm_seconds"):
+        totals[key] += other.get(key, 0)
+
+
+def summarize_calls(calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Totals over a list of recorded calls, overall and per model.
+    `retries` counts calls made after a failed attempt on the same model.
+    """
+    totals = _empty_totals()
+    models: Dict[str, Dict[str, Any]] = {}
+    for call in calls:
+        entry = {
+            "calls": 1,
+            "failed_calls": 1 if call.get("error") else 0,
+            "retries": 1 if call.get("attempt", 1) > 1 else 0,
+            "cached_calls": 1 if call.get("cached") else 0,
+            "prompt_tokens": call.get("prompt_tokens", 0),
+            "completion_tokens": call.get("completion_tokens", 0),
+            "total_tokens": call.get("prompt_tokens", 0) + call.get("completion_tokens", 0),
+            "cached_prompt_tokens": call.get("cached_prompt_tokens", 0),
+            "cost_usd": call.get("cost_usd", 0.0),
+            "llm_seconds": call.get("latency_seconds", 0.0)
+        }
+        _add_totals(totals, entry)
+        _add_totals(models.setdefault(call.get("model", "unknown"), _empty_totals()), entry)
+    totals["models"] = models
+    return totals
+
+
+def rollup_steps(steps: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Execution-level usage from per-step usage ({step_id: step usage}): step
+    summaries (without the call log), totals, each step's share of LLM
+    time and cost, and the steps that dominate latency and spend.
+    """
+    totals = _empty_totals()
+    models: Dict[str, Dict[str, Any]] = {}
+    duration = 0.0
+    for step in steps.values():
+        _add_totals(totals, step)
+        duration += step.get("duration_seconds", 0.0)
+        for model, model_totals in step.get("models", {}).items():
+            _add_totals(models.setdefault(model, _empty_totals()), model_totals)
+    totals["models"] = models
+    totals["step_seconds"] = round(duration, 4)
+
+    summaries = {}
+    for step_id, step in steps.items():
+        summary = {key: value for key, value in step.items() if key != "call_log"}
+        summary["llm_seconds_share"] = step.get("llm_seconds", 0.0) / totals["llm_seconds"] if totals["llm_seconds"] else 0.0
+        summary["cost_share"] = step.get("cost_usd", 0.0) / totals["cost_usd"] if totals["cost_usd"] else 0.0
+        summaries[step_id] = summary
+
+    return {
+        "totals": totals,
+        "steps": summaries,
+        "slowest_step": max(steps, key=lambda s: steps[s].get("duration_seconds", 0.0), default=None),
+        "costliest_step": max(steps, key=lambda s: steps[s].get("cost_usd", 0.0), default=None)
+    }
+
+
+def rollup_executions(usages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Workflow-level usage over several execution rollups (see rollup_steps):
+    totals plus per-step averages per execution that ran the step.
+    """
+    totals = _empty_totals()
+    steps: Dict[str, Dict[str, Any]] = {}
+    for usage in usages:
+        _add_totals(totals, usage.get("totals", {}))
+        for step_id, step in usage.get("steps", {}).items():
+            entry = steps.setdefault(step_id, dict(_empty_totals(), agent=step.get("agent"), executions=0, duration_seconds=0.0))
+            _add_totals(entry, step)
+            entry["executions"] += 1
+            entry["duration_seconds"] += step.get("duration_seconds", 0.0)
+
+    for entry in steps.values():
+        runs = entry["executions"]
+        entry["avg_duration_seconds"] = entry["duration_seconds"] / runs
+        entry["avg_total_tokens"] = entry["total_tokens"] / runs
+        entry["avg_cost_usd"] = entry["cost_usd"] / runs
+
+    executions = len(usages)
+    return {
+        "executions": executions,
+        "totals": totals,
+        "avg_cost_usd": totals["cost_usd"] / executions if executions else 0.0,
+        "avg_total_tokens": totals["total_tokens"] / executions if executions else 0.0,
+        "steps": steps
+    }
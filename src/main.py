@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import Dict, Any
@@ -18,9 +19,9 @@ class WorkflowRequest(BaseModel):
 
 @app.post("/run_workflow")
 async def run_workflow(request: WorkflowRequest):
-    orchestrator = Orchestrator()
+    orchestrator = await asyncio.to_thread(Orchestrator)
     try:
-        result = orchestrator.run_workflow(request.workflow_id, request.initial_inputs)
+        result = await orchestrator.run_workflow_async(request.workflow_id, request.initial_inputs)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,13 @@
+import pytest
+from src.components import tracing
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_trace_dir(tmp_path_factory):
+    """Spans of the executions the tests run go to a temporary directory, not data/traces."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr("config.TRACE_DIR", str(tmp_path_factory.mktemp("traces")))
+        monkeypatch.setattr(tracing, "_exporter", None)
+        yield
+        if tracing._exporter is not None:
+            tracing._exporter.close()
@@ -0,0 +1,85 @@
+import unittest
+import asyncio
+import sys
+import os
+from unittest.mock import AsyncMock, patch
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["GOOGLE_API_KEY"] = "fake_key"
+
+from tinydb import TinyDB
+from tinydb.storages import MemoryStorage
+from src.engine.executor import Executor
+from src.engine.orchestrator import Orchestrator
+from src.engine.llm_handler import LLMHandler
+
+
+class FakeDBClient:
+    def __init__(self):
+        self.db = TinyDB(storage=MemoryStorage)
+
+    def get_table(self, table_name: str):
+        return self.db.table(table_name)
+
+
+class SlowLLM:
+    async def call_llm_async(self, prompts, model="gemini-1.5-flash"):
+        await asyncio.sleep(0.2)
+        return '{"answer": "ok"}'
+
+
+class TestAsyncExecutor(unittest.IsolatedAsyncioTestCase):
+
+    def _build_orchestrator(self) -> Orchestrator:
+        db_client = FakeDBClient()
+        db_client.get_table('components').insert({"id": "prompt_1", "content": "Answer in JSON."})
+        db_client.get_table('steps').insert({"id": "step_1", "execution_config": {"llm_prompts": ["prompt_1"]}})
+        db_client.get_table('workflows').insert({"id": "wf_1", "sequence": ["step_1"]})
+
+        executor = Executor.__new__(Executor)
+        executor.db_client = db_client
+        executor.llm_handler = SlowLLM()
+
+        orchestrator = Orchestrator.__new__(Orchestrator)
+        orchestrator.db_client = db_client
+        orchestrator.executor = executor
+        return orchestrator
+
+    async def test_workflow_does_not_block_event_loop(self):
+        """Other coroutines keep running while a step waits for the LLM."""
+        orchestrator = self._build_orchestrator()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        try:
+            result = await orchestrator.run_workflow_async("wf_1", {"history_text": "abc"})
+        finally:
+            ticker_task.cancel()
+
+        self.assertEqual(result["llm_output"], '{"answer": "ok"}')
+        self.assertEqual(result["history_text"], "abc")
+        self.assertGreater(ticks, 5)
+
+    async def test_call_llm_async_falls_back(self):
+        """A failing primary model falls back to the next model on the async path too."""
+        with patch("google.generativeai.configure"):
+            handler = LLMHandler()
+
+        call = AsyncMock(side_effect=[Exception("429 Quota exceeded"), '{"ok": true}'])
+        with patch.object(handler, "_call_gemini_async", call):
+            response = await handler.call_llm_async([{"content": "hi"}], model="gemini-2.5-flash")
+
+        self.assertEqual(response, '{"ok": true}')
+        self.assertEqual(call.await_args_list[1].args[1], "gemini-2.0-flash")
+
+
+if __name__ == '__main__':
+    unittest.main()
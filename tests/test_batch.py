@@ -0,0 +1,95 @@
+import io
+import asyncio
+import zipfile
+import pytest
+from backend.engine import WorkflowEngine
+from backend.batch import BatchRunner, parse_submission_zip
+from backend.state import WorkflowState
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.llm_provider.USE_MOCK_LLM", True)
+    return WorkflowEngine(str(tmp_path / "test_db.json"))
+
+
+class ScoringAgent:
+    """Writes a score derived from the product text; fails on 'crash'."""
+    reads = ("inputs",)
+    writes = ("step_8_judge",)
+    in_flight = 0
+    max_in_flight = 0
+
+    async def execute(self, state: WorkflowState, system_instruction=None) -> WorkflowState:
+        ScoringAgent.in_flight += 1
+        ScoringAgent.max_in_flight = max(ScoringAgent.max_in_flight, ScoringAgent.in_flight)
+        await asyncio.sleep(0.02)
+        ScoringAgent.in_flight -= 1
+        if state.inputs.product_text == "crash":
+            raise RuntimeError("boom")
+        state.step_8_judge = {"score": len(state.inputs.product_text)}
+        return state
+
+
+def test_batch_runs_items_with_bounded_concurrency(engine):
+    engine.agents_map = {"Judge": ScoringAgent()}
+    engine.steps_table.insert({"id": "judge", "component": "Judge", "execution_config": {},
+                               "state_key": "step_8_judge", "hoist_fields": ["score"]})
+    engine.workflows_table.insert({"id": "wf", "steps": ["judge"]})
+
+    runner = BatchRunner(engine, max_concurrency=2)
+    items = [{"history_text": "h", "product_text": "p" * n, "reflection_text": "r", "label": f"s{n}"} for n in range(1, 5)]
+    items.append({"history_text": "h", "product_text": "crash", "reflection_text": "r", "label": "bad"})
+    batch_id = runner.create_batch("wf", items)
+
+    ScoringAgent.in_flight = ScoringAgent.max_in_flight = 0
+    asyncio.run(runner.run_batch(batch_id))
+
+    status = runner.get_batch_status(batch_id)
+    assert ScoringAgent.max_in_flight == 2
+    assert status["status"] == "completed_with_errors"
+    assert status["progress"]["completed"] == 4 and status["progress"]["failed"] == 1
+    assert status["progress"]["percent"] == 100.0
+
+    rows = runner.export_results(batch_id)
+    assert [r["result"].get("score") for r in rows] == [1, 2, 3, 4, None]
+    csv_text = runner.export_results(batch_id, "csv")
+    assert csv_text.splitlines()[0] == "label,execution_id,status,error,score"
+    assert csv_text.splitlines()[1].startswith("s1,")
+
+
+def test_parse_submission_zip_groups_files_by_folder():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("anna/historia.txt", "H1")
+        archive.writestr("anna/tuotos.txt", "P1")
+        archive.writestr("anna/reflektio.txt", "R1")
+        archive.writestr("ben/history.md", "H2")
+        archive.writestr("ben/notes.txt", "ignored")
+
+    items = parse_submission_zip(buffer.getvalue())
+
+    assert items[0] == {"label": "anna", "history_text": "H1", "product_text": "P1", "reflection_text": "R1"}
+    assert items[1] == {"label": "ben", "history_text": "H2"}
+
+def test_interrupted_batch_resumes_unfinished_items(engine):
+    engine.agents_map = {"Judge": ScoringAgent()}
+    engine.steps_table.insert({"id": "judge", "component": "Judge", "execution_config": {},
+                               "state_key": "step_8_judge", "hoist_fields": ["score"]})
+    engine.workflows_table.insert({"id": "wf", "steps": ["judge"]})
+
+    runner = BatchRunner(engine, max_concurrency=2)
+    items = [{"history_text": "h", "product_text": "p" * n, "reflection_text": "r", "label": f"s{n}"} for n in range(1, 4)]
+    batch_id = runner.create_batch("wf", items)
+    first, _, last = runner.get_batch_status(batch_id)["items"]
+    asyncio.run(engine.run_execution(first["execution_id"], {"history_text": "h", "product_text": "p", "reflection_text": "r"}))
+    # The inputs of the last item are gone: it fails before its run starts
+    engine.executions_table.update({"inputs_ref": "0" * 64}, lambda r: r["execution_id"] == last["execution_id"])
+
+    asyncio.run(runner.run_batch(batch_id))  # e.g. POST /executions/batch/{id}/resume after a restart
+
+    status = runner.get_batch_status(batch_id)
+    assert not runner.is_running(batch_id)
+    assert status["status"] == "completed_with_errors"
+    assert (status["completed"], status["failed"]) == (2, 1)
+    assert engine.get_execution_status(first["execution_id"]).get("resume_count") is None
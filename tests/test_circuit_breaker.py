@@ -0,0 +1,101 @@
+import asyncio
+import pytest
+from src.engine.circuit_breaker import (
+    CircuitBreaker, CircuitOpenError, circuit_guard, get_circuit_breakers, OPEN, HALF_OPEN, CLOSED
+)
+
+
+@pytest.fixture(autouse=True)
+def breakers(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # llm_errors.txt
+    monkeypatch.setattr("config.LLM_CIRCUIT_MIN_CALLS", 2)
+    monkeypatch.setattr("config.LLM_CIRCUIT_OPEN_SECONDS", 60)
+    get_circuit_breakers().clear()
+    yield
+    get_circuit_breakers().clear()
+
+
+def fail(provider="gemini", model="m"):
+    with pytest.raises(RuntimeError):
+        with circuit_guard(provider, model):
+            raise RuntimeError("503 unavailable")
+
+
+def test_opens_on_error_rate_and_short_circuits():
+    with circuit_guard("gemini", "m"):
+        pass
+    fail()
+    breaker = get_circuit_breakers().get("gemini", "m")
+    assert breaker.state == OPEN  # 1 of 2 calls failed
+
+    with pytest.raises(CircuitOpenError):
+        with circuit_guard("gemini", "m"):
+            pytest.fail("an open circuit must not call the provider")
+    assert get_circuit_breakers().snapshot()["gemini/m"]["rejected"] == 1
+    # Other models are unaffected
+    with circuit_guard("gemini", "other"):
+        pass
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("openai", "m", min_calls=1, open_seconds=0, probes=1)
+    breaker.acquire()
+    breaker.record_failure()
+    assert breaker.state == HALF_OPEN  # open_seconds elapsed
+
+    breaker.acquire()  # the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()  # only one probe at a time
+    breaker.record_failure()
+    breaker.open_seconds = 60
+    assert breaker.state == OPEN
+
+    breaker.open_seconds = 0
+    breaker.acquire()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_cancelled_probe_frees_its_slot():
+    breaker = CircuitBreaker("gemini", "m", min_calls=1, open_seconds=0)
+    breaker.record_failure()
+    breaker.acquire()
+    breaker.release()
+    breaker.acquire()
+
+
+def test_handler_skips_open_model_without_logging(monkeypatch, tmp_path):
+    from src.engine.llm_handler import LLMHandler
+
+    calls = []
+
+    async def call_gemini(self, prompt, model_name):
+        calls.append(model_name)
+        with circuit_guard("gemini", model_name):
+            if model_name == "gemini-2.5-flash":
+                raise RuntimeError("503 unavailable")
+            return "ok"
+
+    monkeypatch.setattr(LLMHandler, "_call_gemini_async", call_gemini)
+    handler = LLMHandler()
+    prompts = [{"content": "hi"}]
+    assert asyncio.run(handler.call_llm_async(prompts, model="gemini-2.5-flash")) == "ok"
+    assert asyncio.run(handler.call_llm_async(prompts, model="gemini-2.5-flash")) == "ok"
+    assert get_circuit_breakers().get("gemini", "gemini-2.5-flash").state == OPEN
+    # Rejected up front: goes straight to the fallback, nothing new in llm_errors.txt
+    assert asyncio.run(handler.call_llm_async(prompts, model="gemini-2.5-flash")) == "ok"
+    assert calls.count("gemini-2.5-flash") == 3
+    assert get_circuit_breakers().snapshot()["gemini/gemini-2.5-flash"]["rejected"] == 1
+    assert not (tmp_path / "llm_errors.txt").exists()
+
+
+def test_provider_does_not_retry_an_open_circuit():
+    from backend.llm_provider import GoogleGeminiProvider
+
+    breaker = get_circuit_breakers().get("gemini", "gemini-2.5-flash")
+    breaker.record_failure()
+    breaker.record_failure()
+    provider = GoogleGeminiProvider("gemini-2.5-flash", api_key="test")
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(provider.generate("prompt"))
+    assert breaker.rejected == 1
@@ -0,0 +1,155 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from backend.agents.base import BaseAgent
+from backend.context_cache import PromptPrefix, get_context_cache_registry
+from backend.engine import WorkflowEngine
+from backend.events import ExecutionEventBus
+from backend.llm_provider import GoogleGeminiProvider, MockProvider
+from backend.prompt_cache import prompt_cache
+from backend.state import WorkflowState
+from src.engine.usage import estimate_cost
+
+
+class SubmissionAgent(BaseAgent):
+    submission_texts = ("history_text", "product_text", "reflection_text")
+
+    def __init__(self, name):
+        self.model = "mock"
+        self.name = name
+        self.reads = ("inputs", "aux_data")
+        self.writes = (f"aux_data.{name}",)
+        self.llm_provider = MockProvider(latency="0")
+
+    def construct_user_prompt(self, state: WorkflowState) -> str:
+        return f"TASK: {self.name}\n{self.submission_section(state)}"
+
+    def _update_state(self, state: WorkflowState, response_data) -> WorkflowState:
+        state.aux_data[self.name] = response_data
+        return state
+
+
+@pytest.fixture(autouse=True)
+def context_cache(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # mock_debug.log
+    monkeypatch.setattr("backend.llm_provider.LLM_CONTEXT_CACHE_ENABLED", True)
+    monkeypatch.setattr("backend.llm_provider.LLM_CONTEXT_CACHE_MIN_TOKENS", 100)
+    prompt_cache.clear()
+    get_context_cache_registry().clear()
+    yield
+    prompt_cache.clear()
+    get_context_cache_registry().clear()
+
+
+def test_steps_share_a_cached_prompt_prefix(tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.llm_provider.USE_MOCK_LLM", True)
+    engine = WorkflowEngine(str(tmp_path / "test_db.json"))
+    engine.event_bus = ExecutionEventBus()
+    engine.agents_map = {"First": SubmissionAgent("first"), "Second": SubmissionAgent("second")}
+    engine.components_table.insert_multiple([
+        {"id": "MANDATE", "content": "Shared mandate."},
+        {"id": "RULE", "content": "Shared rule."},
+        {"id": "TASK_1", "content": "First task."},
+        {"id": "TASK_2", "content": "Second task."},
+    ])
+    engine.steps_table.insert({"id": "s1", "component": "First", "execution_config": {"llm_prompts": ["MANDATE", "RULE", "TASK_1"]}})
+    engine.steps_table.insert({"id": "s2", "component": "Second", "execution_config": {"llm_prompts": ["MANDATE", "RULE", "TASK_2"]}})
+    engine.workflows_table.insert({"id": "wf", "steps": ["s1", "s2"]})
+
+    assert engine._construct_prompt_parts_for_step("s2") == ("Shared mandate.\n\nShared rule.", "Second task.")
+    assert engine._construct_prompt_for_step("s2") == "Shared mandate.\n\nShared rule.\n\nSecond task."
+
+    inputs = {"history_text": "h" * 400, "product_text": "p" * 400, "reflection_text": "r" * 400}
+    execution_id = engine.create_execution("wf", inputs)
+    asyncio.run(engine.run_execution(execution_id, inputs))
+
+    steps = engine.get_execution_usage(execution_id)["steps"]
+    assert steps["s1"]["cached_prompt_tokens"] == 0  # creates the cache
+    assert steps["s2"]["cached_prompt_tokens"] > 300  # shared mandates + submission
+    assert steps["s2"]["cached_prompt_tokens"] < steps["s2"]["prompt_tokens"]
+    stats = get_context_cache_registry().stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_without_context_cache_agents_keep_their_own_texts(monkeypatch):
+    from backend.agents.critics import CausalAnalystAgent
+
+    requests = []
+
+    class Provider:
+        async def generate(self, prompt, system_instruction=None, response_schema=None, prefix=None):
+            requests.append((prompt, prefix))
+            return {}
+
+    agent = CausalAnalystAgent.__new__(CausalAnalystAgent)
+    agent.model, agent.llm_provider = "mock", Provider()
+    monkeypatch.setattr(agent, "_update_state", lambda state, response: state)
+    state = WorkflowState(execution_id="e1", inputs={"history_text": "HISTORY " * 100, "product_text": "PRODUCT " * 100,
+                                                     "reflection_text": "REFLECTION " * 100})
+
+    asyncio.run(agent.execute(state, system_prefix="Shared mandate. " * 40))
+    monkeypatch.setattr("backend.llm_provider.LLM_CONTEXT_CACHE_ENABLED", False)
+    asyncio.run(agent.execute(state, system_prefix="Shared mandate. " * 40))
+
+    (cached_prompt, cached_prefix), (plain_prompt, plain_prefix) = requests
+    # Cached: all texts once in the prefix, the prompt only refers to them
+    assert "PRODUCT" in cached_prefix.context and "HISTORY" not in cached_prompt
+    assert "KESKUSTELUHISTORIA and REFLEKTIODOKUMENTTI: see the SUBMISSION above." in cached_prompt
+    # Default (no context cache): only the agent's own texts, in the prompt
+    assert plain_prefix.context == "" and plain_prefix.system
+    assert "HISTORY" in plain_prompt and "REFLECTION" in plain_prompt and "PRODUCT" not in plain_prompt
+
+
+def test_cached_prompt_tokens_are_priced_at_the_cached_rate():
+    assert estimate_cost("gemini-2.5-flash", 1_000_000, 0, cached_prompt_tokens=1_000_000) == pytest.approx(0.075)
+    assert estimate_cost("gemini-2.5-flash", 1_000_000, 0, cached_prompt_tokens=500_000) == pytest.approx(0.1875)
+    # A price without a cached rate charges cached tokens as input
+    assert estimate_cost("unknown", 10, 0, cached_prompt_tokens=10) == 0.0
+
+
+def test_gemini_creates_one_cached_content_per_prefix(monkeypatch):
+    import google.generativeai as genai
+    from google.generativeai import caching
+
+    created, requests = [], []
+
+    def create(**kwargs):
+        created.append(kwargs)
+        return SimpleNamespace(name="cachedContents/abc", usage_metadata=SimpleNamespace(total_token_count=2048))
+
+    class CachedModel:
+        async def generate_content_async(self, contents):
+            requests.append(contents)
+            await asyncio.sleep(0.01)
+            return SimpleNamespace(parts=[1], text="ok", candidates=[], usage_metadata=SimpleNamespace(
+                prompt_token_count=2100, candidates_token_count=5, cached_content_token_count=2048))
+
+    monkeypatch.setattr(caching.CachedContent, "create", staticmethod(create))
+    monkeypatch.setattr(genai.GenerativeModel, "from_cached_content", staticmethod(lambda cache, generation_config=None: CachedModel()))
+
+    provider = GoogleGeminiProvider("gemini-2.5-flash", api_key="test")
+    prefix = PromptPrefix("Shared mandates. " * 40, "Submission text. " * 100)
+
+    async def run_steps():
+        return await asyncio.gather(
+            provider.generate("Prompt A", system_instruction="Step A", prefix=prefix),
+            provider.generate("Prompt B", system_instruction="Step B", prefix=prefix),
+        )
+
+    assert asyncio.run(run_steps()) == ["ok", "ok"]
+    assert len(created) == 1  # concurrent steps share one cache
+    assert created[0]["system_instruction"] == prefix.system
+    assert created[0]["contents"] == [prefix.context]
+    # The step-specific instruction is sent with the prompt, not in the cache
+    assert sorted(requests) == ["Step A\n\nPrompt A", "Step B\n\nPrompt B"]
+
+
+def test_creation_locks_do_not_accumulate():
+    from backend.context_cache import ContextCacheRegistry
+
+    registry = ContextCacheRegistry()
+    for n in range(50):
+        with registry.creation_lock("gemini", "m", f"key{n}"):
+            registry.put("gemini", "m", f"key{n}", f"cachedContents/{n}", 600, 2048)
+    # Only the lock of the creation in flight during the last put() is kept
+    assert list(registry._creation_locks) == [("gemini", "m", "key49")]
@@ -0,0 +1,128 @@
+import asyncio
+import pytest
+from backend.engine import WorkflowEngine
+from backend.state import WorkflowState
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    # Agents are created with the Mock provider so no API key is needed
+    monkeypatch.setattr("backend.llm_provider.USE_MOCK_LLM", True)
+    return WorkflowEngine(str(tmp_path / "test_db.json"))
+
+
+class FakeAgent:
+    """Minimal agent that records how many calls are in flight at once."""
+    in_flight = 0
+    max_in_flight = 0
+
+    def __init__(self, name, reads, writes):
+        self.name = name
+        self.reads = reads
+        self.writes = writes
+
+    async def execute(self, state: WorkflowState, system_instruction=None) -> WorkflowState:
+        FakeAgent.in_flight += 1
+        FakeAgent.max_in_flight = max(FakeAgent.max_in_flight, FakeAgent.in_flight)
+        await asyncio.sleep(0.05)
+        FakeAgent.in_flight -= 1
+        state.aux_data[self.name] = True
+        return state
+
+
+def _names(stages):
+    return [[agent.__class__.__name__ for agent, _ in stage] for stage in stages]
+
+
+def test_seeded_pipeline_stages(engine):
+    """Critic steps that only read earlier state share a stage."""
+    order = [
+        "GuardAgent", "AnalystAgent", "LogicianAgent", "LogicalFalsifierAgent",
+        "CausalAnalystAgent", "PerformativityDetectorAgent", "FactualOverseerAgent",
+        "JudgeAgent", "XAIReporterAgent"
+    ]
+    pipeline = [(engine.agents_map[name], {"id": f"step_{i + 1}"}) for i, name in enumerate(order)]
+
+    stages = _names(engine._plan_stages(pipeline))
+
+    assert stages == [
+        ["GuardAgent"],
+        ["AnalystAgent", "CausalAnalystAgent", "PerformativityDetectorAgent"],
+        ["LogicianAgent", "FactualOverseerAgent"],
+        ["LogicalFalsifierAgent"],
+        ["JudgeAgent"],
+        ["XAIReporterAgent"],
+    ]
+
+
+def test_undeclared_agent_is_a_barrier(engine):
+    a = FakeAgent("a", ("inputs",), ("step_4_falsifier",))
+    b = FakeAgent("b", None, None)
+    c = FakeAgent("c", ("inputs",), ("step_6_causal",))
+    pipeline = [(a, {"id": "a"}), (b, {"id": "b"}), (c, {"id": "c"})]
+
+    assert [len(stage) for stage in engine._plan_stages(pipeline)] == [1, 1, 1]
+
+
+def test_step_record_depends_on_overrides(engine):
+    a = FakeAgent("a", ("inputs",), ("step_4_falsifier",))
+    c = FakeAgent("c", ("inputs",), ("step_6_causal",))
+    pipeline = [(a, {"id": "a"}), (c, {"id": "c", "depends_on": ["a"]})]
+
+    assert [len(stage) for stage in engine._plan_stages(pipeline)] == [1, 1]
+
+
+def test_parallel_execution_runs_independent_steps_concurrently(engine):
+    engine.agents_map = {
+        "A": FakeAgent("A", ("inputs",), ("step_4_falsifier",)),
+        "B": FakeAgent("B", ("inputs",), ("step_6_causal",)),
+        "C": FakeAgent("C", ("inputs",), ("step_7_detector",)),
+    }
+    for sid, comp in [("s1", "A"), ("s2", "B"), ("s3", "C")]:
+        engine.steps_table.insert({"id": sid, "component": comp, "execution_config": {}})
+    engine.workflows_table.insert({"id": "wf", "steps": ["s1", "s2", "s3"]})
+
+    FakeAgent.in_flight = FakeAgent.max_in_flight = 0
+    inputs = {"history_text": "h", "product_text": "p", "reflection_text": "r"}
+    execution_id = engine.create_execution("wf", inputs)
+    asyncio.run(engine.run_execution(execution_id, inputs))
+
+    assert FakeAgent.max_in_flight == 3
+    assert engine.get_execution_status(execution_id)["status"] == "completed"
+
+
+class SearchingAgent(FakeAgent):
+    """Like the Factual Overseer: a pre-hook makes a blocking (synchronous) API call."""
+
+    def search(self, state: WorkflowState) -> WorkflowState:
+        import time
+        time.sleep(0.2)
+        state.aux_data["searched"] = True
+        return state
+
+
+def test_blocking_hook_does_not_stall_concurrent_steps(engine):
+    engine.agents_map = {
+        "A": SearchingAgent("A", ("inputs",), ("step_5_overseer",)),
+        "B": FakeAgent("B", ("inputs",), ("step_6_causal",)),
+    }
+    engine.steps_table.insert({"id": "s1", "component": "A", "execution_config": {"pre_hooks": ["search"]}})
+    engine.steps_table.insert({"id": "s2", "component": "B", "execution_config": {}})
+    engine.workflows_table.insert({"id": "wf", "steps": ["s1", "s2"]})
+
+    finished = {}
+    real_publish = engine.event_bus.publish
+
+    def publish(execution_id, event_type, **data):
+        if event_type == "step_finished":
+            finished[data["step_id"]] = len(finished)
+        return real_publish(execution_id, event_type, **data)
+
+    engine.event_bus.publish = publish
+    inputs = {"history_text": "h", "product_text": "p", "reflection_text": "r"}
+    execution_id = engine.create_execution("wf", inputs)
+    asyncio.run(engine.run_execution(execution_id, inputs))
+
+    # B finished while A's hook was still searching
+    assert finished == {"s2": 0, "s1": 1}
+    assert engine.get_execution_trace(execution_id)["aux_data"]["searched"] is True
@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+from backend.engine import WorkflowEngine
+from backend.events import ExecutionEventBus
+from backend.state import WorkflowState
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.llm_provider.USE_MOCK_LLM", True)
+    engine = WorkflowEngine(str(tmp_path / "test_db.json"))
+    engine.event_bus = ExecutionEventBus()
+    return engine
+
+
+class EchoAgent:
+    reads = ("inputs",)
+
+    def __init__(self, name):
+        self.name = name
+        self.writes = (f"aux_data.{name}",)
+
+    async def execute(self, state: WorkflowState, system_instruction=None) -> WorkflowState:
+        await asyncio.sleep(0.01)
+        state.aux_data[self.name] = True
+        return state
+
+
+def test_engine_publishes_progress_events(engine):
+    engine.agents_map = {"A": EchoAgent("a"), "B": EchoAgent("b")}
+    engine.steps_table.insert({"id": "s1", "component": "A", "execution_config": {"post_hooks": ["missing_hook"]}})
+    engine.steps_table.insert({"id": "s2", "component": "B", "execution_config": {}})
+    engine.workflows_table.insert({"id": "wf", "steps": ["s1", "s2"]})
+
+    inputs = {"history_text": "h", "product_text": "p", "reflection_text": "r"}
+    execution_id = engine.create_execution("wf", inputs)
+
+    async def main():
+        received = []
+
+        async def listen():
+            async for event in engine.event_bus.subscribe(execution_id):
+                received.append(event)
+
+        listener = asyncio.create_task(listen())
+        await asyncio.sleep(0)  # subscribe before the run starts
+        await engine.run_execution(execution_id, inputs)
+        await asyncio.wait_for(listener, timeout=1)
+        return received
+
+    events = asyncio.run(main())
+    types = [e["type"] for e in events]
+
+    assert types[0] == "execution_started"
+    assert events[0]["stages"] == [["s1", "s2"]]
+    assert types.count("step_started") == 2 and types.count("step_finished") == 2
+    assert {"type": "hook", "hook": "missing_hook", "phase": "post"}.items() <= next(e for e in events if e["type"] == "hook").items()
+    assert types[-1] == "execution_completed"
+
+
+def test_late_subscriber_replays_history_after_last_event_id():
+    bus = ExecutionEventBus()
+    first = bus.publish("x", "step_started", step_id="s1")
+    bus.publish("x", "step_finished", step_id="s1")
+    bus.publish("x", "execution_failed", error="boom")
+
+    async def collect():
+        return [e async for e in bus.subscribe("x", after_id=first["id"])]
+
+    events = asyncio.run(collect())
+    assert [e["type"] for e in events] == ["step_finished", "execution_failed"]
+    assert bus.subscriber_count("x") == 0
+
+
+def test_subscriber_of_a_resumed_execution_skips_the_previous_failure():
+    bus = ExecutionEventBus()
+    bus.publish("e1", "execution_started")
+    bus.publish("e1", "step_failed", step_id="s1")
+    bus.publish("e1", "execution_failed", error="boom")
+    bus.publish("e1", "execution_started")  # POST /executions/e1/resume
+
+    async def main():
+        received = []
+
+        async def listen():
+            async for event in bus.subscribe("e1"):
+                received.append(event["type"])
+
+        listener = asyncio.create_task(listen())
+        await asyncio.sleep(0)
+        bus.publish("e1", "execution_completed")
+        await asyncio.wait_for(listener, timeout=1)
+        return received
+
+    assert asyncio.run(main()) == ["execution_started", "execution_completed"]
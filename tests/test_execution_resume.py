@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from backend.engine import WorkflowEngine
+from backend.state import WorkflowState
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.llm_provider.USE_MOCK_LLM", True)
+    return WorkflowEngine(str(tmp_path / "test_db.json"))
+
+
+class CountingAgent:
+    """Agent stub that counts calls and can be told to fail."""
+
+    def __init__(self, name, writes, fail=False):
+        self.name = name
+        self.reads = ("inputs",)
+        self.writes = writes
+        self.fail = fail
+        self.calls = 0
+
+    async def execute(self, state: WorkflowState, system_instruction=None) -> WorkflowState:
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError(f"{self.name} crashed")
+        state.aux_data[self.name] = "done"
+        return state
+
+
+def _setup(engine, agents):
+    engine.agents_map = {agent.name: agent for agent in agents}
+    for agent in agents:
+        engine.steps_table.insert({"id": f"step_{agent.name}", "component": agent.name, "execution_config": {}})
+    engine.workflows_table.insert({"id": "wf", "steps": [f"step_{agent.name}" for agent in agents]})
+
+
+def test_failed_execution_resumes_from_checkpoint(engine):
+    first = CountingAgent("first", ("aux_data.first",))
+    second = CountingAgent("second", ("aux_data.second",))
+    last = CountingAgent("last", ("aux_data.first",), fail=True)  # conflicts -> runs after 'first'
+    _setup(engine, [first, second, last])
+
+    inputs = {"history_text": "h", "product_text": "p", "reflection_text": "r"}
+    execution_id = engine.create_execution("wf", inputs)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(engine.run_execution(execution_id, inputs))
+
+    record = engine.get_execution_status(execution_id)
+    assert record["status"] == "failed"
+    assert record["failed_step"] == "CountingAgent"
+    assert sorted(record["completed_steps"]) == ["step_first", "step_second"]
+    assert record["checkpoint"] is None and record["checkpoint_ref"]  # kept out of the execution row
+    assert engine.get_execution_checkpoint(record)["aux_data"] == {"first": "done", "second": "done"}
+
+    last.fail = False
+    asyncio.run(engine.resume_execution(execution_id))
+
+    record = engine.get_execution_status(execution_id)
+    assert record["status"] == "completed"
+    assert record["resume_count"] == 1
+    assert engine.get_execution_checkpoint(record) is None
+    assert (first.calls, second.calls, last.calls) == (1, 1, 2)
+    assert "trace" not in record
+    assert engine.get_execution_trace(execution_id)["aux_data"]["last"] == "done"
+
+
+def test_inputs_and_trace_are_stored_as_blobs(engine):
+    agent = CountingAgent("only", ("aux_data.only",))
+    _setup(engine, [agent])
+
+    inputs = {"history_text": "h" * 1000, "product_text": "p", "reflection_text": "r"}
+    execution_id = engine.create_execution("wf", inputs)
+    asyncio.run(engine.run_execution(execution_id, inputs))
+
+    record = engine.get_execution_status(execution_id)
+    assert "inputs" not in record and "trace" not in record
+    assert record["inputs_summary"]["history_text"] == {"chars": 1000}
+    assert engine.get_execution_inputs(record) == inputs
+    assert engine.get_execution_trace(execution_id)["inputs"]["history_text"] == "h" * 1000
+
+    # Identical inputs are stored once
+    second = engine.get_execution_status(engine.create_execution("wf", inputs))
+    assert second["inputs_ref"] == record["inputs_ref"]
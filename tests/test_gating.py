@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from backend.engine import WorkflowEngine
+from backend.events import ExecutionEventBus
+from backend.gating import parse_gating_rules
+from backend.state import WorkflowState
+
+HIGH_RISK = {"uhka_havaittu": True, "riski_taso": "KORKEA"}
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.llm_provider.USE_MOCK_LLM", True)
+    engine = WorkflowEngine(str(tmp_path / "test_db.json"))
+    engine.event_bus = ExecutionEventBus()
+    return engine
+
+
+class RecordingAgent:
+    def __init__(self, name, ran, security_check=None):
+        self.name = name
+        self.ran = ran
+        self.security_check = security_check
+        self.reads = ("inputs",)
+        self.writes = (f"aux_data.{name}",)
+
+    async def execute(self, state: WorkflowState, system_instruction=None) -> WorkflowState:
+        self.ran.append(self.name)
+        state.aux_data[self.name] = {"security_check": self.security_check} if self.security_check else True
+        return state
+
+
+def setup_workflow(engine, ran, security_check, rule):
+    engine.agents_map = {
+        "Guard": RecordingAgent("guard", ran, security_check),
+        "A": RecordingAgent("a", ran),
+        "B": RecordingAgent("b", ran),
+        "Report": RecordingAgent("report", ran),
+    }
+    for step_id, component in (("s1", "Guard"), ("s2", "A"), ("s3", "B"), ("s4", "Report")):
+        engine.steps_table.insert({"id": step_id, "component": component, "execution_config": {}})
+    engine.workflows_table.insert({"id": "wf", "steps": ["s1", "s2", "s3", "s4"], "gating_rules": [rule]})
+    inputs = {"history_text": "h", "product_text": "p", "reflection_text": "r"}
+    return engine.create_execution("wf", inputs), inputs
+
+
+def high_risk_rule(**overrides):
+    return dict({
+        "id": "high_risk",
+        "after": "s1",
+        "when": [{"field": "aux_data.guard.security_check.uhka_havaittu", "value": True},
+                 {"field": "aux_data.guard.security_check.riski_taso", "op": "in", "value": ["KORKEA"]}],
+        "action": "stop",
+    }, **overrides)
+
+
+def test_stop_rule_ends_the_run_after_the_guard(engine):
+    ran = []
+    execution_id, inputs = setup_workflow(engine, ran, HIGH_RISK, high_risk_rule())
+    result = asyncio.run(engine.run_execution(execution_id, inputs))
+
+    # The guard is a barrier: the independent steps did not start alongside it
+    assert ran == ["guard"]
+    assert result["gating"][0]["skipped_steps"] == ["s2", "s3", "s4"]
+    assert engine.get_execution_status(execution_id)["status"] == "completed"
+    assert [e["rule"] for e in engine.event_bus.history(execution_id) if e["type"] == "execution_gated"] == ["high_risk"]
+
+
+def test_skip_to_rule_jumps_to_the_target(engine):
+    ran = []
+    execution_id, inputs = setup_workflow(engine, ran, HIGH_RISK, high_risk_rule(action="skip_to", target="s4"))
+    result = asyncio.run(engine.run_execution(execution_id, inputs))
+    assert sorted(ran) == ["guard", "report"]
+    assert result["gating"][0]["skipped_steps"] == ["s2", "s3"]
+
+
+def test_rule_does_not_fire_on_low_risk(engine):
+    ran = []
+    execution_id, inputs = setup_workflow(engine, ran, {"uhka_havaittu": False, "riski_taso": "MATALA"}, high_risk_rule())
+    result = asyncio.run(engine.run_execution(execution_id, inputs))
+    assert sorted(ran) == ["a", "b", "guard", "report"]
+    assert "gating" not in result
+
+
+def test_malformed_rules_are_rejected():
+    with pytest.raises(ValueError, match="unknown action"):
+        parse_gating_rules([{"when": {"field": "x", "value": 1}, "action": "explode"}])
+    with pytest.raises(ValueError, match="needs a 'target'"):
+        parse_gating_rules([{"when": {"field": "x", "value": 1}, "action": "skip_to"}])
+    with pytest.raises(ValueError, match="not in the workflow"):
+        parse_gating_rules([{"when": {"field": "x", "value": 1}, "after": "step_99"}], ["step_1"])
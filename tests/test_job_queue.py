@@ -0,0 +1,152 @@
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import threading
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.job_queue import JobQueue, RUN_EXECUTION, QUEUED, RUNNING, DONE, FAILED
+from backend.worker import process_job
+
+
+class FakeEngine:
+    def __init__(self, record):
+        self.record = record
+        self.calls = []
+
+    def get_execution_status(self, execution_id):
+        return self.record
+
+    def get_execution_checkpoint(self, record):
+        return record.get("checkpoint")
+
+    def get_execution_inputs(self, record):
+        return {"history_text": "abc"}
+
+    async def run_execution(self, execution_id, inputs):
+        self.calls.append(("run", execution_id))
+
+    async def resume_execution(self, execution_id):
+        self.calls.append(("resume", execution_id))
+
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(os.path.join(self.tmp.name, "jobs.sqlite"), lease_seconds=0.2, max_attempts=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_claim_complete_and_no_double_claim(self):
+        job_ids = [self.queue.enqueue(RUN_EXECUTION, {"execution_id": f"e{i}"}) for i in range(20)]
+        claimed = []
+        lock = threading.Lock()
+
+        def worker(worker_id):
+            while True:
+                job = self.queue.claim(worker_id)
+                if job is None:
+                    return
+                with lock:
+                    claimed.append(job["id"])
+                self.queue.complete(job["id"], worker_id)
+
+        threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(claimed), sorted(job_ids))
+        self.assertEqual(self.queue.stats(), {QUEUED: 0, RUNNING: 0, DONE: 20, FAILED: 0})
+
+    def test_expired_lease_is_reclaimed_until_attempts_run_out(self):
+        job_id = self.queue.enqueue(RUN_EXECUTION, {"execution_id": "e1"})
+
+        first = self.queue.claim("dead-worker")
+        self.assertEqual(first["attempts"], 1)
+        self.assertIsNone(self.queue.claim("w2"))  # still leased
+
+        time.sleep(0.3)
+        second = self.queue.claim("w2")
+        self.assertEqual((second["id"], second["attempts"]), (job_id, 2))
+        # The original worker lost the job
+        self.assertFalse(self.queue.heartbeat(job_id, "dead-worker"))
+        self.assertFalse(self.queue.complete(job_id, "dead-worker"))
+
+        time.sleep(0.3)
+        self.assertIsNone(self.queue.claim("w3"))
+        self.assertEqual(self.queue.get(job_id)["status"], FAILED)
+
+    def test_heartbeat_keeps_lease_and_fail_requeues(self):
+        job_id = self.queue.enqueue(RUN_EXECUTION, {"execution_id": "e1"})
+        self.queue.claim("w1")
+        for _ in range(3):
+            time.sleep(0.1)
+            self.assertTrue(self.queue.heartbeat(job_id, "w1"))
+        self.assertIsNone(self.queue.claim("w2"))
+
+        self.queue.fail(job_id, "w1", "boom")
+        self.assertEqual(self.queue.get(job_id)["status"], QUEUED)
+        self.queue.claim("w2")
+        self.queue.fail(job_id, "w2", "boom again")
+        self.assertEqual(self.queue.get(job_id)["status"], FAILED)
+
+    def test_reclaimed_job_resumes_from_checkpoint(self):
+        engine = FakeEngine({"status": "running", "checkpoint": {"completed_steps": ["step_1"]}})
+        job = {"kind": RUN_EXECUTION, "payload": {"execution_id": "e1"}, "attempts": 1}
+        asyncio.run(process_job(engine, job))
+        asyncio.run(process_job(engine, dict(job, attempts=2)))
+        self.assertEqual(engine.calls, [("run", "e1"), ("resume", "e1")])
+
+    def test_worker_cache_sees_invalidations_of_the_api_process(self):
+        from unittest import mock
+        from backend.prompt_cache import PromptCache
+
+        api, worker = PromptCache(), PromptCache()
+        worker.sync(self.queue.cache_versions())
+        worker.put("db", "step_1", ("prefix", "old prompt"))
+
+        with mock.patch("config.EXECUTION_MODE", "worker"), \
+                mock.patch("src.database.job_queue.get_job_queue", return_value=self.queue):
+            api.invalidate_banned_phrases()
+        self.assertEqual(self.queue.cache_versions(), {"banned_phrases": 1})
+
+        worker.sync(self.queue.cache_versions())  # next job claimed
+        self.assertIsNone(worker.get("db", "step_1"))
+        self.assertEqual((worker.config_version, worker.banned_phrases_version), (0, 1))
+        worker.sync(self.queue.cache_versions())
+        self.assertEqual(worker.banned_phrases_version, 1)
+
+    def test_worker_events_are_relayed_to_the_api_process(self):
+        from backend.events import ExecutionEventBus
+
+        bus = ExecutionEventBus()
+        bus.relay = self.queue.append_event
+        bus.publish("e1", "execution_started")
+        bus.publish("e1", "step_partial", transient=True, path="summary", value="ab")
+        bus.publish("e1", "execution_failed", error="boom")
+        bus.publish("e2", "execution_started")
+
+        events = self.queue.events_after("e1")
+        self.assertEqual([e["type"] for e in events], ["execution_started", "execution_failed"])
+        self.assertEqual(events[1]["error"], "boom")
+        self.assertEqual(self.queue.events_after("e1", after_id=events[0]["id"]), events[1:])
+
+        # A resumed run: a new subscriber starts at its execution_started, not the old failure
+        bus.publish("e1", "execution_started")
+        bus.publish("e1", "step_started", step_id="s2")
+        self.assertEqual([e["type"] for e in self.queue.events_after("e1")], ["execution_started", "step_started"])
+
+        self.queue.prune_events(0)
+        self.assertEqual(self.queue.events_after("e1"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
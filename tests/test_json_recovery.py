@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.components.json_recovery import iter_json_candidates, select_candidate
+from backend.hooks import _clean_and_parse_json as backend_parse
+
+
+class TestJSONRecovery(unittest.TestCase):
+
+    def test_candidates_in_prose_and_fences(self):
+        text = 'Use {braces} wisely.\n```json\n{"a": 1}\n```\nThen {"metadata": {"id": 2}} and [1, 2]'
+        self.assertEqual(list(iter_json_candidates(text)), [{"a": 1}, {"metadata": {"id": 2}}])
+        self.assertEqual(list(iter_json_candidates(text, allow_arrays=True))[-1], [1, 2])
+        self.assertEqual(select_candidate(list(iter_json_candidates(text))), {"metadata": {"id": 2}})
+
+    def test_repairs_escapes_newlines_and_trailing_commas(self):
+        text = '{"path": "C:\\Users", "bad": "\\u00", "text": "Line 1\nLine 2", "list": [1, 2,],}'
+        self.assertEqual(
+            list(iter_json_candidates(text)),
+            [{"path": "C:\\Users", "bad": "\\u00", "text": "Line 1\nLine 2", "list": [1, 2]}]
+        )
+
+    def test_truncation_is_closed_or_rolled_back(self):
+        cases = {
+            '{"metadata": {"id": 1}, "data": "trunc': {"metadata": {"id": 1}, "data": "trunc"},
+            '{"a": [1, 2': {"a": [1, 2]},
+            '{"a": 1, "b":': {"a": 1, "b": None},
+            '{"a": 1, "ke': {"a": 1},
+            '{"a": [1, {"b': {"a": [1, {}]},
+            '{"a": "x\\': {"a": "x"},
+        }
+        for text, expected in cases.items():
+            self.assertEqual(list(iter_json_candidates(text)), [expected], text)
+        self.assertEqual(list(iter_json_candidates('{"a": tru')), [])
+
+    def test_mismatched_closers_and_broken_outer_value(self):
+        self.assertEqual(list(iter_json_candidates('{"a": [1, 2}')), [{"a": [1, 2]}])
+        self.assertEqual(list(iter_json_candidates('{"a": [1]]}')), [{"a": [1]}])
+        # The outer object is invalid (missing comma): its valid parts are returned
+        text = '{"x": {"metadata": {"id": 1}} "y": {"z": 2}}'
+        self.assertEqual(list(iter_json_candidates(text)), [{"metadata": {"id": 1}}, {"z": 2}])
+
+    def test_backend_parse_keeps_arrays(self):
+        self.assertEqual(backend_parse('Result: [{"a": 1}, {"b": 2}]'), [{"a": 1}, {"b": 2}])
+        self.assertEqual(backend_parse('no json here'), {"raw_output": "no json here"})
+
+
+if __name__ == '__main__':
+    unittest.main()
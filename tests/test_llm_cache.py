@@ -0,0 +1,75 @@
+import asyncio
+import time
+import pytest
+from pydantic import BaseModel
+from backend.llm_provider import LLMProvider
+from backend.llm_cache import LLMResponseCache, CachedLLMProvider, bypass_llm_cache
+
+
+class Answer(BaseModel):
+    text: str
+
+
+class CountingProvider(LLMProvider):
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate(self, prompt, system_instruction=None, response_schema=None, temperature=0.7):
+        self.calls += 1
+        return {"text": f"{prompt} #{self.calls}"}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=0, max_entries=100)
+
+
+def test_identical_requests_hit_cache(cache):
+    inner = CountingProvider()
+    provider = CachedLLMProvider(inner, cache=cache)
+
+    first = asyncio.run(provider.generate("hello", "sys", Answer, 0.0))
+    second = asyncio.run(provider.generate("hello", "sys", Answer, 0.0))
+    other = asyncio.run(provider.generate("hello", "other sys", Answer, 0.0))
+
+    assert first == second == {"text": "hello #1"}
+    assert other == {"text": "hello #2"}
+    assert inner.calls == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_bypass_skips_cache(cache):
+    inner = CountingProvider()
+    provider = CachedLLMProvider(inner, cache=cache)
+
+    asyncio.run(provider.generate("hello"))
+    with bypass_llm_cache():
+        asyncio.run(provider.generate("hello"))
+    asyncio.run(provider.generate("hello", use_cache=False))
+
+    assert inner.calls == 3
+
+
+def test_ttl_expiry(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=0.05)
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    time.sleep(0.1)
+    assert cache.get("k") is None
+
+
+def test_lru_eviction(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    cache.get("a")  # 'b' is now least recently used
+    time.sleep(0.01)
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
@@ -75,6 +75,25 @@ class TestLLMResilience(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result, "success")
         self.assertEqual(mock_instance.generate_content_async.call_count, 2)
 
+    @patch("google.generativeai.GenerativeModel")
+    @patch("google.generativeai.configure")
+    async def test_gemini_reuses_models_and_schemas(self, mock_configure, mock_model_cls):
+        """Verify repeated calls reuse the pooled model and the cached sanitized schema."""
+        mock_instance = mock_model_cls.return_value
+        mock_instance.generate_content_async = AsyncMock(
+            return_value=MagicMock(parts=[MagicMock()], text='{"field": "value", "score": 5}')
+        )
+
+        provider = GoogleGeminiProvider()
+        with patch.object(provider, "_sanitize_schema", wraps=provider._sanitize_schema) as sanitize:
+            for _ in range(3):
+                await provider.generate("prompt", system_instruction="sys", response_schema=TestSchema)
+            await provider.generate("prompt", system_instruction="other sys", response_schema=TestSchema)
+
+        self.assertEqual(mock_model_cls.call_count, 2)  # one per distinct system instruction
+        self.assertLessEqual(sanitize.call_count, 1)    # sanitized at most once per class
+        self.assertEqual(mock_instance.generate_content_async.call_count, 4)
+
     @patch("openai.AsyncOpenAI")
     async def test_openai_structured_output_config(self, mock_client_cls):
         """Verify OpenAI provider uses parse method when schema is provided."""
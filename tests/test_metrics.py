@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from backend.engine import WorkflowEngine
+from backend.events import ExecutionEventBus
+from backend.state import WorkflowState
+from src.components.metrics import MetricsRegistry, registry
+from src.engine.usage import record_llm_call
+
+
+class HookedAgent:
+    reads = ("inputs",)
+    writes = ("aux_data.hooked",)
+
+    def before_call(self, state: WorkflowState) -> WorkflowState:
+        raise RuntimeError("hook broke")
+
+    async def execute(self, state: WorkflowState, system_instruction=None) -> WorkflowState:
+        record_llm_call("metrics-test-model", 100, 20, latency_seconds=0.3)
+        state.aux_data["hooked"] = True
+        return state
+
+
+def _sample(text: str, line_prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not found in metrics output")
+
+
+def test_histogram_and_collector_exposition():
+    metrics = MetricsRegistry()
+    latency = metrics.histogram("demo_seconds", "Demo latency.", ("op",), buckets=(0.1, 1.0))
+    latency.observe(0.05, op="read")
+    latency.observe(0.5, op="read")
+    latency.observe(5.0, op="read")
+    assert metrics.histogram("demo_seconds", "Demo latency.", ("op",)) is latency
+    with pytest.raises(ValueError):
+        metrics.counter("demo_seconds", "Same name, other type.")
+
+    metrics.register_collector(lambda: [("demo_depth", "gauge", "Queue depth.", [({"queue": 'a"b'}, 3)])])
+    metrics.register_collector(lambda: 1 / 0)  # a failing collector is skipped
+
+    text = metrics.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert _sample(text, 'demo_seconds_bucket{op="read",le="0.1"}') == 1
+    assert _sample(text, 'demo_seconds_bucket{op="read",le="1.0"}') == 2
+    assert _sample(text, 'demo_seconds_bucket{op="read",le="+Inf"}') == 3
+    assert _sample(text, 'demo_seconds_sum{op="read"}') == pytest.approx(5.55)
+    assert _sample(text, 'demo_depth{queue="a\\"b"}') == 3
+
+
+def test_engine_and_endpoint_expose_metrics(tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.llm_provider.USE_MOCK_LLM", True)
+    engine = WorkflowEngine(str(tmp_path / "test_db.json"))
+    engine.event_bus = ExecutionEventBus()
+    engine.agents_map = {"Hooked": HookedAgent()}
+    engine.steps_table.insert({"id": "metrics_step", "component": "Hooked",
+                               "execution_config": {"pre_hooks": ["before_call"]}})
+    engine.workflows_table.insert({"id": "wf", "steps": ["metrics_step"]})
+
+    inputs = {"history_text": "h", "product_text": "p", "reflection_text": "r"}
+    asyncio.run(engine.run_execution(engine.create_execution("wf", inputs), inputs))
+
+    from backend.main import app
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+
+    assert _sample(text, 'quorum_step_duration_seconds_count{step_id="metrics_step",agent="HookedAgent",status="ok"}') >= 1
+    assert _sample(text, 'quorum_hook_duration_seconds_count{hook="before_call",agent="HookedAgent",status="error"}') >= 1
+    assert _sample(text, 'quorum_llm_call_duration_seconds_count{model="metrics-test-model",status="ok"}') >= 1
+    assert _sample(text, 'quorum_llm_tokens_total{model="metrics-test-model",kind="prompt"}') >= 100
+    assert _sample(text, 'quorum_db_operation_duration_seconds_count{operation="write",table="executions"}') >= 1
+    assert _sample(text, 'quorum_db_operation_duration_seconds_count{operation="read",table="steps"}') >= 1
+    assert _sample(text, 'quorum_executions_total{status="completed"}') >= 1
+    assert _sample(text, "quorum_active_executions") == 0
+    assert "quorum_llm_queue_depth" in text
+    assert 'quorum_cache_hit_ratio{cache="prompt"}' in text
+    assert registry.get("quorum_step_duration_seconds") is not None
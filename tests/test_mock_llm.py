@@ -0,0 +1,39 @@
+import asyncio
+import time
+import pytest
+from backend import schemas
+from backend.llm_provider import MockProvider
+from backend.mock_llm import LatencyModel
+
+
+def test_latency_model_specs():
+    assert LatencyModel.parse("0.25").sample() == 0.25
+    assert repr(LatencyModel.parse("fixed:0.5")) == "fixed:0.5"
+
+    uniform = LatencyModel.parse("uniform:0.1:0.2", seed=1)
+    assert all(0.1 <= uniform.sample() <= 0.2 for _ in range(100))
+    assert all(LatencyModel.parse("normal:0:1", seed=2).sample() >= 0 for _ in range(100))
+
+    lognormal = LatencyModel.parse("lognormal:0.2:0.5", seed=3)
+    samples = sorted(lognormal.sample() for _ in range(1001))
+    assert 0.15 < samples[500] < 0.25  # median
+    assert samples[-1] > 2 * samples[500]  # long tail
+
+    for spec in ("gamma:1:2", "uniform:0.1", "fixed:a"):
+        with pytest.raises(ValueError):
+            LatencyModel.parse(spec)
+
+
+@pytest.mark.parametrize("schema", [
+    schemas.TaintedData, schemas.TodistusKartta, schemas.ArgumentaatioAnalyysi,
+    schemas.LogiikkaAuditointi, schemas.KausaalinenAuditointi, schemas.PerformatiivisuusAuditointi,
+    schemas.EtiikkaJaFakta, schemas.TuomioJaPisteet, schemas.XAIReport,
+])
+def test_mock_provider_answers_by_response_schema(schema, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # mock_debug.log
+    provider = MockProvider(latency="0")
+    # The prompt mentions another agent's output, as later steps' prompts do
+    started = time.perf_counter()
+    response = asyncio.run(provider.generate("Analyze the TodistusKartta below.", response_schema=schema))
+    assert time.perf_counter() - started < 0.4
+    schema.model_validate(response)
@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from src.engine.model_routing import ModelRoute, RoutingPolicy, LatencyTracker
+
+
+def run_route(route, delays, failing=()):
+    """Runs the route against fake models answering after delays[model] seconds."""
+    started, cancelled = [], []
+
+    async def request(model):
+        started.append(model)
+        try:
+            await asyncio.sleep(delays[model])
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        if model in failing:
+            raise RuntimeError(f"{model} failed")
+        return model
+
+    result = asyncio.run(route.call(request))
+    return result, started, cancelled
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    route = ModelRoute("s1", "slow", ["fast"], latency_budget=0.05)
+    result, started, cancelled = run_route(route, {"slow": 5, "fast": 0.01})
+    assert result == "fast"
+    assert started == ["slow", "fast"]
+    assert cancelled == ["slow"]
+
+
+def test_primary_within_budget_is_not_hedged():
+    route = ModelRoute("s1", "primary", ["fallback"], latency_budget=1)
+    assert run_route(route, {"primary": 0.01, "fallback": 0.01}) == ("primary", ["primary"], [])
+
+
+def test_error_falls_back_immediately_and_last_error_is_raised():
+    route = ModelRoute("s1", "broken", ["ok"], latency_budget=0)
+    result, started, _ = run_route(route, {"broken": 0, "ok": 0.01}, failing={"broken"})
+    assert (result, started) == ("ok", ["broken", "ok"])
+
+    with pytest.raises(RuntimeError, match="ok failed"):
+        run_route(route, {"broken": 0, "ok": 0}, failing={"broken", "ok"})
+
+
+def test_percentile_needs_enough_samples(monkeypatch):
+    monkeypatch.setattr("config.LLM_HEDGE_MIN_SAMPLES", 5)
+    tracker = LatencyTracker()
+    for seconds in (1, 2, 3, 4):
+        tracker.observe("s1", "m", seconds)
+    assert tracker.percentile("s1", "m", 0.5) is None
+    tracker.observe("s1", "m", 10)
+    assert tracker.percentile("s1", "m", 0.5) == 3
+    assert tracker.percentile("s1", "m", 0.95) == 10
+
+
+def test_policy_reads_workflow_routing():
+    policy = RoutingPolicy({
+        "default_model_mapping": {"s1": "gemini-2.5-pro"},
+        "fallback_models": {"s1": ["gemini-2.5-flash"], "*": ["gpt-4o-mini"]},
+        "latency_budgets": {"*": 30},
+        "hedge_percentile": 0.9,
+    })
+    route = policy.route("s1", "gemini-1.5-flash")
+    assert route.models == ["gemini-2.5-pro", "gemini-2.5-flash"]
+    assert (route.hedge_delay("gemini-2.5-pro"), route.percentile) == (30.0, 0.9)
+    assert policy.route("s2", "gemini-1.5-flash").models == ["gemini-1.5-flash", "gpt-4o-mini"]
+    assert RoutingPolicy(None).route("s3", "m").models == ["m"]
+
+
+def test_agent_falls_back_to_the_workflow_chain(monkeypatch):
+    from backend.agents.base import BaseAgent
+    from backend.llm_provider import LLMFactory
+    from backend.state import WorkflowState
+    from src.engine.model_routing import use_route
+
+    class Provider:
+        def __init__(self, answer):
+            self.answer = answer
+
+        async def generate(self, prompt, system_instruction=None, response_schema=None):
+            if self.answer is None:
+                raise RuntimeError("quota exceeded")
+            return self.answer
+
+    class Agent(BaseAgent):
+        def __init__(self):
+            self.model = "primary"
+            self.llm_provider = Provider(None)
+
+        def construct_user_prompt(self, state):
+            return "prompt"
+
+        def _update_state(self, state, response_data):
+            state.aux_data["answer"] = response_data
+            return state
+
+    monkeypatch.setattr(LLMFactory, "_pool", {"backup": Provider("from backup")})
+    state = WorkflowState(execution_id="e1", inputs={"history_text": "h", "product_text": "p", "reflection_text": "r"})
+    with use_route(ModelRoute("s1", "primary", ["backup"], latency_budget=0)):
+        state = asyncio.run(Agent().execute(state, system_instruction="system"))
+    assert state.aux_data["answer"] == "from backup"
+
+
+def test_builtin_fallbacks_are_not_hedged(monkeypatch, tmp_path):
+    from src.engine.llm_handler import LLMHandler
+
+    monkeypatch.chdir(tmp_path)  # llm_errors.txt
+    monkeypatch.setattr("config.LLM_HEDGE_DEFAULT_BUDGET", 0.01)
+    called = []
+
+    async def call_model(self, prompt, model_name):
+        called.append(model_name)
+        await asyncio.sleep(0.1)
+        return model_name
+
+    monkeypatch.setattr(LLMHandler, "_call_model_async", call_model)
+    handler = LLMHandler()
+    # No workflow chain: a slow but successful primary is waited out, not hedged
+    assert asyncio.run(handler.call_llm_async([{"content": "hi"}], model="gemini-2.5-pro")) == "gemini-2.5-pro"
+    assert called == ["gemini-2.5-pro"]
@@ -6,30 +6,23 @@ import os
 sys.path.append(os.path.join(os.getcwd(), 'src'))
 
 try:
-    from src.components.hooks.parsing import _clean_and_parse_json, _repair_json_string
+    from src.components.hooks.parsing import _clean_and_parse_json
 except ImportError:
     # Fallback if running from root without src in path
     sys.path.append(os.getcwd())
-    from src.components.hooks.parsing import _clean_and_parse_json, _repair_json_string
+    from src.components.hooks.parsing import _clean_and_parse_json
 
 class TestParsingRobustness(unittest.TestCase):
 
-    def test_repair_json_string(self):
-        # Test 1: Valid JSON should be unchanged
-        self.assertEqual(_repair_json_string('{"key": "value"}'), '{"key": "value"}')
-        
-        # Test 2: Invalid \u escape
-        # Note: raw strings in python still interpret backslashes if they escape the quote, but here we want literal backslashes
-        self.assertEqual(_repair_json_string(r'{"key": "val\u00ue"}'), r'{"key": "val\\u00ue"}')
-        
-        # Test 3: Unescaped backslash
-        self.assertEqual(_repair_json_string(r'{"key": "val\ue"}'), r'{"key": "val\\ue"}') # \u without 4 digits
-        self.assertEqual(_repair_json_string(r'{"path": "C:\Users"}'), r'{"path": "C:\\Users"}')
-        
-        # Test 4: Valid escapes should remain valid
-        self.assertEqual(_repair_json_string(r'{"key": "line\nbreak"}'), r'{"key": "line\nbreak"}')
-        self.assertEqual(_repair_json_string(r'{"key": "tab\t"}'), r'{"key": "tab\t"}')
-        self.assertEqual(_repair_json_string(r'{"key": "\u1234"}'), r'{"key": "\u1234"}')
+    def test_parse_repairs_invalid_escapes(self):
+        # Invalid \u escapes and bare backslashes are kept as literal text
+        self.assertEqual(_clean_and_parse_json(r'{"metadata": 1, "key": "val\u00ue"}')["key"], r"val\u00ue")
+        self.assertEqual(_clean_and_parse_json(r'{"metadata": 1, "key": "val\ue"}')["key"], r"val\ue")
+        self.assertEqual(_clean_and_parse_json(r'{"metadata": 1, "path": "C:\Users"}')["path"], r"C:\Users")
+
+        # Valid escapes are decoded as usual
+        parsed = _clean_and_parse_json(r'{"metadata": 1, "a": "line\nbreak", "b": "tab\t", "c": "\u1234"}')
+        self.assertEqual((parsed["a"], parsed["b"], parsed["c"]), ("line\nbreak", "tab\t", "\u1234"))
 
     def test_parse_simple_json(self):
         text = '{"key": "value"}'
@@ -0,0 +1,63 @@
+import os
+import sys
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+from src.components.pdf_extraction import PDFExtractionService
+
+
+def make_pdf(pages: int, label: str = "Page") -> bytes:
+    doc = fitz.open()
+    for index in range(pages):
+        doc.new_page().insert_text((72, 72), f"{label} {index + 1}")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+class TestPDFExtraction(unittest.TestCase):
+
+    def test_cache_hit_on_same_bytes(self):
+        service = PDFExtractionService(max_workers=1)
+        data = make_pdf(3)
+
+        first = service.extract_text(data)
+        second = service.extract_text(data)
+
+        self.assertEqual(first, second)
+        self.assertIn("Page 3", first)
+        self.assertEqual((service.stats()["hits"], service.stats()["misses"]), (1, 1))
+
+    def test_parallel_pages_match_sequential_order(self):
+        data = make_pdf(10)
+        sequential = PDFExtractionService(max_workers=1).extract_text(data)
+
+        service = PDFExtractionService(max_workers=2, parallel_min_pages=4, pages_per_chunk=3)
+        try:
+            pages = list(service.iter_pages(data))
+        finally:
+            service.shutdown()
+
+        self.assertEqual(len(pages), 10)
+        self.assertIn("Page 10", pages[-1])
+        self.assertEqual("".join(pages), sequential)
+        # Streaming fills the cache once fully consumed
+        self.assertEqual(service.extract_text(data), sequential)
+
+    def test_cache_is_bounded_by_size(self):
+        first, second = make_pdf(2, "First"), make_pdf(2, "Second")
+        size = len(PDFExtractionService(max_workers=1).extract_text(first))
+        service = PDFExtractionService(max_workers=1, cache_max_chars=size + 5)
+
+        service.extract_text(first)
+        service.extract_text(second)
+
+        self.assertEqual(service.stats()["cached_documents"], 1)
+        self.assertNotIn(service.content_hash(first), service._cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import random
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.components.phrase_matcher import PhraseMatcher
+from src.database.sqlite_storage import open_database
+from backend.banned_phrases import BannedPhraseIndex
+from backend.prompt_cache import prompt_cache
+from backend.hooks import detect_performative_patterns
+
+
+class TestPhraseMatcher(unittest.TestCase):
+
+    def test_overlapping_and_nested_positions(self):
+        text = "Ushers said HE and she"
+        for threshold in (0, 1000):  # automaton / str.find
+            matcher = PhraseMatcher(["he", "She", "hers", "his"], automaton_min_phrases=threshold)
+            self.assertEqual(matcher.uses_automaton, threshold == 0)
+            self.assertEqual(
+                matcher.find_all(text),
+                [("she", 1, 4), ("hers", 2, 6), ("he", 2, 4), ("he", 12, 14), ("she", 19, 22), ("he", 20, 22)]
+            )
+            self.assertEqual(matcher.find_phrases(text), ["she", "hers", "he"])
+
+    def test_automaton_matches_str_find(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            phrases = ["".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 8))]
+            text = "".join(rng.choice("abcAB ") for _ in range(rng.randint(0, 60)))
+            automaton = PhraseMatcher(phrases, automaton_min_phrases=0)
+            direct = PhraseMatcher(phrases, automaton_min_phrases=1000)
+            self.assertEqual(automaton.find_all(text), direct.find_all(text))
+            self.assertEqual(automaton.find_phrases(text), direct.find_phrases(text))
+
+    def test_index_rebuilds_on_invalidation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "db.json")
+            db = open_database(db_path)
+            db.table('banned_phrases').insert({"phrase": "Kiellettty"})
+            index = BannedPhraseIndex()
+
+            first = index.get_matcher(db_path)
+            self.assertIs(index.get_matcher(db_path), first)
+
+            db.table('banned_phrases').insert({"phrase": "toinen"})
+            prompt_cache.invalidate_banned_phrases()
+            second = index.get_matcher(db_path)
+            self.assertIsNot(second, first)
+            self.assertEqual(second.phrases, ["kiellettty", "toinen"])
+            db.close()
+
+    def test_performative_patterns_keep_list_order(self):
+        inputs = {"history_text": "A rich history.", "product_text": "We delve into the Realm of"}
+        result = detect_performative_patterns(inputs)
+        self.assertEqual(result["performative_patterns_detected"], '["delve into", "rich history", "realm of"]')
+
+    def test_agent_hook_uses_the_shared_patterns(self):
+        from backend.agents.critics import PerformativityDetectorAgent
+        from backend.state import WorkflowState
+
+        state = WorkflowState(execution_id="e1", inputs={
+            "history_text": "A rich history", "product_text": "of the Realm of", "reflection_text": "r"})
+        agent = PerformativityDetectorAgent.__new__(PerformativityDetectorAgent)  # no LLM provider needed
+        state = agent.detect_performative_patterns(state)
+        self.assertEqual(state.aux_data["performative_patterns_detected"], '["rich history", "realm of"]')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import random
+import unittest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.components.pii_redaction import redact_pii, strip_non_printable
+from src.components.hooks.sanitization import sanitize_and_anonymize_input
+
+
+class TestPIIRedaction(unittest.TestCase):
+
+    def test_all_types_in_one_pass_with_offsets(self):
+        text = (
+            "Mail matti.m@example.fi or call +358 40 123 4567. "
+            "HETU 131052-308T, new format 010120Y123N. "
+            "Card 4111 1111 1111 1111, server 10.0.0.1."
+        )
+        result = redact_pii(text)
+
+        self.assertEqual(result["counts"], {"EMAIL": 1, "PHONE_FI": 1, "HETU": 2, "CREDIT_CARD": 1, "IP_ADDRESS": 1})
+        self.assertEqual(
+            [text[o["start"]:o["end"]] for o in result["offsets"]],
+            ["matti.m@example.fi", "+358 40 123 4567", "131052-308T", "010120Y123N", "4111 1111 1111 1111", "10.0.0.1"]
+        )
+        self.assertIn("Mail [REDACTED_EMAIL] or call [REDACTED_PHONE_FI].", result["text"])
+        self.assertTrue(result["text"].endswith("server [REDACTED_IP_ADDRESS]."))
+
+    def test_no_pii_and_long_tokens(self):
+        token = "QUJD" * 50_000  # no "@": must not be rescanned from every position
+        result = redact_pii(f"plain text {token}")
+        self.assertEqual(result["counts"], {})
+        self.assertEqual(result["text"], f"plain text {token}")
+
+    def test_strip_non_printable_matches_isprintable(self):
+        rng = random.Random(7)
+        alphabet = "abc äö\n\t\r\x00\x85\xa0\xad​ ﻿\U000e0001€🙂"
+        for _ in range(50):
+            text = "".join(rng.choice(alphabet) for _ in range(200))
+            self.assertEqual(strip_non_printable(text), "".join(ch for ch in text if ch.isprintable()))
+
+    def test_src_hook_reports_counts(self):
+        result = sanitize_and_anonymize_input({"history_text": "  ping a@b.fi and c@d.fi  ", "score": 3})
+
+        self.assertEqual(result["safe_data"]["history_text"], "ping [REDACTED_EMAIL] and [REDACTED_EMAIL]")
+        self.assertEqual(result["safe_data"]["score"], 3)
+        self.assertEqual(result["pii_counts"], {"history_text": {"EMAIL": 2}})
+        self.assertEqual(result["threat_assessment"], "Detected: EMAIL detected in history_text")
+
+
+if __name__ == '__main__':
+    unittest.main()
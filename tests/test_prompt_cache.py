@@ -0,0 +1,39 @@
+import pytest
+from tinydb import Query
+from backend.engine import WorkflowEngine
+from backend.prompt_cache import prompt_cache
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.llm_provider.USE_MOCK_LLM", True)
+    engine = WorkflowEngine(str(tmp_path / "test_db.json"))
+    engine.components_table.insert({"id": "INTRO", "content": "Intro"})
+    engine.components_table.insert({"id": "RULES", "content": "Avoid {{BANNED_PHRASES}}."})
+    engine.steps_table.insert({"id": "step_1", "execution_config": {"llm_prompts": ["INTRO", "RULES"]}})
+    engine.banned_phrases_table.insert({"phrase": "foo"})
+    prompt_cache.clear()
+    return engine
+
+
+def test_compiled_prompt_is_cached(engine, monkeypatch):
+    assert engine._construct_prompt_for_step("step_1") == 'Intro\n\nAvoid "foo".'
+
+    # Second call must not touch the DB
+    monkeypatch.setattr(engine, "_compile_prompt_for_step", lambda step_id: pytest.fail("cache miss"))
+    assert engine._construct_prompt_for_step("step_1") == 'Intro\n\nAvoid "foo".'
+
+    stats = prompt_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_edits_invalidate_cached_prompts(engine):
+    engine._construct_prompt_for_step("step_1")
+
+    engine.components_table.update({"content": "New intro"}, Query().id == "INTRO")
+    prompt_cache.invalidate_config()
+    assert engine._construct_prompt_for_step("step_1").startswith("New intro")
+
+    engine.banned_phrases_table.insert({"phrase": "bar"})
+    prompt_cache.invalidate_banned_phrases()
+    assert engine._construct_prompt_for_step("step_1").endswith('Avoid "foo", "bar".')
@@ -0,0 +1,84 @@
+import asyncio
+import time
+from backend.rate_limiter import LLMGovernor, TokenBucket
+
+
+def test_concurrency_is_bounded():
+    governor = LLMGovernor(max_concurrency=2)
+    state = {"in_flight": 0, "max": 0}
+
+    async def call():
+        async with governor.slot("m"):
+            state["in_flight"] += 1
+            state["max"] = max(state["max"], state["in_flight"])
+            await asyncio.sleep(0.02)
+            state["in_flight"] -= 1
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(main())
+
+    stats = governor.stats()
+    assert state["max"] == 2
+    assert stats["models"]["m"]["requests"] == 6
+    assert stats["models"]["m"]["max_wait_seconds"] > 0
+    assert stats["queue_depth"] == 0
+    assert stats["in_flight"] == 0
+
+
+def test_governor_survives_multiple_event_loops():
+    governor = LLMGovernor(max_concurrency=1)
+
+    async def call():
+        async with governor.slot("m"):
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.wait_for(asyncio.gather(call(), call()), timeout=1)
+
+    for _ in range(2):
+        asyncio.run(main())
+
+    assert governor.stats()["models"]["m"]["requests"] == 4
+
+
+def test_token_bucket_throttles_after_burst():
+    bucket = TokenBucket(rate_per_minute=60)  # one per second
+    for _ in range(60):
+        assert bucket.reserve(1) == 0.0
+    assert 0.9 < bucket.reserve(1) <= 1.0
+
+
+def test_rpm_limit_delays_requests():
+    governor = LLMGovernor(model_limits={"m": {"rpm": 600}})  # burst of 600, then 10/s
+    governor._get_buckets("m")["rpm"].tokens = 0
+
+    async def main():
+        start = time.monotonic()
+        async with governor.slot("m"):
+            pass
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) >= 0.09
+    # Unrelated models have their own (unlimited) bucket
+    assert governor._get_buckets("other")["rpm"].reserve(1) == 0.0
+
+
+def test_shared_quota_spans_processes(tmp_path):
+    from backend.rate_limiter import SharedTokenBucket
+
+    path = str(tmp_path / "jobs.sqlite")
+    # Two processes (here: two bucket instances on the same file) share 2 requests/min
+    api, worker = SharedTokenBucket(path, "m:rpm", 2), SharedTokenBucket(path, "m:rpm", 2)
+    assert api.reserve(1) == 0 and worker.reserve(1) == 0
+    assert 29 < api.reserve(1) <= 30
+
+    governor = LLMGovernor(default_rpm=60, shared_path=path)
+
+    async def call():
+        async with governor.slot("other"):
+            pass
+
+    asyncio.run(call())
+    assert governor.stats()["shared_quota"]
@@ -0,0 +1,62 @@
+import json
+import pytest
+from tinydb import Query
+from src.database.sqlite_storage import SQLiteDatabase, migrate_json_to_sqlite, open_database
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = SQLiteDatabase(str(tmp_path / "db.sqlite"))
+    yield database
+    database.close()
+
+
+def test_table_api_matches_tinydb(db):
+    table = db.table("executions")
+    Execution = Query()
+
+    first = table.insert({"execution_id": "a", "status": "pending"})
+    table.insert({"execution_id": "b", "status": "pending"})
+
+    assert table.update({"status": "running"}, Execution.execution_id == "a") == [first]
+    assert table.search(Execution.execution_id == "a")[0]["status"] == "running"
+    assert table.get(Execution.status == "pending")["execution_id"] == "b"
+    assert table.get(doc_id=first).doc_id == first
+
+    table.upsert({"execution_id": "c", "status": "new"}, Execution.execution_id == "c")
+    table.upsert({"execution_id": "c", "status": "done"}, Execution.execution_id == "c")
+    assert [d["status"] for d in table.search(Execution.execution_id == "c")] == ["done"]
+
+    assert table.search((Execution.execution_id == "a") | (Execution.execution_id == "b"))
+    assert len(table.search((Execution.execution_id == "a") & (Execution.status == "pending"))) == 0
+
+    table.remove(doc_ids=[first])
+    assert len(table) == 2
+
+
+def test_indexed_equality_uses_index(db):
+    table = db.table("executions")
+    plan = db.connection.execute(
+        f"EXPLAIN QUERY PLAN SELECT doc_id, data FROM {table._sql_name} WHERE {table._index_clause(Query().execution_id == 'x')[0]}",
+        ["x"]
+    ).fetchall()
+    assert "USING INDEX" in str(plan)
+
+
+def test_migrate_json_keeps_doc_ids(tmp_path):
+    json_path = tmp_path / "db.json"
+    json_path.write_text(json.dumps({
+        "banned_phrases": {"3": {"phrase": "foo"}, "7": {"phrase": "bär"}},
+        "workflows": {"1": {"id": "wf"}}
+    }), encoding="utf-8")
+
+    db = open_database(str(json_path), backend="sqlite")
+    try:
+        phrases = db.table("banned_phrases").all()
+        assert [(d.doc_id, d["phrase"]) for d in phrases] == [(3, "foo"), (7, "bär")]
+        assert db.table("workflows").get(Query().id == "wf") is not None
+        assert db.tables() == {"banned_phrases", "workflows"}
+        # Already migrated tables are left alone unless forced
+        assert migrate_json_to_sqlite(str(json_path), str(tmp_path / "db.sqlite")) == {}
+    finally:
+        db.close()
@@ -0,0 +1,125 @@
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from backend.agents.base import BaseAgent
+from backend.engine import WorkflowEngine
+from backend.events import ExecutionEventBus
+from backend.llm_provider import GoogleGeminiProvider, MockProvider
+from backend.schemas import XAIReport
+from backend.state import WorkflowState
+from src.engine.circuit_breaker import get_circuit_breakers
+from src.components.json_stream import IncrementalJSONParser, JSONStreamError
+
+DOCUMENT = {"executive_summary": "Vahva \"suoritus\" – hyvä \U0001F600", "scores": [{"n": 1.5}, {"ok": True}], "none": None}
+
+
+def test_parser_reports_fields_as_they_arrive():
+    text = "```json\n" + json.dumps(DOCUMENT, ensure_ascii=True) + "\n```"
+    parser, partials, complete = IncrementalJSONParser(), [], {}
+    for start in range(0, len(text), 3):
+        for path, value, done in parser.feed(text[start:start + 3]):
+            (complete.__setitem__(path, value) if done else partials.append((path, value)))
+    parser.close()
+
+    assert complete == {"executive_summary": DOCUMENT["executive_summary"], "scores.0.n": 1.5, "scores.1.ok": True, "none": None}
+    summaries = [value for path, value in partials if path == "executive_summary"]
+    assert len(summaries) > 3 and DOCUMENT["executive_summary"].startswith(summaries[-1])
+
+
+def test_parser_detects_truncation_and_invalid_json():
+    parser = IncrementalJSONParser()
+    parser.feed('{"executive_summary": "cut of')
+    with pytest.raises(JSONStreamError, match="Truncated JSON.*executive_summary"):
+        parser.close()
+    with pytest.raises(JSONStreamError, match="expected ',' or"):
+        IncrementalJSONParser().feed('{"a": 1 "b": 2}')
+
+
+class ReporterAgent(BaseAgent):
+    streams_output = True
+
+    def __init__(self):
+        self.model = "mock"
+        self.reads = ("inputs",)
+        self.writes = ("aux_data.report",)
+        self.llm_provider = MockProvider(latency="fixed:0.05")
+
+    def construct_user_prompt(self, state: WorkflowState) -> str:
+        return "Write the report."
+
+    def get_response_schema(self):
+        return XAIReport
+
+    def _update_state(self, state: WorkflowState, response_data) -> WorkflowState:
+        state.aux_data["report"] = response_data
+        return state
+
+
+def test_engine_publishes_streamed_fields(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # mock_debug.log
+    monkeypatch.setattr("backend.llm_provider.USE_MOCK_LLM", True)
+    monkeypatch.setattr("backend.agents.base.LLM_STREAMING_ENABLED", True)
+    engine = WorkflowEngine(str(tmp_path / "test_db.json"))
+    engine.event_bus = ExecutionEventBus()
+    engine.agents_map = {"Reporter": ReporterAgent()}
+    engine.steps_table.insert({"id": "s1", "component": "Reporter", "execution_config": {}})
+    engine.workflows_table.insert({"id": "wf", "steps": ["s1"]})
+    inputs = {"history_text": "h", "product_text": "p", "reflection_text": "r"}
+    execution_id = engine.create_execution("wf", inputs)
+
+    async def main():
+        received = []
+
+        async def listen():
+            async for event in engine.event_bus.subscribe(execution_id):
+                received.append(event)
+
+        listener = asyncio.create_task(listen())
+        await asyncio.sleep(0)
+        await engine.run_execution(execution_id, inputs)
+        await asyncio.wait_for(listener, 5)
+        return received
+
+    received = asyncio.run(main())
+    partials = [e for e in received if e["type"] == "step_partial" and e["field"] == "executive_summary"]
+    assert len(partials) > 1 and not partials[0]["complete"] and partials[-1]["complete"]
+    assert partials[-1]["step_id"] == "s1"
+    # Live only: the replayable history keeps just the progress events
+    assert not any(e["type"] == "step_partial" for e in engine.event_bus.history(execution_id))
+
+
+def test_gemini_stream_fails_fast_on_max_tokens(monkeypatch):
+    import google.generativeai as genai
+
+    def chunk(text, finish_reason=None):
+        return SimpleNamespace(text=text, parts=[text], usage_metadata=None,
+                               candidates=[SimpleNamespace(finish_reason=SimpleNamespace(name=finish_reason or "STOP"))])
+
+    class Stream:
+        usage_metadata = None
+
+        def __init__(self, chunks):
+            self.chunks = chunks
+
+        async def __aiter__(self):
+            for c in self.chunks:
+                yield c
+
+    class StreamingModel:
+        async def generate_content_async(self, contents, stream=False):
+            assert stream
+            return Stream([chunk('{"executive_summary": "Al'), chunk("ku", "MAX_TOKENS"), chunk("never read")])
+
+    monkeypatch.setattr(genai, "GenerativeModel", lambda *args, **kwargs: StreamingModel())
+    monkeypatch.setattr("config.LLM_CIRCUIT_BREAKER_ENABLED", True)
+    get_circuit_breakers().clear()
+    provider = GoogleGeminiProvider("gemini-2.5-flash", api_key="test")
+    partials = []
+    with pytest.raises(ValueError, match="truncated"):
+        asyncio.run(provider.generate.retry_with(stop=lambda state: True)(
+            provider, "prompt", response_schema=XAIReport, on_partial=lambda *update: partials.append(update)))
+    assert partials == [("executive_summary", "Al", False), ("executive_summary", "Alku", False)]
+    # The provider answered: a truncation is not a provider failure for the circuit breaker
+    assert get_circuit_breakers().snapshot()["gemini/gemini-2.5-flash"]["recent_failures"] == 0
+    get_circuit_breakers().clear()
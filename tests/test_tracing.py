@@ -0,0 +1,155 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from backend.agents.base import BaseAgent
+from backend.engine import WorkflowEngine
+from backend.events import ExecutionEventBus
+from backend.llm_provider import LLMProvider, _record_call
+from backend.state import WorkflowState
+from src.components import tracing
+
+
+class FlakyProvider(LLMProvider):
+    """Fails the first request, like a provider call that gets retried."""
+
+    def __init__(self):
+        self.requests = 0
+
+    async def _request(self):
+        self.requests += 1
+        await asyncio.sleep(0.01)
+        if self.requests == 1:
+            raise RuntimeError("503 Service Unavailable")
+        return {"ok": True}
+
+    async def generate(self, prompt, system_instruction=None, response_schema=None, temperature=0.7):
+        from backend.rate_limiter import get_llm_governor
+        for _ in range(2):
+            try:
+                async with get_llm_governor().slot("gemini-2.5-flash"):
+                    return await _record_call("gemini-2.5-flash", self._request(), lambda response: (40, 10))
+            except RuntimeError:
+                continue
+
+
+class TracedAgent(BaseAgent):
+    reads = ("inputs",)
+    writes = ("aux_data.traced",)
+
+    def construct_user_prompt(self, state: WorkflowState) -> str:
+        return state.inputs.history_text
+
+    def get_response_schema(self):
+        return None
+
+    def get_system_instruction(self) -> str:
+        return "system"
+
+    def _update_state(self, state: WorkflowState, response_data) -> WorkflowState:
+        state.aux_data["traced"] = response_data
+        return state
+
+    def check_input(self, state: WorkflowState) -> WorkflowState:
+        return state
+
+
+@pytest.fixture
+def exporter(tmp_path, monkeypatch):
+    exporter = tracing.JsonLinesSpanExporter(str(tmp_path / "traces"))
+    monkeypatch.setattr(tracing, "_exporter", exporter)
+    return exporter
+
+
+def test_spans_outside_a_trace_are_not_exported(exporter):
+    with tracing.start_span("orphan") as span:
+        span.set_attribute("ignored", True)
+    assert span is tracing.NOOP_SPAN
+
+    with pytest.raises(ValueError):
+        with tracing.start_trace("execution", "exec-1"):
+            with tracing.start_span("child"):
+                raise ValueError("boom")
+
+    spans = {span["name"]: span for span in exporter.read("exec-1")}
+    assert set(spans) == {"execution", "child"}
+    assert spans["child"]["parent_span_id"] == spans["execution"]["span_id"]
+    assert spans["child"]["status"] == {"code": "ERROR", "message": "boom"}
+
+
+def test_execution_timeline_waterfall(tmp_path, exporter, monkeypatch):
+    monkeypatch.setattr("backend.llm_provider.USE_MOCK_LLM", True)
+    engine = WorkflowEngine(str(tmp_path / "test_db.json"))
+    engine.event_bus = ExecutionEventBus()
+    agent = TracedAgent()
+    agent.llm_provider = FlakyProvider()
+    engine.agents_map = {"Traced": agent}
+    engine.steps_table.insert({"id": "s1", "component": "Traced",
+                               "execution_config": {"pre_hooks": ["check_input"]}})
+    engine.workflows_table.insert({"id": "wf", "steps": ["s1"]})
+
+    inputs = {"history_text": "h", "product_text": "p", "reflection_text": "r"}
+    execution_id = engine.create_execution("wf", inputs)
+    asyncio.run(engine.run_execution(execution_id, inputs))
+
+    timeline = engine.get_execution_timeline(execution_id)
+    assert len(timeline["traces"]) == 1
+    spans = timeline["traces"][0]["spans"]
+    outline = [("  " * span["depth"]) + span["name"] for span in spans if span["name"] != "db.write"]
+    assert outline[:12] == [
+        "execution",
+        "  step",
+        "    prompt.system",
+        "    pre_hooks",
+        "      hook",
+        "    agent.execute",
+        "      prompt.user",
+        "      llm.generate",
+        "        llm.queue_wait",
+        "        llm.request",
+        "        llm.queue_wait",
+        "        llm.request",
+    ]
+    assert "      parse" in outline
+
+    requests = [span for span in spans if span["name"] == "llm.request"]
+    assert [(r["status"], r["attributes"]["llm.attempt"]) for r in requests] == [("ERROR", 1), ("OK", 2)]
+    assert requests[1]["attributes"]["llm.prompt_tokens"] == 40
+    assert any(span["name"] == "db.write" and span["attributes"]["db.table"] == "executions" for span in spans)
+    assert all(span["offset_ms"] >= 0 for span in spans)
+
+    from backend import main
+    monkeypatch.setattr(main, "engine", engine)
+    client = TestClient(main.app)
+    assert client.get(f"/executions/{execution_id}/timeline").json()["traces"][0]["spans"][0]["name"] == "execution"
+    text = client.get(f"/executions/{execution_id}/timeline", params={"format": "text"}).text
+    assert "llm.request" in text and " !" in text  # the failed attempt is marked
+    assert client.get("/executions/missing/timeline").status_code == 404
+
+
+def test_spans_are_written_when_the_run_ends(exporter, tmp_path):
+    path = tmp_path / "traces" / "exec-2.jsonl"
+    with tracing.start_trace("execution", "exec-2"):
+        with tracing.start_span("step"):
+            pass
+        exporter.flush()
+        assert not path.exists()  # buffered while the run is in progress...
+        assert [span["name"] for span in exporter.read("exec-2")] == ["step"]  # ...but readable
+    exporter.flush()
+    assert len(path.read_text().splitlines()) == 2
+
+
+def test_old_trace_files_are_pruned(tmp_path):
+    import os
+    import time
+
+    directory = tmp_path / "traces"
+    directory.mkdir()
+    old, recent = directory / "old.jsonl", directory / "recent.jsonl"
+    old.write_text("{}\n")
+    recent.write_text("{}\n")
+    os.utime(old, (time.time() - 10 * 86400,) * 2)
+
+    exporter = tracing.JsonLinesSpanExporter(str(directory), retention_days=7)
+    exporter.export(tracing.Span("execution", "t1", None, "new"))
+    exporter.flush()
+    assert sorted(p.name for p in directory.iterdir()) == ["new.jsonl", "recent.jsonl"]
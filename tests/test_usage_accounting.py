@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from backend.engine import WorkflowEngine
+from backend.events import ExecutionEventBus
+from backend.state import WorkflowState
+from src.engine.usage import collect_usage, record_llm_call, mark_last_call_failed, estimate_cost
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr("backend.llm_provider.USE_MOCK_LLM", True)
+    engine = WorkflowEngine(str(tmp_path / "test_db.json"))
+    engine.event_bus = ExecutionEventBus()
+    return engine
+
+
+class MeteredAgent:
+    """Fake agent whose 'provider' records a failed attempt followed by a success."""
+    reads = ("inputs",)
+
+    def __init__(self, name, model, tokens):
+        self.name, self.model, self.tokens = name, model, tokens
+        self.writes = (f"aux_data.{name}",)
+
+    async def execute(self, state: WorkflowState, system_instruction=None) -> WorkflowState:
+        record_llm_call(self.model, latency_seconds=0.1, error="429 Quota exceeded")
+        await asyncio.sleep(0.01)  # let the concurrent sibling record in between
+        record_llm_call(self.model, self.tokens, self.tokens // 2, latency_seconds=0.5)
+        state.aux_data[self.name] = True
+        return state
+
+
+def test_collector_counts_retries_and_cost():
+    with collect_usage() as collector:
+        record_llm_call("gemini-2.5-flash", error="timeout")
+        record_llm_call("gemini-2.5-flash", 100, 10)
+        mark_last_call_failed("Invalid JSON")
+        record_llm_call("gemini-2.5-flash", 1_000_000, 1_000_000, latency_seconds=2.0)
+        record_llm_call("gemini-2.5-flash-lite", 1_000_000, 0, cached=False)
+    record_llm_call("gemini-2.5-flash", 5, 5)  # outside any collector: ignored
+
+    assert [call["attempt"] for call in collector.calls] == [1, 2, 3, 1]
+    summary = collector.summary()
+    assert (summary["calls"], summary["failed_calls"], summary["retries"]) == (4, 2, 2)
+    assert summary["cost_usd"] == pytest.approx(0.30 + 2.50 + 0.10 + estimate_cost("gemini-2.5-flash", 100, 10))
+    assert summary["models"]["gemini-2.5-flash-lite"]["prompt_tokens"] == 1_000_000
+    assert estimate_cost("unknown-model", 10, 10) == 0.0
+
+
+def test_engine_records_usage_per_step_and_workflow(engine):
+    engine.agents_map = {
+        "A": MeteredAgent("a", "gemini-2.5-flash", 1000),
+        "B": MeteredAgent("b", "gpt-4o", 4000),
+    }
+    engine.steps_table.insert({"id": "s1", "component": "A", "execution_config": {}})
+    engine.steps_table.insert({"id": "s2", "component": "B", "execution_config": {}})
+    engine.workflows_table.insert({"id": "wf", "steps": ["s1", "s2"]})
+
+    inputs = {"history_text": "h", "product_text": "p", "reflection_text": "r"}
+    first = engine.create_execution("wf", inputs)
+    second = engine.create_execution("wf", inputs)
+    asyncio.run(engine.run_execution(first, inputs))
+    asyncio.run(engine.run_execution(second, inputs))
+
+    usage = engine.get_execution_usage(first)
+    steps = usage["steps"]
+    # The two steps ran concurrently, but each one only sees its own calls
+    assert (steps["s1"]["calls"], steps["s1"]["retries"], steps["s1"]["total_tokens"]) == (2, 1, 1500)
+    assert (steps["s2"]["calls"], steps["s2"]["retries"], steps["s2"]["total_tokens"]) == (2, 1, 6000)
+    assert steps["s2"]["agent"] == "MeteredAgent"
+    assert usage["totals"]["total_tokens"] == 7500
+    assert usage["costliest_step"] == "s2"
+    assert steps["s1"]["cost_share"] + steps["s2"]["cost_share"] == pytest.approx(1.0)
+    assert "call_log" not in engine.get_execution_status(first)["usage"]["steps"]["s1"]
+
+    detailed = engine.get_execution_usage(first, include_calls=True)
+    assert [call["attempt"] for call in detailed["steps"]["s1"]["call_log"]] == [1, 2]
+
+    workflow = engine.get_workflow_usage("wf")
+    assert workflow["executions"] == 2
+    assert workflow["totals"]["total_tokens"] == 15000
+    assert workflow["steps"]["s2"]["avg_total_tokens"] == 6000
@@ -8,6 +8,23 @@ import pandas as pd
 # Configuration
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 
+def stream_events(url, headers=None):
+    """
+    Yields events (dicts) from a Server-Sent Events endpoint until the server closes the stream.
+    """
+    with requests.get(url, headers=headers or {}, stream=True, timeout=(5, 60)) as res:
+        res.raise_for_status()
+        data_lines = []
+        for line in res.iter_lines(decode_unicode=True):
+            if line is None:
+                continue
+            if line == "":
+                if data_lines:
+                    yield json.loads("\n".join(data_lines))
+                    data_lines = []
+            elif line.startswith("data:"):
+                data_lines.append(line[5:].strip())
+
 def render_dashboard(result):
     st.header("2. Results")
     
@@ -227,44 +244,57 @@ if page == "Assessment":
                         job_id = job_data['execution_id']
                         st.success(f"Job Started! ID: {job_id}")
                         
-                        # Polling Loop
+                        # Live progress via Server-Sent Events (no polling)
                         progress_bar = st.progress(0)
                         status_text = st.empty()
-                        
-                        while True:
+                        summary_preview = st.empty()
+                        total_steps = 0
+                        finished_steps = 0
+                        last_event_id = 0
+                        done = False
+
+                        while not done:
                             try:
-                                status_res = requests.get(f"{BACKEND_URL}/executions/{job_id}")
-                                if status_res.status_code == 200:
-                                    status_data = status_res.json()
-                                    status = status_data.get('status')
-                                    
-                                    if status and status.upper() == "COMPLETED":
+                                headers = {"Last-Event-ID": str(last_event_id)} if last_event_id else {}
+                                event_stream = stream_events(f"{BACKEND_URL}/executions/{job_id}/events", headers)
+                                for event in event_stream:
+                                    last_event_id = event.get('id') or last_event_id
+                                    event_type = event.get('type')
+
+                                    if event_type == "execution_started":
+                                        total_steps = event.get('total_steps') or 0
+                                        finished_steps = len(event.get('completed_steps') or [])
+                                        status_text.info("Status: running...")
+                                    elif event_type == "step_started":
+                                        status_text.info(f"Status: running - Processing: {event.get('agent')}")
+                                    elif event_type == "hook":
+                                        status_text.info(f"Status: running - Hook: {event.get('hook')}")
+                                    elif event_type == "step_partial":
+                                        # Streamed while the reporter writes it (LLM_STREAMING_ENABLED)
+                                        if event.get('field') == "executive_summary":
+                                            summary_preview.info(event.get('value') or "")
+                                    elif event_type == "execution_gated":
+                                        # A gating rule stopped the run or skipped steps (see backend/gating.py)
+                                        total_steps = max(finished_steps, total_steps - len(event.get('skipped_steps') or []))
+                                        st.warning(f"{event.get('reason')} - skipped: {', '.join(event.get('skipped_steps') or [])}")
+                                    elif event_type == "step_finished":
+                                        finished_steps += 1
+                                        if total_steps:
+                                            progress_bar.progress(min(100, int(finished_steps * 100 / total_steps)))
+                                    elif event_type == "execution_completed":
                                         progress_bar.progress(100)
                                         status_text.success("Assessment Completed!")
-                                        result = status_data.get('result', {})
-                                        
-                                        render_dashboard(result)
-                                        break
-                                    
-                                    elif status and status.upper() == "FAILED":
-                                        status_text.error(f"Job Failed: {status_data.get('error')}")
-                                        break
-                                    
-                                    else:
-                                        current_step = status_data.get('current_step')
-                                        if current_step:
-                                            status_text.info(f"Status: {status} - Processing: {current_step}")
-                                        else:
-                                            status_text.info(f"Status: {status}...")
-                                        time.sleep(2)
-                                else:
-                                    st.warning(f"Failed to poll status (Code: {status_res.status_code}). Retrying...")
-                                    time.sleep(2)
-                            except requests.exceptions.ConnectionError:
-                                st.warning("Connection lost. Retrying...")
+                                        summary_preview.empty()
+                                        render_dashboard(event.get('result', {}))
+                                        done = True
+                                    elif event_type == "execution_failed":
+                                        status_text.error(f"Job Failed: {event.get('error')}")
+                                        done = True
+                            except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError):
+                                st.warning("Connection lost. Reconnecting...")
                                 time.sleep(2)
                             except Exception as e:
-                                st.error(f"Polling Error: {e}")
+                                st.error(f"Progress Stream Error: {e}")
                                 break
                     else:
                         st.error(f"Failed to start job: {response.text}")